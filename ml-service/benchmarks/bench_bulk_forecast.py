@@ -0,0 +1,42 @@
+"""
+Benchmark: bulk demand forecasting throughput vs worker processes
+
+Synthetic daily demand for many SKUs, forecast with forecast_bulk() at
+increasing worker counts. Wall-clock time should fall roughly linearly
+with workers up to the number of cores.
+
+Usage:
+    python -m benchmarks.bench_bulk_forecast --skus 200 --days 365 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.generators import demand_history
+from src.models.bulk_forecast import forecast_bulk
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=200)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--horizon", type=int, default=14)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    data = demand_history(args.skus, args.days)
+    print(f"{args.skus} SKUs x {args.days} days, horizon {args.horizon}, {os.cpu_count()} CPUs")
+    print(f"{'workers':<10}{'seconds':>10}{'SKUs/s':>10}{'speedup':>10}")
+
+    baseline = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        n_series = sum(len(chunk['results']) for chunk in forecast_bulk(data, args.horizon, max_workers=workers))
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:<10}{elapsed:>10.1f}{n_series / elapsed:>10.1f}{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
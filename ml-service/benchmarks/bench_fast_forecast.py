@@ -0,0 +1,58 @@
+"""
+Benchmark: fast NumPy forecaster vs Prophet
+
+Synthetic daily demand for many SKUs (a share of them intermittent),
+forecast with the vectorized fast engine for the whole catalogue and with
+Prophet for a subset of SKUs (extrapolated, since one fit takes ~100ms+).
+
+Usage:
+    python -m benchmarks.bench_fast_forecast --skus 20000 --days 180 --prophet-skus 20
+"""
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.generators import demand_history
+from src.config import Settings
+from src.models.demand_forecaster import DemandForecaster
+
+
+def run(engine: str, data, horizon: int) -> float:
+    """Seconds to forecast every series in `data` with one engine"""
+    forecaster = DemandForecaster(Settings(forecast_engine=engine))
+    asyncio.run(forecaster.initialize())
+
+    start = time.perf_counter()
+    result = forecaster.forecast_batch_sync(data, horizon)
+    elapsed = time.perf_counter() - start
+
+    assert not result['errors'], result['errors'][:3]
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--horizon", type=int, default=14)
+    parser.add_argument("--prophet-skus", type=int, default=20, help="SKUs fitted with Prophet")
+    args = parser.parse_args()
+
+    data = demand_history(args.skus, args.days, sparse_every=10)  # Every 10th SKU is intermittent
+
+    prophet_skus = min(args.prophet_skus, args.skus)
+    subset = data[data['sku'].isin(data['sku'].unique()[:prophet_skus])]
+
+    fast = run("fast", data, args.horizon)
+    prophet = run("prophet", subset, args.horizon) * args.skus / prophet_skus
+
+    print(f"{args.skus} SKUs x {args.days} days, horizon {args.horizon}")
+    print(f"{'engine':<28}{'seconds':>10}{'SKUs/s':>12}")
+    print(f"{'fast (NumPy)':<28}{fast:>10.2f}{args.skus / fast:>12.0f}")
+    print(f"{'prophet (extrapolated)':<28}{prophet:>10.1f}{args.skus / prophet:>12.1f}")
+    print(f"speedup: {prophet / fast:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Benchmark: cold start of the ML service
+
+Imports src.main in a fresh interpreter and reports wall time, peak RSS and
+which heavy frameworks ended up loaded. Optional limits turn it into a CI
+gate (non-zero exit when exceeded).
+
+Usage:
+    python -m benchmarks.bench_import --runs 3 --max-seconds 5 --max-rss-mb 400
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict
+
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import src.main
+elapsed = time.perf_counter() - start
+print(json.dumps({
+    "seconds": elapsed,
+    "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "tensorflow": "tensorflow" in sys.modules,
+    "prophet": "prophet" in sys.modules,
+}))
+"""
+
+
+def measure_import() -> Dict:
+    """Import time and peak RSS of `import src.main` in a new process"""
+    out = subprocess.run([sys.executable, "-c", PROBE], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--max-seconds", type=float, default=None, help="Fail if the best import is slower")
+    parser.add_argument("--max-rss-mb", type=float, default=None, help="Fail if peak RSS is higher")
+    args = parser.parse_args()
+
+    results = [measure_import() for _ in range(args.runs)]
+    best = min(results, key=lambda r: r["seconds"])
+
+    print(f"{'run':<6}{'seconds':>10}{'RSS MB':>10}{'tensorflow':>12}{'prophet':>10}")
+    for i, r in enumerate(results, 1):
+        print(f"{i:<6}{r['seconds']:>10.2f}{r['rss_mb']:>10.0f}{str(r['tensorflow']):>12}{str(r['prophet']):>10}")
+
+    failures = []
+    if args.max_seconds is not None and best["seconds"] > args.max_seconds:
+        failures.append(f"import took {best['seconds']:.2f}s > {args.max_seconds}s")
+    if args.max_rss_mb is not None and best["rss_mb"] > args.max_rss_mb:
+        failures.append(f"peak RSS {best['rss_mb']:.0f} MB > {args.max_rss_mb} MB")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark: LSTM inference latency per batch size, Keras vs ONNX/TFLite
+
+Exports the anomaly LSTM Autoencoder (or the demand LSTM forecaster) to
+every backend whose packages are installed, then times predict_on_batch
+per batch size. Reports the median latency, windows/s, speedup over Keras
+and the largest absolute difference from the Keras output.
+
+Usage:
+    python -m benchmarks.bench_lstm_inference --batch-sizes 1 8 32 128 512 --threads 1
+"""
+
+import argparse
+import importlib.util
+import json
+import tempfile
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from src.models.inference import RUNNERS, export_model, load_runner
+
+# Packages each exported backend needs
+BACKEND_PACKAGES = {"tflite": ("tensorflow",), "onnx": ("tf2onnx", "onnxruntime")}
+
+
+def build_model(model: str):
+    from src.models.anomaly_detector import AnomalyDetector, LSTM_FEATURES, LSTM_TIMESTEPS
+    from src.models.demand_forecaster import DemandForecaster, LSTM_FEATURES as FORECAST_FEATURES, LSTM_LOOKBACK
+
+    if model == "autoencoder":
+        return AnomalyDetector()._build_lstm_autoencoder(LSTM_TIMESTEPS, len(LSTM_FEATURES)), (LSTM_TIMESTEPS, len(LSTM_FEATURES))
+    return DemandForecaster()._build_lstm_forecaster(LSTM_LOOKBACK, len(FORECAST_FEATURES)), (LSTM_LOOKBACK, len(FORECAST_FEATURES))
+
+
+def median_ms(predict, X: np.ndarray, repeats: int) -> float:
+    predict(X)  # Warm-up (graph tracing, tensor allocation)
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(X)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="autoencoder", choices=["autoencoder", "forecaster"])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 8, 32, 128, 512])
+    parser.add_argument("--backends", nargs="+", default=list(RUNNERS), choices=list(RUNNERS))
+    parser.add_argument("--threads", type=int, default=1, help="Intra-op threads of the exported runners")
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    keras_model, shape = build_model(args.model)
+    predictors = {"keras": keras_model.predict_on_batch}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for backend in args.backends:
+            missing = [p for p in BACKEND_PACKAGES[backend] if importlib.util.find_spec(p) is None]
+            if missing:
+                print(f"{backend}: skipped, {', '.join(missing)} not installed")
+                continue
+            path = f"{tmp}/model.{backend}"
+            with open(path, "wb") as f:
+                f.write(export_model(keras_model, backend))
+            predictors[backend] = load_runner(backend, path, threads=args.threads).predict_on_batch
+
+        rng = np.random.default_rng(42)
+        results: List[Dict] = []
+        print(f"{args.model} {shape}, {args.threads} runner threads")
+        print(f"{'batch':<8}{'backend':<10}{'ms':>10}{'windows/s':>12}{'speedup':>10}{'max diff':>12}")
+        for batch_size in args.batch_sizes:
+            X = rng.normal(0, 1, (batch_size, *shape)).astype(np.float32)
+            expected = np.asarray(keras_model.predict_on_batch(X))
+            keras_ms = None
+            for backend, predict in predictors.items():
+                ms = median_ms(predict, X, args.repeats)
+                keras_ms = keras_ms or ms
+                diff = float(np.abs(np.asarray(predict(X)) - expected).max())
+                results.append({"batch_size": batch_size, "backend": backend, "ms": ms, "max_diff": diff})
+                print(f"{batch_size:<8}{backend:<10}{ms:>10.2f}{batch_size / ms * 1000:>12.0f}{keras_ms / ms:>9.1f}x{diff:>12.1e}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark: LSTM window generation (Python loop vs strided views)
+
+Synthetic daily demand for many SKUs over several years, windowed with
+the original per-window loop and with the sliding_window_view utilities.
+The loop runs on a subset of SKUs and is extrapolated, since at full scale
+it needs gigabytes of memory.
+
+Usage:
+    python -m benchmarks.bench_lstm_windows --skus 2000 --days 1095
+"""
+
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from typing import Callable, Dict, List
+
+from src.utils.windows import window_targets, iter_window_batches
+
+LOOKBACK = 30
+N_FEATURES = 3
+
+
+def make_series(n_skus: int, n_days: int, seed: int = 42) -> List[np.ndarray]:
+    """Synthetic (n_days, 3) float32 feature arrays with weekly seasonality"""
+    rng = np.random.default_rng(seed)
+    weekly = 1 + 0.2 * np.sin(np.arange(n_days) * 2 * np.pi / 7)
+    return [
+        (rng.uniform(20, 500) * weekly[:, None] + rng.normal(0, 5, (n_days, N_FEATURES))).astype(np.float32)
+        for _ in range(n_skus)
+    ]
+
+
+def loop_windows(series: List[np.ndarray]) -> int:
+    """Original DemandForecaster._prepare_lstm_data loop (copies every window)"""
+    n_windows = 0
+    for data in series:
+        X, y = [], []
+        for i in range(LOOKBACK, len(data)):
+            X.append(data[i - LOOKBACK:i])
+            y.append(data[i])
+        X, y = np.array(X), np.array(y)
+        n_windows += len(X)
+    return n_windows
+
+
+def view_windows(series: List[np.ndarray]) -> int:
+    """Strided views per series (what _prepare_lstm_data returns now)"""
+    return sum(len(window_targets(data, LOOKBACK)[0]) for data in series)
+
+
+def batched_windows(series: List[np.ndarray], batch_size: int = 1024) -> int:
+    """Materialized training batches across all series"""
+    return sum(len(X) for X, _ in iter_window_batches(series, LOOKBACK, batch_size=batch_size))
+
+
+def measure(fn: Callable, series: List[np.ndarray]) -> Dict:
+    """Wall time and peak traced memory of one run"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    n_windows = fn(series)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"windows": n_windows, "seconds": elapsed, "peak_mb": peak / 1e6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=3 * 365)
+    parser.add_argument("--loop-skus", type=int, default=100, help="SKUs run through the Python loop")
+    args = parser.parse_args()
+
+    series = make_series(args.skus, args.days)
+    loop_skus = min(args.loop_skus, args.skus)
+    scale = args.skus / loop_skus
+
+    loop = measure(loop_windows, series[:loop_skus])
+    views = measure(view_windows, series)
+    batches = measure(batched_windows, series)
+
+    print(f"{args.skus} SKUs x {args.days} days, lookback {LOOKBACK}, {N_FEATURES} features")
+    print(f"{'method':<24}{'windows':>12}{'seconds':>12}{'peak MB':>12}")
+    print(f"{'loop (extrapolated)':<24}{int(loop['windows'] * scale):>12}"
+          f"{loop['seconds'] * scale:>12.3f}{loop['peak_mb']:>12.1f}")
+    for name, result in (("strided views", views), ("batches (1024)", batches)):
+        print(f"{name:<24}{result['windows']:>12}{result['seconds']:>12.3f}{result['peak_mb']:>12.1f}")
+
+    # The loop copies every window; holding them for training needs all of it at once
+    copied_mb = loop['windows'] * scale * LOOKBACK * N_FEATURES * np.dtype(np.float32).itemsize / 1e6
+    print(f"loop copies {copied_mb:.0f} MB of windows in total; views copy none")
+    print(f"speedup (views): {loop['seconds'] * scale / views['seconds']:.0f}x, "
+          f"(batches): {loop['seconds'] * scale / batches['seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
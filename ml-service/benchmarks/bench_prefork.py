@@ -0,0 +1,171 @@
+"""
+Benchmark: memory per worker and throughput, pre-fork vs uvicorn workers
+
+Trains per-series forests into a temporary registry, then serves it with
+N workers in both modes:
+
+- uvicorn: `uvicorn --workers N`, every worker loads its own models
+- prefork: `python -m src.serve --workers N`, models loaded once before fork
+
+and drives /api/ml/detect-anomaly from concurrent clients. Reports
+requests/s and, per worker, RSS, PSS (shared pages split between the
+processes mapping them) and private memory from /proc/<pid>/smaps_rollup.
+
+Usage:
+    python -m benchmarks.bench_prefork --skus 200 --workers 4 --seconds 20 --clients 16
+"""
+
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from typing import Dict, List
+
+from benchmarks.generators import inventory_history, to_points
+
+MODES = ("uvicorn", "prefork")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def worker_pids(parent: int) -> List[int]:
+    """Direct children of the server process (its workers)"""
+    pids = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+                with open(f"/proc/{entry}/cmdline") as f:
+                    cmdline = f.read()
+            except OSError:
+                continue
+            if ppid == parent and "resource_tracker" not in cmdline:
+                pids.append(int(entry))
+    return pids
+
+
+def memory_mb(pid: int) -> Dict[str, float]:
+    """RSS, PSS and private memory of a process (MB)"""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                values[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    return {
+        "rss": values["Rss"],
+        "pss": values["Pss"],
+        "private": values["Private_Clean"] + values["Private_Dirty"],
+    }
+
+
+def post(url: str, payload: bytes) -> None:
+    request = urllib.request.Request(url, payload, {"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        response.read()
+
+
+def drive(url: str, payloads: List[bytes], seconds: float, clients: int) -> float:
+    """Requests per second over `seconds` from `clients` concurrent clients"""
+    done = [0] * clients
+    deadline = time.monotonic() + seconds
+
+    def client(i: int):
+        while time.monotonic() < deadline:
+            post(url, payloads[(i + done[i] * clients) % len(payloads)])
+            done[i] += 1
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sum(done) / (time.monotonic() - start)
+
+
+def run_mode(mode: str, registry: str, workers: int, payloads: List[bytes], seconds: float, clients: int) -> Dict:
+    port = free_port()
+    if mode == "uvicorn":
+        command = ["-m", "uvicorn", "src.main:app", "--workers", str(workers), "--port", str(port), "--log-level", "warning"]
+    else:
+        command = ["-m", "src.serve", "--workers", str(workers), "--port", str(port), "--log-level", "warning"]
+
+    # Result cache off, so every request scores
+    env = {**os.environ, "MODEL_REGISTRY_DIR": registry, "RESULT_CACHE_BACKEND": "none"}
+    server = subprocess.Popen([sys.executable, *command], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + 120
+        while True:
+            try:
+                with urllib.request.urlopen(f"{base}/health", timeout=5):
+                    break
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{mode} server did not start")
+                time.sleep(0.5)
+
+        drive(f"{base}/api/ml/detect-anomaly", payloads, min(seconds, 5), clients)  # Warm-up (lazy loads, first fits)
+        throughput = drive(f"{base}/api/ml/detect-anomaly", payloads, seconds, clients)
+
+        memory = [memory_mb(pid) for pid in worker_pids(server.pid)]
+        return {
+            "mode": mode,
+            "requests_per_second": throughput,
+            "workers": len(memory),
+            **{key: sum(m[key] for m in memory) / max(1, len(memory)) for key in ("rss", "pss", "private")},
+        }
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skus", type=int, default=200)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=MODES)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    from src.training.jobs import train_artifact
+
+    data = inventory_history(args.skus, args.days)
+    payloads = [
+        json.dumps({"data_points": to_points(series)}).encode()
+        for _, series in data.groupby("sku", sort=False)
+    ]
+
+    results = []
+    with tempfile.TemporaryDirectory() as registry:
+        train_artifact("anomaly_forests", data, registry, {})
+        print(f"{args.skus} series x {args.days} days, {args.workers} workers, {args.clients} clients, {os.cpu_count()} CPUs")
+        print(f"{'mode':<10}{'req/s':>10}{'RSS MB':>10}{'PSS MB':>10}{'private MB':>12}  (per worker)")
+        for mode in args.modes:
+            result = run_mode(mode, registry, args.workers, payloads, args.seconds, args.clients)
+            results.append(result)
+            print(f"{mode:<10}{result['requests_per_second']:>10.1f}{result['rss']:>10.0f}{result['pss']:>10.0f}{result['private']:>12.0f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Synthetic inventory data for benchmarks
+
+Modeled on the test fixtures (quantity ~ N(100, 10), price ~ N(50, 2), one
+supplier and warehouse per SKU) but at catalogue scale: many SKUs, long
+daily histories, weekly seasonality and injected anomalies. Every generator
+is seeded so runs are reproducible.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+START_DATE = "2023-01-01"
+
+
+def inventory_history(
+    n_skus: int,
+    n_days: int,
+    spike_rate: float = 0.01,
+    n_suppliers: int = 20,
+    n_warehouses: int = 5,
+    seed: int = 42,
+) -> pd.DataFrame:
+    """
+    Long-format inventory history for anomaly detection
+
+    - quantity ~ N(100, 10) and price ~ N(50, 2) scaled per SKU
+    - `spike_rate` of rows get a 3x price spike or an impossible negative quantity
+    - The last row of every 10th SKU is a price spike (as in the fixtures)
+
+    Returns:
+        DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = n_skus * n_days
+
+    price_scale = np.repeat(rng.uniform(0.5, 2.0, n_skus), n_days)
+    quantity = rng.normal(100, 10, n_rows).astype(int)
+    price = rng.normal(50, 2, n_rows) * price_scale
+
+    # Injected anomalies
+    spikes = rng.random(n_rows) < spike_rate
+    negative = spikes & (rng.random(n_rows) < 0.3)
+    price[spikes & ~negative] *= 3
+    quantity[negative] = -50
+    last_rows = np.arange(0, n_skus, 10) * n_days + n_days - 1
+    price[last_rows] = 150 * price_scale[last_rows]
+
+    skus = np.arange(n_skus)
+    return pd.DataFrame({
+        "timestamp": np.tile(pd.date_range(START_DATE, periods=n_days, freq="D"), n_skus),
+        "sku": np.repeat([f"SKU{i:05d}" for i in skus], n_days),
+        "quantity": quantity,
+        "price": price,
+        "supplier_id": np.repeat([f"SUP{i % n_suppliers:03d}" for i in skus], n_days),
+        "warehouse_id": np.repeat([f"WH{i % n_warehouses:03d}" for i in skus], n_days),
+    })
+
+
+def demand_history(n_skus: int, n_days: int, sparse_every: int = 0, seed: int = 42) -> pd.DataFrame:
+    """
+    Long-format daily demand with weekly seasonality for forecasting
+
+    Args:
+        sparse_every: Every n-th SKU sells on roughly one day in four (0 = none)
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(START_DATE, periods=n_days, freq="D")
+    weekly = 1 + 0.2 * np.sin(np.arange(n_days) * 2 * np.pi / 7)
+    base = rng.uniform(20, 500, n_skus)
+    quantity = np.maximum(0, base[:, None] * weekly + rng.normal(0, 5, (n_skus, n_days))).round()
+
+    if sparse_every:
+        sparse = np.arange(n_skus) % sparse_every == 0
+        quantity[sparse] *= rng.random((sparse.sum(), n_days)) < 0.25
+
+    return pd.DataFrame({
+        "timestamp": np.tile(dates, n_skus),
+        "sku": np.repeat([f"SKU{i:05d}" for i in range(n_skus)], n_days),
+        "quantity": quantity.ravel().astype(int),
+        "price": rng.normal(50, 2, n_skus * n_days),
+        "supplier_id": "SUP001",
+        "warehouse_id": "WH001",
+    })
+
+
+def to_points(data: pd.DataFrame) -> List[Dict]:
+    """Row-format JSON data points (as sent to the API)"""
+    out = data.assign(timestamp=data["timestamp"].dt.strftime("%Y-%m-%dT%H:%M:%S"))
+    return out.to_dict(orient="records")
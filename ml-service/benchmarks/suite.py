@@ -0,0 +1,466 @@
+"""
+Benchmark suite for the ML service hot paths
+
+Times the model pipeline (feature engineering, anomaly detection, demand
+forecasting, LSTM window preparation) and the HTTP endpoints end-to-end on
+seeded synthetic data (see generators.py). Results are written as JSON and
+can be compared against a previous run to catch regressions in latency,
+throughput and peak memory.
+
+Usage:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --profile full --only detect forecast_fast
+    python -m benchmarks.suite --output new.json --compare baseline.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from benchmarks.generators import demand_history, inventory_history, to_points
+
+# Sizes per profile: quick for CI and local checks, full for release comparisons
+PROFILES = {
+    "quick": {
+        "repeats": 5,
+        "detect_rows": 60,
+        "feature_days": 365,
+        "batch_skus": 50,
+        "forecast_days": 180,
+        "lstm_skus": 50,
+        "lstm_days": 3 * 365,
+        "prophet_repeats": 2,
+    },
+    "full": {
+        "repeats": 20,
+        "detect_rows": 60,
+        "feature_days": 3 * 365,
+        "batch_skus": 1000,
+        "forecast_days": 180,
+        "lstm_skus": 1000,
+        "lstm_days": 3 * 365,
+        "prophet_repeats": 5,
+    },
+}
+
+# Metrics compared between runs: (key, higher is better)
+COMPARED_METRICS = (
+    ("median_seconds", False),
+    ("throughput", True),
+    ("peak_mb", False),
+)
+
+# Run(i) -> None for the i-th call; setup returns it with the items processed per call
+Runner = Callable[[int], Any]
+
+
+@dataclass
+class Case:
+    """One benchmark: setup builds the runner and reports items per call"""
+    name: str
+    setup: Callable[["Context"], Tuple[Runner, int]]
+    unit: str = "rows"
+    repeats_param: str = "repeats"
+
+
+CASES: List[Case] = []
+
+
+def case(name: str, unit: str = "rows", repeats_param: str = "repeats"):
+    """Register a benchmark case"""
+    def register(setup):
+        CASES.append(Case(name, setup, unit, repeats_param))
+        return setup
+    return register
+
+
+def quiet_logs():
+    """Per-request and per-fit logs would dominate the output and the timings"""
+    for name in ("ml-service", "cmdstanpy", "prophet", "src"):
+        logging.getLogger(name).setLevel(logging.ERROR)
+
+
+class Context:
+    """Models and HTTP client shared by the cases of one run"""
+
+    def __init__(self, params: Dict):
+        self.params = params
+        self._client = None
+
+        quiet_logs()
+
+    def detector(self):
+        from src.models.anomaly_detector import AnomalyDetector
+
+        detector = AnomalyDetector()
+        asyncio.run(detector.initialize())
+        return detector
+
+    def forecaster(self, engine: str):
+        from src.config import Settings
+        from src.models.backends import get_prophet
+        from src.models.demand_forecaster import DemandForecaster
+
+        forecaster = DemandForecaster(Settings(forecast_engine=engine))
+        asyncio.run(forecaster.initialize())
+        if engine == "prophet":
+            get_prophet()  # Import now (and silence its loggers) rather than in the first timed call
+            quiet_logs()
+        return forecaster
+
+    @property
+    def client(self):
+        """TestClient with startup events run (created on first HTTP case)"""
+        if self._client is None:
+            from fastapi.testclient import TestClient
+            from src.config import get_settings
+            from src.main import app
+
+            quiet_logs()  # After importing src.main: setup_logger() resets the level
+            get_settings().result_cache_backend = "none"  # Repeated payloads must reach the models
+            self._client = TestClient(app)
+            self._client.__enter__()
+        return self._client
+
+    def close(self):
+        if self._client is not None:
+            self._client.__exit__(None, None, None)
+
+
+def distinct_series(data, n_runs: int):
+    """Split a multi-SKU frame into one frame per SKU (a fresh series per call defeats model caches)"""
+    return [frame for _, frame in data.groupby("sku", sort=False)][:n_runs]
+
+
+# Model pipeline
+
+@case("engineer_features")
+def bench_engineer_features(ctx: Context):
+    detector = ctx.detector()
+    df = inventory_history(1, ctx.params["feature_days"])
+    return (lambda i: detector._engineer_features(df)), len(df)
+
+
+@case("detect")
+def bench_detect(ctx: Context):
+    """Warm path: the series' forest is fitted during warmup"""
+    detector = ctx.detector()
+    df = inventory_history(1, ctx.params["detect_rows"])
+    return (lambda i: detector.detect_sync(df)), len(df)
+
+
+@case("detect_cold")
+def bench_detect_cold(ctx: Context):
+    """A new series per call: includes the Isolation Forest fit"""
+    detector = ctx.detector()
+    n_runs = ctx.params["repeats"] + 2
+    series = distinct_series(inventory_history(n_runs, ctx.params["detect_rows"]), n_runs)
+    return (lambda i: detector.detect_sync(series[i])), ctx.params["detect_rows"]
+
+
+@case("detect_batch")
+def bench_detect_batch(ctx: Context):
+    detector = ctx.detector()
+    df = inventory_history(ctx.params["batch_skus"], ctx.params["detect_rows"])
+    return (lambda i: detector.detect_batch_sync(df)), len(df)
+
+
+def concurrent_detect(ctx: Context, max_batch_size: int) -> Tuple[Runner, int]:
+    """A burst of concurrent single-series requests through a MicroBatcher"""
+    from src.utils.batcher import MicroBatcher
+    from src.utils.executor import ModelExecutor
+
+    detector = ctx.detector()
+    n_series = ctx.params["batch_skus"]
+    series = distinct_series(inventory_history(n_series, ctx.params["detect_rows"]), n_series)
+    batcher = MicroBatcher(ModelExecutor("bench", max_workers=1), detector, "detect_many_sync", max_batch_size=max_batch_size)
+
+    async def burst():
+        await asyncio.gather(*(batcher.submit((df, 0.05)) for df in series))
+    return (lambda i: asyncio.run(burst())), n_series
+
+
+@case("detect_concurrent", unit="requests")
+def bench_detect_concurrent(ctx: Context):
+    return concurrent_detect(ctx, max_batch_size=32)
+
+
+@case("detect_concurrent_unbatched", unit="requests")
+def bench_detect_concurrent_unbatched(ctx: Context):
+    return concurrent_detect(ctx, max_batch_size=1)
+
+
+@case("forecast_fast")
+def bench_forecast_fast(ctx: Context):
+    forecaster = ctx.forecaster("fast")
+    df = demand_history(1, ctx.params["forecast_days"])
+    return (lambda i: forecaster.forecast_sync(df, horizon=14)), len(df)
+
+
+@case("forecast_prophet", repeats_param="prophet_repeats")
+def bench_forecast_prophet(ctx: Context):
+    """A new series per call: includes the Stan fit"""
+    forecaster = ctx.forecaster("prophet")
+    n_runs = ctx.params["prophet_repeats"] + 2
+    series = distinct_series(demand_history(n_runs, ctx.params["forecast_days"]), n_runs)
+    return (lambda i: forecaster.forecast_sync(series[i], horizon=14)), ctx.params["forecast_days"]
+
+
+@case("forecast_batch_fast")
+def bench_forecast_batch_fast(ctx: Context):
+    forecaster = ctx.forecaster("fast")
+    df = demand_history(ctx.params["batch_skus"], ctx.params["forecast_days"], sparse_every=10)
+    return (lambda i: forecaster.forecast_batch_sync(df, horizon=14)), len(df)
+
+
+@case("backtest_fast")
+def bench_backtest_fast(ctx: Context):
+    """Rolling-origin backtest (4 folds) of the fast and seasonal naive engines"""
+    forecaster = ctx.forecaster("fast")
+    df = demand_history(ctx.params["batch_skus"], ctx.params["forecast_days"], sparse_every=10)
+    engines = ("fast", "seasonal_naive")
+    return (lambda i: forecaster.backtest_sync(df, horizon=14, folds=4, engines=engines)), len(df)
+
+
+@case("prepare_lstm_data")
+def bench_prepare_lstm_data(ctx: Context):
+    forecaster = ctx.forecaster("fast")
+    df = demand_history(1, ctx.params["lstm_days"])
+    return (lambda i: forecaster._prepare_lstm_data(df)), len(df)
+
+
+@case("prepare_lstm_batches")
+def bench_prepare_lstm_batches(ctx: Context):
+    forecaster = ctx.forecaster("fast")
+    df = demand_history(ctx.params["lstm_skus"], ctx.params["lstm_days"])
+    return (lambda i: sum(len(X) for X, _ in forecaster._prepare_lstm_batches(df))), len(df)
+
+
+# HTTP endpoints (in-process, including validation and serialization)
+
+def post(ctx: Context, url: str, payload: Dict) -> Runner:
+    def run(i):
+        response = ctx.client.post(url, json=payload)
+        assert response.status_code == 200, response.text
+    return run
+
+
+@case("http_detect_anomaly")
+def bench_http_detect_anomaly(ctx: Context):
+    points = to_points(inventory_history(1, ctx.params["detect_rows"]))
+    return post(ctx, "/api/ml/detect-anomaly", {"data_points": points}), len(points)
+
+
+@case("http_detect_anomaly_batch")
+def bench_http_detect_anomaly_batch(ctx: Context):
+    points = to_points(inventory_history(ctx.params["batch_skus"], ctx.params["detect_rows"]))
+    return post(ctx, "/api/ml/detect-anomaly/batch", {"data_points": points}), len(points)
+
+
+@case("http_detect_anomaly_point")
+def bench_http_detect_anomaly_point(ctx: Context):
+    history = inventory_history(1, ctx.params["detect_rows"] + 100)
+    points = to_points(history)
+    seed = points[:ctx.params["detect_rows"]]
+    ctx.client.post("/api/ml/detect-anomaly", json={"data_points": seed})
+
+    def run(i):
+        response = ctx.client.post("/api/ml/detect-anomaly/point", json={"data_point": points[len(seed) + i]})
+        assert response.status_code == 200, response.text
+    return run, 1
+
+
+@case("http_detect_anomaly_stored")
+def bench_http_detect_anomaly_stored(ctx: Context):
+    """Only the new observation is sent; the history is read from the history store"""
+    history = inventory_history(1, ctx.params["detect_rows"] + 100)
+    points = to_points(history)
+    seed = points[:ctx.params["detect_rows"]]
+    ctx.client.post("/api/ml/history", json={"data_points": seed})
+    key = {"sku": seed[0]["sku"], "warehouse_id": seed[0]["warehouse_id"]}
+
+    def run(i):
+        payload = {"stored_series": key, "data_points": [points[len(seed) + i]]}
+        response = ctx.client.post("/api/ml/detect-anomaly", json=payload)
+        assert response.status_code == 200, response.text
+    return run, ctx.params["detect_rows"]
+
+
+@case("http_forecast_demand")
+def bench_http_forecast_demand(ctx: Context):
+    points = to_points(demand_history(1, ctx.params["forecast_days"]))
+    return post(ctx, "/api/ml/forecast-demand", {"historical_data": points, "forecast_horizon": 14}), len(points)
+
+
+def measure(run: Runner, items: int, repeats: int, warmup: int = 1) -> Dict:
+    """
+    Latency percentiles, throughput and peak memory of a runner
+
+    Timed runs are not traced; one extra run under tracemalloc gives the
+    peak of Python/NumPy allocations.
+    """
+    calls = 0
+    for _ in range(warmup):
+        run(calls)
+        calls += 1
+
+    gc.collect()
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run(calls)
+        seconds.append(time.perf_counter() - start)
+        calls += 1
+
+    tracemalloc.start()
+    run(calls)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    median = statistics.median(seconds)
+    return {
+        "items": items,
+        "repeats": repeats,
+        "min_seconds": min(seconds),
+        "median_seconds": median,
+        "p95_seconds": float(np.percentile(seconds, 95)),
+        "throughput": items / median if median > 0 else float("inf"),
+        "peak_mb": peak / 1e6,
+    }
+
+
+def environment() -> Dict:
+    """Versions and machine details recorded with the results"""
+    import pandas
+    import sklearn
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "git_commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "scikit-learn": sklearn.__version__,
+    }
+
+
+def run_suite(profile: str = "quick", only: Optional[List[str]] = None) -> Dict:
+    """Run the selected cases and return the results document"""
+    params = PROFILES[profile]
+    selected = [c for c in CASES if not only or c.name in only]
+
+    ctx = Context(params)
+    results = {}
+    try:
+        for bench in selected:
+            run, items = bench.setup(ctx)
+            results[bench.name] = {"unit": bench.unit, **measure(run, items, params[bench.repeats_param])}
+            r = results[bench.name]
+            print(
+                f"{bench.name:<28}{r['median_seconds'] * 1000:>10.2f} ms"
+                f"{r['throughput']:>14.0f} {bench.unit}/s{r['peak_mb']:>10.1f} MB",
+                file=sys.stderr,
+            )
+    finally:
+        ctx.close()
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "profile": profile,
+        "params": params,
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = 0.15) -> List[Dict]:
+    """
+    Compare two result documents
+
+    Returns:
+        One row per case and metric with the relative change; `regression` is
+        set when a metric got worse by more than `threshold` (0.15 = 15%)
+    """
+    rows = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            continue
+
+        for metric, higher_is_better in COMPARED_METRICS:
+            before, after = base[metric], result[metric]
+            change = (after - before) / before if before else 0.0
+            worse = -change if higher_is_better else change
+            rows.append({
+                "case": name,
+                "metric": metric,
+                "baseline": before,
+                "current": after,
+                "change": change,
+                "regression": worse > threshold,
+            })
+
+    return rows
+
+
+def print_comparison(rows: List[Dict]) -> None:
+    print(f"{'case':<28}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(
+            f"{row['case']:<28}{row['metric']:<16}{row['baseline']:>12.4g}{row['current']:>12.4g}"
+            f"{row['change'] * 100:>9.1f}%{flag}"
+        )
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--only", nargs="+", choices=[c.name for c in CASES], help="Cases to run (default: all)")
+    parser.add_argument("--output", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.15, help="Relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.profile, args.only)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("profile") != results["profile"]:
+            print(f"warning: comparing profile '{results['profile']}' against '{baseline.get('profile')}'")
+
+        rows = compare(baseline, results, args.threshold)
+        print_comparison(rows)
+        sys.exit(1 if any(row["regression"] for row in rows) else 0)
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Runtime configuration for ML Service
+
+Values are read from environment variables (or a local .env file),
+e.g. ANOMALY_FOREST_SEGMENT=supplier.
+"""
+
+from functools import lru_cache
+from typing import Literal, Optional
+from pydantic import model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from src.utils.threads import threads_per_worker
+
+
+class Settings(BaseSettings):
+    """ML Service settings"""
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore", protected_namespaces=("settings_",))
+
+    # Model registry (fitted artifacts persisted on local disk)
+    model_registry_dir: Optional[str] = None  # Disabled when unset
+    model_registry_lazy_load: bool = True  # Load artifacts on first use instead of at startup
+    model_registry_keep_versions: int = 10  # Versions of a model kept when saving a new one (served ones are never deleted)
+
+    # Hot model swaps: seconds a replaced version may take to finish its requests
+    model_swap_drain_timeout_seconds: float = 30.0
+
+    # Pre-fork serving (python -m src.serve): worker processes per host, and
+    # sklearn/BLAS/TensorFlow threads per worker (CPU count / serving_workers when unset).
+    # History, streaming state, training jobs and model swaps are per process, so their
+    # endpoints answer 503 with more than one worker (src.main.single_worker)
+    serving_workers: int = 1
+    model_threads: Optional[int] = None
+
+    # Import TensorFlow/Prophet at startup instead of on first use
+    warm_frameworks: bool = False
+
+    # LSTM inference: keras, or onnx/tflite to serve exported copies without TensorFlow
+    # (python -m src.models.inference; versions without the export are served with Keras)
+    lstm_inference_backend: Literal["keras", "onnx", "tflite"] = "keras"
+
+    # Model executors (CPU-bound work off the event loop)
+    anomaly_executor_kind: str = "thread"  # thread, process
+    anomaly_executor_workers: Optional[int] = None  # Defaults to worker_threads
+    anomaly_executor_max_pending: int = 64  # Beyond this, requests get HTTP 429
+    forecast_executor_kind: str = "thread"
+    forecast_executor_workers: Optional[int] = None
+    forecast_executor_max_pending: int = 32
+
+    # Micro-batching of concurrent /api/ml/detect-anomaly requests
+    anomaly_batch_max_size: int = 32  # Dispatch once this many requests wait (1 = no batching)
+    anomaly_batch_max_wait_ms: float = 2.0  # ...or this long after the first one
+
+    # Series per chunk when batch detection streams NDJSON
+    anomaly_stream_chunk_size: int = 64
+
+    # Bulk forecasting (catalogue-wide requests fan out across processes)
+    bulk_forecast_executor_kind: str = "process"
+    bulk_forecast_executor_workers: Optional[int] = None
+    bulk_forecast_executor_max_pending: int = 4
+    bulk_forecast_chunk_size: Optional[int] = None  # Series per chunk, auto when unset
+
+    # Background training jobs (POST /api/ml/training/jobs, requires model_registry_dir)
+    training_executor_kind: str = "process"  # Keeps training off the serving workers' GIL
+    training_executor_workers: int = 1  # Jobs trained at a time
+    training_max_jobs: int = 8  # Queued or running; beyond this, submissions get HTTP 429
+    training_job_history: int = 100  # Finished jobs kept for status queries
+
+    # Result cache (identical detect/forecast requests return the stored response)
+    result_cache_backend: str = "memory"  # memory, redis, none
+    result_cache_size: int = 10_000  # memory: max cached responses
+    result_cache_max_mb: float = 64.0  # memory: bound on cached responses
+    result_cache_ttl_seconds: Optional[float] = 300  # Recompute at least every 5 minutes
+    result_cache_redis_url: Optional[str] = None  # redis: e.g. redis://localhost:6379/0
+
+    # History store (callers send only new observations plus the series key)
+    history_store_dir: Optional[str] = None  # Memory-mapped column files; in memory when unset
+    history_store_window: int = 365  # Latest points read per request
+
+    # Anomaly detection
+    anomaly_contamination: float = 0.05
+    anomaly_forest_segment: str = "series"  # series, sku, supplier, warehouse, global
+    anomaly_forest_cache_size: int = 10_000  # Max fitted forests kept in memory
+    anomaly_forest_refit_interval_seconds: float = 24 * 3600  # Refit forests at least daily
+    anomaly_forest_refit_after_points: int = 500  # ...or once this many new points were scored
+    anomaly_feature_store_size: int = 100_000  # Series with streaming feature state kept in memory
+
+    # Demand forecasting
+    forecast_engine: str = "prophet"  # prophet, auto (opt in: route short/sparse histories to fast), fast
+    fast_forecast_max_days: int = 365  # auto: shorter histories use the fast NumPy engine
+    fast_forecast_min_zero_fraction: float = 0.3  # auto: ...as do histories with this share of zero-demand days
+    prophet_cache_size: int = 5000  # Max fitted Prophet models kept in memory
+    prophet_cache_max_mb: float = 512.0  # Memory bound for cached Prophet models
+    prophet_cache_ttl_seconds: Optional[float] = 24 * 3600  # Refit at least daily
+
+    @model_validator(mode='after')
+    def check_serving_workers(self):
+        # Every worker would map the same column files without a lock and overwrite each other's rows
+        if self.serving_workers > 1 and self.history_store_dir:
+            raise ValueError("HISTORY_STORE_DIR requires SERVING_WORKERS=1 (the history store is not shared between workers)")
+        return self
+
+    @property
+    def worker_threads(self) -> int:
+        """Threads one serving worker may use for model work"""
+        return self.model_threads or threads_per_worker(self.serving_workers)
+
+
+@lru_cache
+def get_settings() -> Settings:
+    """Get cached settings instance"""
+    return Settings()
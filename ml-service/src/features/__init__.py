@@ -0,0 +1,3 @@
+"""
+Feature engineering for ML Service models
+"""
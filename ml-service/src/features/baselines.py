@@ -0,0 +1,305 @@
+"""
+Supplier and warehouse baselines for anomaly context
+
+Per-supplier and per-warehouse price/quantity statistics (count, mean,
+std, quantiles) kept up to date as observations arrive, so detection adds
+group context with an O(1) lookup instead of scanning history:
+
+- Mean/std of a batch are merged into the running values per group
+  (parallel variance update), touching only the groups in the batch
+- Quantiles come from a fixed histogram per group over sign(x)*log1p(|x|)
+  (~5% relative resolution), recomputed for touched groups on update
+- Rows not newer than the latest timestamp seen for their sku/warehouse
+  series are skipped, so re-sent histories are not counted twice
+- The index is saved with the fitted forests (their features are z-scored
+  against it) and restored when they are loaded
+"""
+
+import copy
+import threading
+from typing import Dict, Hashable, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.features.engineering import series_codes, timestamp_ns
+from src.utils.ingest import SERIES_KEYS
+
+# Baseline level name -> grouping column
+BASELINE_LEVELS = {'supplier': 'supplier_id', 'warehouse': 'warehouse_id'}
+
+# Columns summarized per group, and reported quantiles
+VALUE_COLUMNS = ('price', 'quantity')
+QUANTILES = (0.05, 0.5, 0.95)
+
+# Groups with fewer observations give no baseline features
+MIN_BASELINE_COUNT = 30
+
+# Features added per row: z-score of each value against each level's baseline
+BASELINE_FEATURES = [f'{value}_{level}_zscore' for level in BASELINE_LEVELS for value in VALUE_COLUMNS]
+
+# Quantile histogram over signed log values (covers |x| up to ~1.2M)
+_BINS = 512
+_LOG_LIMIT = 14.0
+_BIN_WIDTH = 2 * _LOG_LIMIT / _BINS
+
+
+def _signed_log(values: np.ndarray) -> np.ndarray:
+    return np.sign(values) * np.log1p(np.abs(values))
+
+
+def _histogram_quantiles(hist: np.ndarray) -> np.ndarray:
+    """QUANTILES of (..., _BINS) histograms, interpolated within bins (NaN when empty)"""
+    cdf = np.cumsum(hist, axis=-1, dtype=np.float64)
+    total = cdf[..., -1:]
+    result = np.empty(hist.shape[:-1] + (len(QUANTILES),))
+
+    for i, q in enumerate(QUANTILES):
+        target = q * total
+        index = np.minimum((cdf < target).sum(axis=-1, keepdims=True), _BINS - 1)
+        below = np.take_along_axis(cdf, index, axis=-1) - np.take_along_axis(hist, index, axis=-1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fraction = np.clip((target - below) / np.take_along_axis(hist, index, axis=-1), 0.0, 1.0)
+        log_value = -_LOG_LIMIT + (index + fraction) * _BIN_WIDTH
+        result[..., i] = np.where(total > 0, np.sign(log_value) * np.expm1(np.abs(log_value)), np.nan)[..., 0]
+
+    return result
+
+
+class GroupBaselines:
+    """
+    Running price/quantity statistics of every group of one column
+
+    Groups are numbered on first sight; statistics live in arrays indexed
+    by group number (capacity doubles when full).
+    """
+
+    def __init__(self, column: str, capacity: int = 64):
+        self.column = column
+        self._codes: Dict[Hashable, int] = {}
+        self._labels: List[Hashable] = []
+        self.count = np.zeros(capacity, dtype=np.int64)
+        self.mean = np.zeros((capacity, len(VALUE_COLUMNS)))
+        self.m2 = np.zeros((capacity, len(VALUE_COLUMNS)))
+        self.hist = np.zeros((capacity, len(VALUE_COLUMNS), _BINS), dtype=np.int32)
+        self.quantiles = np.full((capacity, len(VALUE_COLUMNS), len(QUANTILES)), np.nan)
+
+    def _group_codes(self, labels: np.ndarray, register: bool) -> np.ndarray:
+        """Group number of each label (-1 for missing labels, or unknown ones when not registering)"""
+        codes, uniques = pd.factorize(labels)
+        mapping = np.empty(len(uniques) + 1, dtype=np.int64)
+        mapping[-1] = -1  # factorize marks missing labels with -1
+
+        for i, label in enumerate(uniques):
+            code = self._codes.get(label)
+            if code is None and register:
+                code = self._register(label)
+            mapping[i] = -1 if code is None else code
+
+        return mapping[codes]
+
+    def _register(self, label: Hashable) -> int:
+        code = len(self._labels)
+        self._codes[label] = code
+        self._labels.append(label)
+
+        if code == len(self.count):
+            for name in ('count', 'mean', 'm2', 'hist', 'quantiles'):
+                array = getattr(self, name)
+                fill = np.nan if name == 'quantiles' else 0
+                grown = np.full((2 * len(array),) + array.shape[1:], fill, dtype=array.dtype)
+                grown[:len(array)] = array
+                setattr(self, name, grown)
+
+        return code
+
+    def update(self, labels: np.ndarray, values: np.ndarray) -> None:
+        """Merge observations (rows of `values`, one column per VALUE_COLUMNS) into their groups"""
+        groups = self._group_codes(labels, register=True)
+        keep = groups >= 0
+        if not keep.any():
+            return
+
+        touched, inverse = np.unique(groups[keep], return_inverse=True)
+        values = values[keep]
+        n_touched = len(touched)
+
+        # Batch statistics per group
+        n_b = np.bincount(inverse, minlength=n_touched).astype(np.float64)
+        mean_b = np.column_stack([
+            np.bincount(inverse, weights=values[:, j], minlength=n_touched) for j in range(values.shape[1])
+        ]) / n_b[:, None]
+        m2_b = np.column_stack([
+            np.bincount(inverse, weights=(values[:, j] - mean_b[inverse, j]) ** 2, minlength=n_touched)
+            for j in range(values.shape[1])
+        ])
+
+        # Merge with the running statistics
+        n_a = self.count[touched].astype(np.float64)
+        n = n_a + n_b
+        delta = mean_b - self.mean[touched]
+        self.mean[touched] += delta * (n_b / n)[:, None]
+        self.m2[touched] += m2_b + delta ** 2 * (n_a * n_b / n)[:, None]
+        self.count[touched] += n_b.astype(np.int64)
+
+        # Histogram counts, then quantiles of the touched groups only
+        bins = np.clip(((_signed_log(values) + _LOG_LIMIT) / _BIN_WIDTH).astype(np.int64), 0, _BINS - 1)
+        flat = (inverse[:, None] * values.shape[1] + np.arange(values.shape[1])) * _BINS + bins
+        counts = np.bincount(flat.ravel(), minlength=n_touched * values.shape[1] * _BINS)
+        self.hist[touched] += counts.reshape(n_touched, values.shape[1], _BINS).astype(np.int32)
+        self.quantiles[touched] = _histogram_quantiles(self.hist[touched])
+
+    def zscores(self, labels: np.ndarray, values: np.ndarray) -> np.ndarray:
+        """(value - group mean) / group std per row and value (NaN without a baseline)"""
+        groups = self._group_codes(labels, register=False)
+        safe = np.maximum(groups, 0)
+        count = self.count[safe]
+        std = np.sqrt(self.m2[safe] / np.maximum(count, 1)[:, None])
+        std[std == 0] = 1.0
+
+        z = (values - self.mean[safe]) / std
+        z[(groups < 0) | (count < MIN_BASELINE_COUNT)] = np.nan
+        return z
+
+    def lookup(self, label: Hashable) -> Optional[Dict]:
+        """Baseline of one group (None if never seen)"""
+        code = self._codes.get(label)
+        if code is None:
+            return None
+
+        count = int(self.count[code])
+        baseline = {"count": count}
+        for j, value in enumerate(VALUE_COLUMNS):
+            baseline[f"{value}_mean"] = float(self.mean[code, j])
+            baseline[f"{value}_std"] = float(np.sqrt(self.m2[code, j] / count)) if count else float('nan')
+            for q, quantile in zip(QUANTILES, self.quantiles[code, j]):
+                baseline[f"{value}_p{round(q * 100):02d}"] = float(quantile)
+        return baseline
+
+    def __setstate__(self, state: Dict) -> None:
+        # Arrays may be memory-mapped read-only from the registry: updates need a private copy
+        for key, value in state.items():
+            setattr(self, key, np.array(value) if isinstance(value, np.ndarray) else value)
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+
+class BaselineIndex:
+    """
+    Per-supplier and per-warehouse baselines, updated incrementally
+
+    Thread-safe: detection runs on executor threads. Pickling copies a
+    consistent snapshot taken under the lock.
+    """
+
+    def __init__(self):
+        self.levels = {level: GroupBaselines(column) for level, column in BASELINE_LEVELS.items()}
+        self._last: Dict[Tuple, int] = {}  # Latest timestamp (ns) per sku/warehouse series
+        self._lock = threading.Lock()
+        self.observations = 0
+        self.skipped = 0
+
+    def __getstate__(self) -> Dict:
+        with self._lock:
+            return copy.deepcopy({key: value for key, value in self.__dict__.items() if key != '_lock'})
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def update(self, data: pd.DataFrame) -> int:
+        """
+        Add observations of any number of series
+
+        Args:
+            data: DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
+
+        Returns:
+            Number of rows added (rows already seen are skipped)
+        """
+        if data.empty:
+            return 0
+
+        codes = series_codes(data)
+        first_rows = np.unique(codes, return_index=True)[1]
+        keys = [
+            tuple(None if pd.isna(value) else value for value in row)
+            for row in data[SERIES_KEYS].to_numpy(dtype=object)[first_rows]
+        ]
+        return self._add(keys, codes, timestamp_ns(data['timestamp']), data)
+
+    def observe(self, observation: Mapping) -> int:
+        """Add one observation (dict with timestamp, sku, warehouse_id, supplier_id, price, quantity)"""
+        key = tuple(None if pd.isna(observation.get(col)) else observation.get(col) for col in SERIES_KEYS)
+        timestamps = np.array([pd.Timestamp(observation['timestamp']).value], dtype=np.int64)
+        return self._add([key], np.zeros(1, dtype=np.int64), timestamps, {
+            col: np.array([observation.get(col)]) for col in (*BASELINE_LEVELS.values(), *VALUE_COLUMNS)
+        })
+
+    def _add(self, keys: List[Tuple], codes: np.ndarray, timestamps: np.ndarray, columns: Mapping) -> int:
+        """Merge rows newer than their series' latest timestamp (codes index `keys`)"""
+        floor = np.iinfo(np.int64).min
+        with self._lock:
+            last = np.array([self._last.get(key, floor) for key in keys], dtype=np.int64)
+            new = timestamps > last[codes]
+
+            latest = np.full(len(keys), floor, dtype=np.int64)
+            np.maximum.at(latest, codes, timestamps)
+            for key, timestamp in zip(keys, latest):
+                self._last[key] = max(self._last.get(key, floor), int(timestamp))
+
+            n_new = int(new.sum())
+            self.skipped += len(new) - n_new
+            if n_new == 0:
+                return 0
+
+            values = np.column_stack([np.asarray(columns[col], dtype=np.float64)[new] for col in VALUE_COLUMNS])
+            finite = np.isfinite(values).all(axis=1)
+            for level in self.levels.values():
+                labels = np.asarray(columns[level.column], dtype=object)[new]
+                level.update(labels[finite], values[finite])
+
+            self.observations += n_new
+            return n_new
+
+    def features(self, data: pd.DataFrame) -> np.ndarray:
+        """BASELINE_FEATURES of every row, shape (rows, len(BASELINE_FEATURES))"""
+        return self._features({col: data[col].to_numpy() for col in (*BASELINE_LEVELS.values(), *VALUE_COLUMNS)})
+
+    def point_features(self, observation: Mapping) -> Dict[str, float]:
+        """BASELINE_FEATURES of one observation"""
+        row = self._features({col: np.array([observation.get(col)]) for col in (*BASELINE_LEVELS.values(), *VALUE_COLUMNS)})
+        return dict(zip(BASELINE_FEATURES, row[0].tolist()))
+
+    def _features(self, columns: Mapping[str, np.ndarray]) -> np.ndarray:
+        values = np.column_stack([np.asarray(columns[col], dtype=np.float64) for col in VALUE_COLUMNS])
+        with self._lock:
+            return np.hstack([
+                level.zscores(np.asarray(columns[level.column], dtype=object), values)
+                for level in self.levels.values()
+            ])
+
+    def lookup(self, level: str, key: Hashable) -> Optional[Dict]:
+        """
+        Baseline of one supplier or warehouse
+
+        Args:
+            level: "supplier" or "warehouse"
+            key: supplier_id or warehouse_id
+
+        Returns:
+            Dict with count and {price,quantity}_{mean,std,p05,p50,p95}, or None if never seen
+        """
+        with self._lock:
+            return self.levels[level].lookup(key)
+
+    def stats(self) -> Dict:
+        """Get index statistics"""
+        return {
+            **{f"{level}s": len(baselines) for level, baselines in self.levels.items()},
+            "series": len(self._last),
+            "observations": self.observations,
+            "skipped": self.skipped,
+        }
+
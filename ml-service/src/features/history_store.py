@@ -0,0 +1,323 @@
+"""
+Columnar time-series store for per-series histories
+
+Callers can send only new observations plus the series key instead of
+30-90+ days of JSON history on every request; the history is read from
+here. Rows of all series share one append-only log of compact columns:
+
+- series: int32 series code (-1 marks unused capacity)
+- timestamp: int64 epoch seconds (UTC)
+- quantity: int32
+- price: float32
+
+Each series keeps the positions of its rows, so reading the latest N
+points is one gather per column. With a directory, columns are
+memory-mapped files (grown by doubling) and the store reopens with its
+data after a restart.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.utils.ingest import FRAME_COLUMNS
+
+COLUMNS = {
+    'series': np.int32,
+    'timestamp': np.int64,
+    'quantity': np.int32,
+    'price': np.float32,
+}
+
+SeriesKey = Tuple[str, Optional[str]]  # (sku, warehouse_id)
+
+
+def _epoch_seconds(timestamps: pd.Series) -> np.ndarray:
+    """Epoch seconds of timestamps (naive values are taken as UTC)"""
+    ts = pd.to_datetime(timestamps)
+    if getattr(ts.dtype, 'tz', None) is not None:
+        ts = ts.dt.tz_convert(None)
+    return ts.to_numpy().astype('datetime64[s]').astype(np.int64)
+
+
+class HistoryStore:
+    """
+    Append-only per-series history in float32/int32 columns
+
+    Args:
+        path: Directory for memory-mapped column files (in memory when None)
+        initial_capacity: Rows allocated up front (capacity doubles when full)
+    """
+
+    def __init__(self, path: Optional[str] = None, initial_capacity: int = 1 << 16):
+        self.path = path
+        self._lock = threading.Lock()
+        self._codes: Dict[SeriesKey, int] = {}
+        self._keys: List[SeriesKey] = []
+        self._suppliers: List[Optional[str]] = []
+        self._positions: List[np.ndarray] = []  # Row positions per series (with spare capacity)
+        self._counts: List[int] = []
+        self._last: List[int] = []  # Latest timestamp per series
+        self._size = 0
+        self.skipped = 0
+
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._columns = self._open_files(initial_capacity)
+            self._load()
+        else:
+            self._columns = {name: np.empty(initial_capacity, dtype=dtype) for name, dtype in COLUMNS.items()}
+            self._columns['series'][:] = -1
+
+    # Disk layout
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name}.bin")
+
+    def _open_files(self, capacity: int) -> Dict[str, np.ndarray]:
+        """Map every column file, creating or growing it to at least `capacity` rows"""
+        columns = {}
+        for name, dtype in COLUMNS.items():
+            itemsize = np.dtype(dtype).itemsize
+            file = self._file(name)
+            existing = os.path.getsize(file) // itemsize if os.path.exists(file) else 0
+            rows = max(existing, capacity)
+            with open(file, 'ab') as f:
+                f.truncate(rows * itemsize)
+            columns[name] = np.memmap(file, dtype=dtype, mode='r+', shape=(rows,))
+            if name == 'series' and rows > existing:
+                columns[name][existing:] = -1
+        return columns
+
+    def _load(self) -> None:
+        """Rebuild the series index from the key file and the series column"""
+        keys_file = os.path.join(self.path, "series.ndjson")
+        if os.path.exists(keys_file):
+            with open(keys_file) as f:
+                for line in f:
+                    sku, warehouse_id, supplier_id = json.loads(line)
+                    code = self._code((sku, warehouse_id), persist=False)
+                    self._suppliers[code] = supplier_id
+
+        codes = self._columns['series']
+        unused = np.flatnonzero(codes < 0)
+        self._size = int(unused[0]) if len(unused) else len(codes)
+        if not self._keys:
+            return
+
+        used = np.asarray(codes[:self._size])
+        order = np.argsort(used, kind='stable')
+        counts = np.bincount(used, minlength=len(self._keys))
+        timestamps = self._columns['timestamp']
+        for code, positions in enumerate(np.split(order, np.cumsum(counts)[:-1])):
+            self._positions[code] = positions.astype(np.int64)
+            self._counts[code] = len(positions)
+            if len(positions):
+                self._last[code] = int(timestamps[positions[-1]])
+
+    def _code(self, key: SeriesKey, supplier_id: Optional[str] = None, persist: bool = True) -> int:
+        """Series code for key, registering new series (and supplier changes)"""
+        code = self._codes.get(key)
+        if code is None:
+            code = len(self._keys)
+            self._codes[key] = code
+            self._keys.append(key)
+            self._suppliers.append(supplier_id)
+            self._positions.append(np.empty(0, dtype=np.int64))
+            self._counts.append(0)
+            self._last.append(np.iinfo(np.int64).min)
+        elif supplier_id is None or supplier_id == self._suppliers[code]:
+            return code
+
+        self._suppliers[code] = supplier_id
+        if persist and self.path:
+            with open(os.path.join(self.path, "series.ndjson"), 'a') as f:
+                f.write(json.dumps([key[0], key[1], supplier_id]) + "\n")
+        return code
+
+    def _reserve(self, rows: int) -> None:
+        """Make room for `rows` more rows"""
+        capacity = len(self._columns['series'])
+        if self._size + rows <= capacity:
+            return
+
+        capacity = max(2 * capacity, self._size + rows)
+        if self.path:
+            for column in self._columns.values():
+                column.flush()
+            self._columns = self._open_files(capacity)
+            return
+
+        for name, column in self._columns.items():
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self._size] = column[:self._size]
+            if name == 'series':
+                grown[self._size:] = -1
+            self._columns[name] = grown
+
+    # Public API
+
+    def append(self, data: pd.DataFrame) -> Dict[str, int]:
+        """
+        Append observations of one or more series
+
+        Rows not newer than the latest stored timestamp of their series are
+        skipped, so retried requests do not duplicate history.
+
+        Args:
+            data: DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
+
+        Returns:
+            Dict with appended and skipped row counts
+        """
+        timestamps = _epoch_seconds(data['timestamp'])
+        keys = list(zip(data['sku'], data['warehouse_id']))
+        suppliers = data['supplier_id'].to_numpy()
+
+        with self._lock:
+            # Latest supplier per series, then one code per row
+            latest = {key: supplier for key, supplier in zip(keys, suppliers)}
+            codes_by_key = {key: self._code(key, supplier) for key, supplier in latest.items()}
+            codes = np.fromiter((codes_by_key[key] for key in keys), dtype=np.int64, count=len(keys))
+
+            order = np.lexsort((timestamps, codes))
+            codes, timestamps = codes[order], timestamps[order]
+            last = np.fromiter((self._last[code] for code in codes), dtype=np.int64, count=len(codes))
+            newer = timestamps > last
+            order, codes, timestamps = order[newer], codes[newer], timestamps[newer]
+
+            n_rows = len(order)
+            self._reserve(n_rows)
+            rows = slice(self._size, self._size + n_rows)
+            columns = self._columns
+            columns['timestamp'][rows] = timestamps
+            columns['quantity'][rows] = data['quantity'].to_numpy()[order]
+            columns['price'][rows] = data['price'].to_numpy()[order]
+            columns['series'][rows] = codes  # Written last: marks the rows as used
+
+            positions = np.arange(self._size, self._size + n_rows)
+            starts = np.flatnonzero(np.diff(codes, prepend=-1))
+            for start, end in zip(starts, np.append(starts[1:], n_rows)):
+                self._extend(int(codes[start]), positions[start:end])
+                self._last[codes[start]] = int(timestamps[end - 1])
+
+            self._size += n_rows
+            skipped = len(data) - n_rows
+            self.skipped += skipped
+
+        return {"appended": n_rows, "skipped": skipped}
+
+    def _extend(self, code: int, positions: np.ndarray) -> None:
+        """Add row positions to a series, doubling its index capacity"""
+        count = self._counts[code]
+        index = self._positions[code]
+        if count + len(positions) > len(index):
+            grown = np.empty(max(2 * len(index), count + len(positions), 16), dtype=np.int64)
+            grown[:count] = index[:count]
+            self._positions[code] = index = grown
+        index[count:count + len(positions)] = positions
+        self._counts[code] = count + len(positions)
+
+    def history(self, sku: str, warehouse_id: Optional[str] = None, last_n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Stored history of one series, oldest first
+
+        Args:
+            last_n: Only the latest `last_n` points
+
+        Returns:
+            DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
+
+        Raises:
+            KeyError: Series has no stored history
+        """
+        with self._lock:
+            code = self._codes[(sku, warehouse_id)]
+            count = self._counts[code]
+            positions = self._positions[code][max(0, count - last_n) if last_n else 0:count]
+            timestamps = self._columns['timestamp'][positions]
+            quantity = self._columns['quantity'][positions]
+            price = self._columns['price'][positions]
+            supplier_id = self._suppliers[code]
+
+        return pd.DataFrame(
+            {
+                'timestamp': timestamps.astype('datetime64[s]'),
+                'sku': sku,
+                'quantity': quantity,
+                'price': price,
+                'supplier_id': supplier_id,
+                'warehouse_id': warehouse_id,
+            },
+            columns=FRAME_COLUMNS,
+        )
+
+    def export(self, last_n: Optional[int] = None) -> pd.DataFrame:
+        """
+        Stored history of every series as one long-format frame (e.g. to train on)
+
+        Args:
+            last_n: Only the latest `last_n` points of each series
+
+        Returns:
+            DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id],
+            rows grouped by series, oldest first
+        """
+        with self._lock:
+            slices = [
+                self._positions[code][max(0, count - last_n) if last_n else 0:count]
+                for code, count in enumerate(self._counts)
+            ]
+            positions = np.concatenate(slices) if slices else np.empty(0, dtype=np.int64)
+            codes = np.repeat(np.arange(len(slices)), [len(s) for s in slices])
+            timestamps = self._columns['timestamp'][positions]
+            quantity = self._columns['quantity'][positions]
+            price = self._columns['price'][positions]
+            skus = np.array([key[0] for key in self._keys], dtype=object)
+            warehouses = np.array([key[1] for key in self._keys], dtype=object)
+            suppliers = np.array(self._suppliers, dtype=object)
+
+        return pd.DataFrame(
+            {
+                'timestamp': timestamps.astype('datetime64[s]'),
+                'sku': skus[codes],
+                'quantity': quantity,
+                'price': price,
+                'supplier_id': suppliers[codes],
+                'warehouse_id': warehouses[codes],
+            },
+            columns=FRAME_COLUMNS,
+        )
+
+    def __contains__(self, key: SeriesKey) -> bool:
+        return key in self._codes
+
+    def __len__(self) -> int:
+        return self._size
+
+    def flush(self) -> None:
+        """Write memory-mapped columns to disk"""
+        if self.path:
+            with self._lock:
+                for column in self._columns.values():
+                    column.flush()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by stored rows"""
+        return self._size * sum(np.dtype(dtype).itemsize for dtype in COLUMNS.values())
+
+    def stats(self) -> Dict:
+        """Get store statistics"""
+        return {
+            "series": len(self._keys),
+            "rows": self._size,
+            "capacity": len(self._columns['series']),
+            "bytes": self.nbytes,
+            "skipped": self.skipped,
+            "mmap": bool(self.path),
+        }
@@ -0,0 +1,241 @@
+"""
+Streaming feature state per series
+
+Keeps the rolling-window state behind the anomaly features (last values,
+7/30-point windows and running sums) so a new observation is featurized in
+O(1) without resending or re-scanning the series history.
+"""
+
+import math
+import numpy as np
+import pandas as pd
+from collections import deque
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence
+
+from src.utils.cache import LRUCache, StripedLock
+
+# Features produced per observation (same names as AnomalyDetector._engineer_features)
+FEATURE_COLUMNS = [
+    'price', 'quantity',
+    'price_change_rate', 'quantity_change_rate',
+    'price_rolling_7d', 'price_rolling_30d',
+    'quantity_rolling_7d', 'quantity_rolling_30d',
+    'price_deviation_7d', 'quantity_deviation_7d',
+]
+
+
+class RollingWindow:
+    """Ring buffer of the latest `size` values with an O(1) running sum"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.count = 0
+        self.total = 0.0
+        self._values: List[float] = [0.0] * size
+        self._pos = 0
+        self._pushes = 0
+
+    @classmethod
+    def from_values(cls, values: Sequence[float], size: int) -> "RollingWindow":
+        """Build window holding the last `size` values"""
+        window = cls(size)
+        for value in values[-size:]:
+            window.push(float(value))
+        return window
+
+    def push(self, value: float) -> None:
+        """Add newest value, dropping the oldest once full"""
+        if self.count == self.size:
+            self.total -= self._values[self._pos]
+        else:
+            self.count += 1
+
+        self._values[self._pos] = value
+        self.total += value
+        self._pos = (self._pos + 1) % self.size
+
+        # Re-sum once per rotation so floating point drift cannot accumulate
+        self._pushes += 1
+        if self._pushes % self.size == 0:
+            self.total = math.fsum(self._values[:self.count])
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else float('nan')
+
+    def contents(self) -> List[float]:
+        """Window values, oldest first"""
+        if self.count < self.size:
+            return self._values[:self.count]
+        return self._values[self._pos:] + self._values[:self._pos]
+
+
+def _pct_change(value: float, previous: Optional[float]) -> float:
+    """Same as pandas pct_change().fillna(0) for one step"""
+    if previous is None:
+        return 0.0
+    if previous == 0:
+        return 0.0 if value == 0 else math.copysign(math.inf, value)
+    return (value - previous) / previous
+
+
+def _deviation(value: float, rolling_mean: float) -> float:
+    return (value - rolling_mean) / (rolling_mean if rolling_mean != 0 else 1)
+
+
+class SeriesState:
+    """
+    Streaming feature state of one series
+
+    - Last price/quantity/timestamp (rate of change)
+    - 7/30-point ring buffers for price and quantity (rolling means)
+    - Last `window_size` vectors of `window_features` plus running mean/variance
+      (Welford), i.e. a standardized sequence-model window
+    """
+
+    def __init__(self, window_features: List[str], window_size: int):
+        self.window_features = window_features
+        self.last_timestamp: Optional[pd.Timestamp] = None
+        self.last_price: Optional[float] = None
+        self.last_quantity: Optional[float] = None
+        self.price_7d = RollingWindow(7)
+        self.price_30d = RollingWindow(30)
+        self.quantity_7d = RollingWindow(7)
+        self.quantity_30d = RollingWindow(30)
+        self.window: deque = deque(maxlen=window_size)
+        self.n_observations = 0
+        self._mean = np.zeros(len(window_features))
+        self._m2 = np.zeros(len(window_features))
+        self.latest: Optional[Dict[str, float]] = None
+
+    @classmethod
+    def from_history(cls, df: pd.DataFrame, window_features: List[str], window_size: int) -> "SeriesState":
+        """
+        Build state from an engineered, time-sorted series (vectorized)
+
+        Equivalent to replaying every row through update().
+        """
+        state = cls(window_features, window_size)
+        prices = df['price'].to_numpy(dtype=np.float64)
+        quantities = df['quantity'].to_numpy(dtype=np.float64)
+
+        state.last_timestamp = pd.Timestamp(df['timestamp'].iloc[-1])
+        state.last_price = float(prices[-1])
+        state.last_quantity = float(quantities[-1])
+        state.price_7d = RollingWindow.from_values(prices, 7)
+        state.price_30d = RollingWindow.from_values(prices, 30)
+        state.quantity_7d = RollingWindow.from_values(quantities, 7)
+        state.quantity_30d = RollingWindow.from_values(quantities, 30)
+
+        vectors = df[window_features].fillna(0).to_numpy(dtype=np.float64)
+        vectors[~np.isfinite(vectors)] = 0.0
+        state.window.extend(vectors[-window_size:])
+        state.n_observations = len(vectors)
+        state._mean = vectors.mean(axis=0)
+        state._m2 = vectors.var(axis=0) * len(vectors)
+
+        state.latest = {col: float(df[col].iloc[-1]) for col in FEATURE_COLUMNS}
+        return state
+
+    def update(self, timestamp: pd.Timestamp, price: float, quantity: float) -> Dict[str, float]:
+        """
+        Add a new observation and return its features in O(1)
+
+        Re-sent observations (same timestamp as the latest) are idempotent;
+        observations older than the latest are rejected. Timezone-aware
+        timestamps are converted to naive UTC, like ingest.naive_utc().
+        """
+        timestamp = pd.Timestamp(timestamp)
+        if timestamp.tz is not None:
+            timestamp = timestamp.tz_convert(None)
+        if self.last_timestamp is not None:
+            if timestamp == self.last_timestamp and self.latest is not None:
+                return self.latest
+            if timestamp < self.last_timestamp:
+                raise ValueError(f"Observation at {timestamp} is older than latest state ({self.last_timestamp})")
+
+        price, quantity = float(price), float(quantity)
+
+        self.price_7d.push(price)
+        self.price_30d.push(price)
+        self.quantity_7d.push(quantity)
+        self.quantity_30d.push(quantity)
+
+        features = {
+            'price': price,
+            'quantity': quantity,
+            'price_change_rate': _pct_change(price, self.last_price),
+            'quantity_change_rate': _pct_change(quantity, self.last_quantity),
+            'price_rolling_7d': self.price_7d.mean,
+            'price_rolling_30d': self.price_30d.mean,
+            'quantity_rolling_7d': self.quantity_7d.mean,
+            'quantity_rolling_30d': self.quantity_30d.mean,
+        }
+        features['price_deviation_7d'] = _deviation(price, features['price_rolling_7d'])
+        features['quantity_deviation_7d'] = _deviation(quantity, features['quantity_rolling_7d'])
+
+        # Sequence window + Welford running mean/variance
+        vector = np.array([features[col] for col in self.window_features], dtype=np.float64)
+        vector[~np.isfinite(vector)] = 0.0
+        self.window.append(vector)
+        self.n_observations += 1
+        delta = vector - self._mean
+        self._mean += delta / self.n_observations
+        self._m2 += delta * (vector - self._mean)
+
+        self.last_timestamp = timestamp
+        self.last_price = price
+        self.last_quantity = quantity
+        self.latest = features
+
+        return features
+
+    def standardized_window(self) -> Optional[np.ndarray]:
+        """Latest window standardized by the series mean/std (None until full)"""
+        if len(self.window) < self.window.maxlen:
+            return None
+
+        std = np.sqrt(self._m2 / self.n_observations)
+        std[std == 0] = 1.0
+
+        return ((np.stack(self.window) - self._mean) / std).astype(np.float32)
+
+
+class FeatureStore:
+    """
+    Streaming feature state for many series (least recently used evicted)
+
+    SeriesState is not thread-safe: callers reading or updating a series'
+    state hold `lock(key)` (update() and seed() take it themselves).
+    """
+
+    def __init__(self, window_features: List[str], window_size: int, max_series: int = 100_000):
+        self.window_features = window_features
+        self.window_size = window_size
+        self._states = LRUCache(max_entries=max_series)
+        self.lock = StripedLock()
+
+    def seed(self, key: Hashable, df: pd.DataFrame) -> SeriesState:
+        """Reset a series' state from its engineered history"""
+        state = SeriesState.from_history(df, self.window_features, self.window_size)
+        with self.lock(key):
+            self._states.set(key, state)
+        return state
+
+    def get(self, key: Hashable) -> Optional[SeriesState]:
+        return self._states.get(key)
+
+    def update(self, key: Hashable, observation: Mapping) -> Dict[str, float]:
+        """Featurize a new observation of a known series"""
+        with self.lock(key):
+            state = self._states.get(key)
+            if state is None:
+                raise KeyError(key)
+
+            return state.update(observation['timestamp'], observation['price'], observation['quantity'])
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def stats(self) -> Dict:
+        return self._states.stats()
@@ -3,16 +3,35 @@ SupplySync AI - ML Service
 Main FastAPI application for anomaly detection and demand forecasting
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
+import asyncio
+import json
 import logging
+import os
+import time
 from datetime import datetime
 
-from src.models.anomaly_detector import AnomalyDetector
+from src.config import get_settings
+from src.models.anomaly_detector import AnomalyDetector, FOREST_ARTIFACT
 from src.models.demand_forecaster import DemandForecaster
+from src.models.bulk_forecast import chunk_size_for
+from src.models.manager import ModelManager, ServedVersion
+from src.models.registry import ModelRegistry
+from src.models import backends
+from src.features.baselines import BASELINE_LEVELS
+from src.features.history_store import HistoryStore
+from src.training.jobs import JOB_KINDS, JobManager, check_job
+from src.utils.executor import ModelExecutor, ExecutorOverloaded
+from src.utils.batcher import MicroBatcher
+from src.utils.ingest import SERIES_KEYS, points_to_frame, columns_to_frame, series_chunks
 from src.utils.logger import setup_logger
+from src.utils.result_cache import create_result_cache, request_key
+from src.utils.metrics import REQUEST_ROWS, REQUEST_SECONDS, ServiceCollector, register_collector, render, stage
+from src.utils.threads import limit_threads, set_thread_env
 
 # Setup logging
 logger = setup_logger()
@@ -33,9 +52,115 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize ML models (lazy loading)
-anomaly_detector: Optional[AnomalyDetector] = None
-demand_forecaster: Optional[DemandForecaster] = None
+# Request latency per route template (streamed responses: time until headers are sent)
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    REQUEST_SECONDS.labels(
+        method=request.method,
+        endpoint=route.path if route else "unmatched",
+        status=response.status_code,
+    ).observe(time.perf_counter() - start)
+    return response
+
+
+# Served ML models: one active version per slot, hot-swapped by the model manager
+ANOMALY_DETECTOR = "anomaly_detector"
+DEMAND_FORECASTER = "demand_forecaster"
+SLOT_NAMES = {ANOMALY_DETECTOR: "Anomaly Detector", DEMAND_FORECASTER: "Demand Forecaster"}
+
+model_manager: Optional[ModelManager] = None
+model_registry: Optional[ModelRegistry] = None
+
+# Media type for streamed batch responses (one JSON object per line)
+NDJSON = "application/x-ndjson"
+
+# Bounded pools for CPU-bound model work (keeps the event loop responsive)
+anomaly_executor: Optional[ModelExecutor] = None
+forecast_executor: Optional[ModelExecutor] = None
+bulk_forecast_executor: Optional[ModelExecutor] = None
+
+# Concurrent single-series detect requests are scored together
+anomaly_batcher: Optional[MicroBatcher] = None
+
+# Responses of recent identical detect/forecast requests
+result_cache = None
+
+# Per-series histories, so callers can send only new observations
+history_store: Optional[HistoryStore] = None
+
+# Background training (needs the model registry)
+training_executor: Optional[ModelExecutor] = None
+training_jobs: Optional[JobManager] = None
+
+# Registry and models loaded by the pre-fork parent (see preload_models());
+# a forked worker serves them instead of loading its own copy
+preloaded: Dict[str, Any] = {}
+preloaded_by: Optional[int] = None  # PID of the parent that loaded the served models
+
+# Registry formats loaded before fork (TensorFlow does not survive fork())
+SHARED_FORMATS = ("joblib",)
+
+
+def served_model(slot: str) -> Optional[Any]:
+    """Active instance of a served model, None when not initialized (no lease: stats only)"""
+    if model_manager is None or slot not in model_manager:
+        return None
+    return model_manager.active(slot).model
+
+
+def acquire(slot: str) -> ServedVersion:
+    """
+    Hold the active version of a served model for one request
+
+    The version stays loaded until release(), even if a swap happens
+    meanwhile. Raises HTTP 503 when the model is not initialized.
+    """
+    if model_manager is None or slot not in model_manager:
+        raise HTTPException(status_code=503, detail=f"{SLOT_NAMES[slot]} not initialized")
+    return model_manager.acquire(slot)
+
+
+def cache_stats() -> dict:
+    """Stats of in-memory caches, for /metrics"""
+    anomaly_detector = served_model(ANOMALY_DETECTOR)
+    demand_forecaster = served_model(DEMAND_FORECASTER)
+    return {
+        "isolation_forests": anomaly_detector.forests.stats() if anomaly_detector else None,
+        "feature_store": anomaly_detector.feature_store.stats() if anomaly_detector else None,
+        "prophet": demand_forecaster.prophet_cache.stats() if demand_forecaster else None,
+        "results": result_cache.stats() if result_cache else None,
+    }
+
+
+def executor_stats() -> dict:
+    """Stats of model executors, for /metrics"""
+    return {
+        executor.name: executor.stats()
+        for executor in (anomaly_executor, forecast_executor, bulk_forecast_executor, training_executor)
+        if executor
+    }
+
+
+def load_times() -> dict:
+    """Framework import and model artifact load times, for /metrics"""
+    times = {("framework", name): seconds for name, seconds in backends.load_times.items()}
+    if model_registry:
+        times.update({("artifact", name): seconds for name, seconds in model_registry.load_times.items()})
+    return times
+
+
+# Cache, executor and load statistics are read when /metrics is scraped
+metrics_collector = ServiceCollector(caches=cache_stats, executors=executor_stats, load_times=load_times)
+register_collector(metrics_collector)
+
+
+def overloaded(e: ExecutorOverloaded) -> HTTPException:
+    """Map executor backpressure to HTTP 429"""
+    logger.warning(f"Rejecting request: {e}")
+    return HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
 
 
 # Request/Response Models
@@ -49,11 +174,107 @@ class InventoryDataPoint(BaseModel):
     warehouse_id: Optional[str] = None
 
 
+class ColumnarSeries(BaseModel):
+    """
+    Column-oriented data points: one array per field
+
+    Arrays are validated in bulk and mapped straight into NumPy, avoiding
+    one pydantic object per row. sku/supplier_id/warehouse_id may be a
+    single value for all rows.
+    """
+    timestamps: Union[List[float], List[str]]  # Epoch seconds or ISO 8601
+    sku: Union[str, List[str]]
+    quantities: List[int]
+    prices: List[float]
+    supplier_id: Union[None, str, List[Optional[str]]] = None
+    warehouse_id: Union[None, str, List[Optional[str]]] = None
+
+    @model_validator(mode='after')
+    def check_lengths(self):
+        n_rows = len(self.quantities)
+        columns = {
+            "timestamps": self.timestamps,
+            "prices": self.prices,
+            "sku": self.sku,
+            "supplier_id": self.supplier_id,
+            "warehouse_id": self.warehouse_id,
+        }
+        for name, values in columns.items():
+            if isinstance(values, list) and len(values) != n_rows:
+                raise ValueError(f"'{name}' has {len(values)} values, expected {n_rows} (length of 'quantities')")
+        return self
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.quantities)
+
+    def to_frame(self):
+        return columns_to_frame(
+            timestamps=self.timestamps,
+            sku=self.sku,
+            quantities=self.quantities,
+            prices=self.prices,
+            supplier_id=self.supplier_id,
+            warehouse_id=self.warehouse_id,
+        )
+
+
+def request_frame(points: Optional[List[InventoryDataPoint]], series: Optional[ColumnarSeries], endpoint: str):
+    """Build the model DataFrame from row or columnar payload (timed, rows recorded per endpoint)"""
+    with stage("frame_build"):
+        df = series.to_frame() if series is not None else points_to_frame(points)
+
+    REQUEST_ROWS.labels(endpoint=endpoint).observe(len(df))
+    return df
+
+
+def check_payload(points: Optional[List[InventoryDataPoint]], series: Optional[ColumnarSeries], min_items: int, field: str):
+    """Require exactly one of row/columnar payload with at least min_items rows"""
+    if (points is None) == (series is None):
+        raise ValueError(f"Provide exactly one of '{field}' (rows) or 'series' (columnar)")
+
+    n_rows = series.n_rows if series is not None else len(points)
+    if n_rows < min_items:
+        raise ValueError(f"At least {min_items} data points required, got {n_rows}")
+
+
+class StoredSeries(BaseModel):
+    """Series whose history is read from the service's history store"""
+    sku: str
+    warehouse_id: Optional[str] = None
+
+
+def check_new_observations(points: Optional[List[InventoryDataPoint]], series: Optional[ColumnarSeries], field: str):
+    """With stored history, the payload only holds new observations (possibly none)"""
+    if points is not None and series is not None:
+        raise ValueError(f"Provide at most one of '{field}' (rows) or 'series' (columnar)")
+
+
+def payload_rows(points: Optional[List[InventoryDataPoint]], series: Optional[ColumnarSeries]) -> int:
+    if series is not None:
+        return series.n_rows
+    return len(points) if points else 0
+
+
 class AnomalyDetectionRequest(BaseModel):
     """Request for anomaly detection"""
-    data_points: List[InventoryDataPoint] = Field(..., min_items=30)
+    data_points: Optional[List[InventoryDataPoint]] = None
+    series: Optional[ColumnarSeries] = None  # Columnar alternative to data_points
+    stored_series: Optional[StoredSeries] = None  # History from the store; data_points/series are only new points
     sensitivity: float = Field(0.05, ge=0.01, le=0.2)  # Contamination factor
 
+    @model_validator(mode='after')
+    def check_data(self):
+        if self.stored_series is not None:
+            check_new_observations(self.data_points, self.series, field="data_points")
+        else:
+            check_payload(self.data_points, self.series, min_items=30, field="data_points")
+        return self
+
+    @property
+    def n_rows(self) -> int:
+        return payload_rows(self.data_points, self.series)
+
 
 class AnomalyDetectionResponse(BaseModel):
     """Response from anomaly detection"""
@@ -65,49 +286,444 @@ class AnomalyDetectionResponse(BaseModel):
     recommended_action: str
 
 
+class BatchAnomalyDetectionRequest(AnomalyDetectionRequest):
+    """Request for anomaly detection over many SKU series at once (long format, grouped by sku/warehouse_id)"""
+
+    @model_validator(mode='after')
+    def check_data(self):
+        if self.stored_series is not None:
+            raise ValueError("'stored_series' is not supported by batch requests")
+        check_payload(self.data_points, self.series, min_items=1, field="data_points")
+        return self
+
+
+class PointAnomalyRequest(BaseModel):
+    """Request to score one new observation of a series seen before"""
+    data_point: InventoryDataPoint
+    sensitivity: float = Field(0.05, ge=0.01, le=0.2)
+
+
+class SeriesAnomalyResult(AnomalyDetectionResponse):
+    """Anomaly detection result for one sku/warehouse_id series"""
+    sku: str
+    warehouse_id: Optional[str] = None
+
+
+class SeriesError(BaseModel):
+    """Series that could not be processed in a batch request"""
+    sku: str
+    warehouse_id: Optional[str] = None
+    detail: str
+
+
+class BatchAnomalyDetectionResponse(BaseModel):
+    """Response from batch anomaly detection"""
+    results: List[SeriesAnomalyResult]
+    errors: List[SeriesError]
+
+
 class DemandForecastRequest(BaseModel):
     """Request for demand forecasting"""
-    historical_data: List[InventoryDataPoint] = Field(..., min_items=90)  # 3 months min
+    historical_data: Optional[List[InventoryDataPoint]] = None  # 3 months min
+    series: Optional[ColumnarSeries] = None  # Columnar alternative to historical_data
+    stored_series: Optional[StoredSeries] = None  # History from the store; historical_data/series are only new points
     forecast_horizon: int = Field(7, ge=1, le=30)  # Days to forecast
 
+    @model_validator(mode='after')
+    def check_data(self):
+        if self.stored_series is not None:
+            check_new_observations(self.historical_data, self.series, field="historical_data")
+        else:
+            check_payload(self.historical_data, self.series, min_items=90, field="historical_data")
+        return self
+
 
 class DemandForecastResponse(BaseModel):
     """Response from demand forecasting"""
     forecasts: List[dict]  # {date, quantity_predicted, lower_bound, upper_bound}
-    model_type: str  # prophet, lstm, ensemble
+    model_type: str  # Engine used: prophet, exponential_smoothing, croston
     accuracy_metrics: dict  # {mape, rmse, mae}
     confidence: float
 
 
+class BatchDemandForecastRequest(DemandForecastRequest):
+    """Request to forecast many SKU series (grouped by sku/warehouse_id)"""
+
+    @model_validator(mode='after')
+    def check_data(self):
+        if self.stored_series is not None:
+            raise ValueError("'stored_series' is not supported by batch requests")
+        check_payload(self.historical_data, self.series, min_items=90, field="historical_data")
+        return self
+
+
+class SeriesForecastResult(DemandForecastResponse):
+    """Demand forecast for one sku/warehouse_id series"""
+    sku: str
+    warehouse_id: Optional[str] = None
+
+
+class BatchDemandForecastResponse(BaseModel):
+    """Response from batch demand forecasting (results in completion order)"""
+    results: List[SeriesForecastResult]
+    errors: List[SeriesError]
+
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    """Whether the client asked for a streamed NDJSON response"""
+    return bool(accept) and NDJSON in accept
+
+
+async def stream_batches(
+    batches: AsyncIterator[Dict],
+    result_model: type,
+    lease: Optional[ServedVersion] = None,
+) -> StreamingResponse:
+    """
+    Stream batch results as NDJSON, one line per series
+
+    - Result lines have the `result_model` shape; failed series are emitted
+      as `{"error": {sku, warehouse_id, detail}}`
+    - Lines are flushed as soon as each chunk of series completes, and no
+      results are kept once written
+    - `batches` is pulled only as lines are sent: with ModelExecutor.map, a
+      slow client pauses the work after one window of chunks (the pool's
+      workers), so memory stays flat however large the batch
+    - The first chunk is awaited before the response starts, so overload
+      (429) and early failures still map to HTTP status codes
+    - `lease` (a held model version) is released once the stream ends
+    """
+    def lines(batch: Dict) -> str:
+        out = [result_model(**r).model_dump_json() for r in batch['results']]
+        out += [json.dumps({"error": SeriesError(**e).model_dump()}) for e in batch['errors']]
+        return "".join(line + "\n" for line in out)
+
+    try:
+        first = await batches.__anext__()
+    except BaseException:
+        if lease:
+            lease.release()
+        raise
+
+    async def body():
+        try:
+            yield lines(first)
+            async for batch in batches:
+                yield lines(batch)
+        except Exception as e:
+            # Status is already sent: report the failure in-band and stop
+            logger.error(f"Error while streaming batch results: {e}")
+            yield json.dumps({"error": {"detail": str(e)}}) + "\n"
+        finally:
+            await batches.aclose()
+            if lease:
+                lease.release()
+
+    return StreamingResponse(body(), media_type=NDJSON)
+
+
+class TrainingJobRequest(BaseModel):
+    """Request to train a model in the background"""
+    kind: str  # anomaly_forests, anomaly_lstm, demand_backtest
+    params: Dict = Field(default_factory=dict)  # e.g. epochs (anomaly_lstm), horizon/folds (demand_backtest)
+    data_points: Optional[List[InventoryDataPoint]] = None  # Training data; all stored history when omitted
+    series: Optional[ColumnarSeries] = None  # Columnar alternative to data_points
+
+    @model_validator(mode='after')
+    def check_data(self):
+        check_job(self.kind, self.params)
+        check_new_observations(self.data_points, self.series, field="data_points")
+        return self
+
+
+class TrainingJobStatus(BaseModel):
+    """State of a training job"""
+    id: str
+    kind: str
+    params: Dict
+    rows: int
+    status: str  # queued, running, succeeded, failed, cancelled
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    error: Optional[str] = None
+
+
+class HistoryAppendRequest(BaseModel):
+    """Observations to add to the history store (any number of series)"""
+    data_points: Optional[List[InventoryDataPoint]] = None
+    series: Optional[ColumnarSeries] = None  # Columnar alternative to data_points
+
+    @model_validator(mode='after')
+    def check_data(self):
+        check_payload(self.data_points, self.series, min_items=1, field="data_points")
+        return self
+
+
+class HistoryAppendResponse(BaseModel):
+    """Rows stored (rows not newer than a series' latest point are skipped)"""
+    appended: int
+    skipped: int
+    series: int
+
+
+def single_worker(feature: str) -> None:
+    """
+    503 for features keeping state in one worker process
+
+    History, streaming feature state, training jobs and model swaps live
+    in the process that handled the request, so with several workers on
+    one socket the next request would likely reach a worker without them.
+    """
+    workers = get_settings().serving_workers
+    if workers > 1:
+        raise HTTPException(
+            status_code=503,
+            detail=f"{feature} keep per-process state and require SERVING_WORKERS=1 (serving with {workers} workers)",
+        )
+
+
+def stored_frame(
+    key: StoredSeries,
+    points: Optional[List[InventoryDataPoint]],
+    series: Optional[ColumnarSeries],
+    endpoint: str,
+    min_items: int,
+):
+    """
+    Model DataFrame for a series kept in the history store
+
+    New observations in the payload (if any) are appended first, then the
+    latest HISTORY_STORE_WINDOW points are read back.
+
+    Raises:
+        HTTPException: 422 for observations of another series or a history
+            shorter than min_items, 404 for a series never stored, 503 with
+            several serving workers
+    """
+    single_worker("Stored series")
+    if payload_rows(points, series):
+        new = request_frame(points, series, endpoint)
+        other = (new['sku'] != key.sku) | (new['warehouse_id'].fillna("") != (key.warehouse_id or ""))
+        if other.any():
+            raise HTTPException(status_code=422, detail=f"Observations must all belong to stored_series {key.sku}/{key.warehouse_id}")
+        history_store.append(new)
+
+    try:
+        with stage("history_read"):
+            df = history_store.history(key.sku, key.warehouse_id, last_n=get_settings().history_store_window)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"No stored history for {key.sku}/{key.warehouse_id}, POST it to /api/ml/history first")
+
+    if len(df) < min_items:
+        raise HTTPException(status_code=422, detail=f"At least {min_items} data points required, {key.sku}/{key.warehouse_id} has {len(df)}")
+
+    REQUEST_ROWS.labels(endpoint=endpoint).observe(len(df))
+    return df
+
+
+def preload_models() -> Dict[str, int]:
+    """
+    Load served models once in the pre-fork parent (see src.serve)
+
+    Joblib artifacts are loaded (numpy arrays memory-mapped from the
+    registry) and the fitted forests packed for scoring, so forked workers
+    share those pages copy-on-write instead of each loading a copy.
+    TensorFlow and Keras artifacts are left to the workers.
+
+    Returns:
+        Fitted forests and loaded artifacts
+    """
+    settings = get_settings()
+    lazy = settings.model_copy(update={"model_registry_lazy_load": True})  # Never load Keras artifacts here
+    registry = ModelRegistry(settings.model_registry_dir) if settings.model_registry_dir else None
+
+    anomaly_detector = AnomalyDetector(lazy)
+    asyncio.run(anomaly_detector.initialize(registry=registry))
+    anomaly_detector.warm(formats=SHARED_FORMATS)
+    for forest in anomaly_detector.forests.snapshot().values():
+        forest.pack()
+
+    demand_forecaster = DemandForecaster(lazy)
+    asyncio.run(demand_forecaster.initialize(registry=registry))
+    demand_forecaster.warm(formats=SHARED_FORMATS)
+
+    preloaded.update({
+        "pid": os.getpid(),
+        "registry": registry,
+        ANOMALY_DETECTOR: anomaly_detector,
+        DEMAND_FORECASTER: demand_forecaster,
+    })
+
+    return {
+        "forests": len(anomaly_detector.forests),
+        "artifacts": sum(artifact.loaded for model in (anomaly_detector, demand_forecaster) for artifact in model.artifacts.values()),
+    }
+
+
+async def serve_trained(kind: str, artifact: Dict) -> None:
+    """Hot-swap a version saved by a training job into the served model"""
+    await model_manager.activate(JOB_KINDS[kind], {artifact['name']: artifact['version']})
+    prune_versions(JOB_KINDS[kind], artifact['name'])
+
+
+def prune_versions(slot: str, name: str) -> None:
+    """Delete old registry versions of an artifact, keeping the newest and the slot's served ones"""
+    try:
+        model_registry.prune(
+            name,
+            keep=get_settings().model_registry_keep_versions,
+            protect=model_manager.served_versions(slot, name),
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Could not prune old versions of {name}: {e}")
+
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize ML models on startup"""
-    global anomaly_detector, demand_forecaster
+    global model_manager, model_registry, anomaly_batcher
+    global anomaly_executor, forecast_executor, bulk_forecast_executor, result_cache, history_store
+    global training_executor, training_jobs, preloaded_by
 
     logger.info("🚀 Starting ML Service...")
+    settings = get_settings()
+
+    # Thread budget of this worker (TensorFlow reads it when first imported)
+    set_thread_env(settings.worker_threads)
+    limit_threads(settings.worker_threads)
+
+    preloaded_by = preloaded.pop("pid", None)
+    if preloaded_by:
+        logger.info(f"🧬 Serving models preloaded by process {preloaded_by}")
+
+    # Model executors
+    anomaly_executor = ModelExecutor(
+        name="anomaly",
+        kind=settings.anomaly_executor_kind,
+        max_workers=settings.anomaly_executor_workers or settings.worker_threads,
+        max_pending=settings.anomaly_executor_max_pending,
+    )
+    forecast_executor = ModelExecutor(
+        name="forecast",
+        kind=settings.forecast_executor_kind,
+        max_workers=settings.forecast_executor_workers or settings.worker_threads,
+        max_pending=settings.forecast_executor_max_pending,
+    )
+    bulk_forecast_executor = ModelExecutor(
+        name="bulk_forecast",
+        kind=settings.bulk_forecast_executor_kind,
+        max_workers=settings.bulk_forecast_executor_workers or settings.worker_threads,
+        max_pending=settings.bulk_forecast_executor_max_pending,
+    )
+
+    result_cache = create_result_cache(settings)
+    if result_cache:
+        logger.info(f"🗄️ Result cache: {result_cache.backend}")
+
+    history_store = HistoryStore(settings.history_store_dir)
+    if settings.history_store_dir:
+        logger.info(f"🗃️ History store: {settings.history_store_dir} ({len(history_store)} points)")
+
+    # Attach model registry (fitted artifacts from previous runs)
+    model_registry, training_executor, training_jobs = None, None, None
+    if settings.model_registry_dir:
+        model_registry = preloaded.pop("registry", None) or ModelRegistry(settings.model_registry_dir)
+        logger.info(f"📦 Model registry: {settings.model_registry_dir}")
+
+        # Training jobs save new versions to the registry, then swap them in
+        training_executor = ModelExecutor(
+            name="training",
+            kind=settings.training_executor_kind,
+            max_workers=settings.training_executor_workers,
+            max_pending=settings.training_max_jobs,
+        )
+        training_jobs = JobManager(
+            training_executor,
+            settings.model_registry_dir,
+            on_trained=serve_trained,
+            max_jobs=settings.training_max_jobs,
+            history=settings.training_job_history,
+        )
+
+    # Served versions; new registry versions are swapped in without a restart
+    model_manager = ModelManager(model_registry, drain_timeout=settings.model_swap_drain_timeout_seconds)
 
     # Initialize Anomaly Detector
     try:
-        anomaly_detector = AnomalyDetector()
-        await anomaly_detector.initialize()
+        anomaly_detector = preloaded.pop(ANOMALY_DETECTOR, None)
+        if anomaly_detector is None:
+            anomaly_detector = AnomalyDetector()
+            await anomaly_detector.initialize(registry=model_registry)
+        elif not settings.model_registry_lazy_load:
+            anomaly_detector.warm()  # Keras artifacts are loaded per worker
+        model_manager.register(ANOMALY_DETECTOR, anomaly_detector)
+        anomaly_batcher = MicroBatcher(
+            anomaly_executor, anomaly_detector, "detect_many_sync",
+            max_batch_size=settings.anomaly_batch_max_size,
+            max_wait_ms=settings.anomaly_batch_max_wait_ms,
+        )
         logger.info("✅ Anomaly Detector initialized")
     except Exception as e:
         logger.error(f"❌ Failed to initialize Anomaly Detector: {e}")
-        anomaly_detector = None
 
     # Initialize Demand Forecaster
     try:
-        demand_forecaster = DemandForecaster()
-        await demand_forecaster.initialize()
+        demand_forecaster = preloaded.pop(DEMAND_FORECASTER, None)
+        if demand_forecaster is None:
+            demand_forecaster = DemandForecaster()
+            await demand_forecaster.initialize(registry=model_registry)
+        elif not settings.model_registry_lazy_load:
+            demand_forecaster.warm()
+        model_manager.register(DEMAND_FORECASTER, demand_forecaster)
         logger.info("✅ Demand Forecaster initialized")
     except Exception as e:
         logger.error(f"❌ Failed to initialize Demand Forecaster: {e}")
-        demand_forecaster = None
+
+    # Heavy frameworks are imported on first use unless warmed here
+    if settings.warm_frameworks:
+        logger.info(f"🔥 Warmed frameworks: {backends.warm()}")
 
     logger.info("🎉 ML Service ready!")
 
 
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop model executors and persist fitted models so the next process starts warm"""
+    if anomaly_batcher:
+        await anomaly_batcher.drain()
+
+    if training_jobs:
+        await training_jobs.shutdown()
+
+    for executor in (anomaly_executor, forecast_executor, bulk_forecast_executor, training_executor):
+        if executor:
+            executor.shutdown(wait=False)
+
+    if history_store:
+        history_store.flush()
+
+    # Forests fitted online since startup are saved merged with the latest
+    # version, so each of several workers adds its segments instead of
+    # replacing the others'. Nothing is saved when nothing was fitted, or
+    # when an older forest version was pinned (rollback, activation).
+    anomaly_detector = served_model(ANOMALY_DETECTOR)
+    if model_registry and anomaly_detector:
+        pinned = model_manager.pinned(ANOMALY_DETECTOR).get(FOREST_ARTIFACT)
+        if pinned is not None:
+            logger.info(f"📌 {FOREST_ARTIFACT} is pinned at v{pinned}, not saving fitted forests")
+        elif anomaly_detector.forests.fits:
+            try:
+                saved = anomaly_detector.save_artifacts(model_registry, merge=True)
+                if saved:
+                    logger.info(f"💾 Saved {saved['name']} v{saved['version']}")
+                    prune_versions(ANOMALY_DETECTOR, FOREST_ARTIFACT)
+            except Exception as e:
+                logger.error(f"❌ Failed to save Anomaly Detector artifacts: {e}")
+
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -117,8 +733,8 @@ async def health_check():
         "service": "ml-service",
         "version": "0.1.0",
         "models": {
-            "anomaly_detector": "ready" if anomaly_detector else "not_initialized",
-            "demand_forecaster": "ready" if demand_forecaster else "not_initialized",
+            slot: "ready" if served_model(slot) else "not_initialized"
+            for slot in SLOT_NAMES
         },
     }
 
@@ -133,30 +749,141 @@ async def detect_anomaly(request: AnomalyDetectionRequest):
     1. Isolation Forest: Unsupervised outlier detection
     2. LSTM Autoencoder: Time-series reconstruction error
     3. Ensemble: Combine both for high-confidence predictions
+
+    Concurrent requests are micro-batched: those arriving within a few
+    milliseconds are scored together in one model call.
+
+    Identical requests (same data and parameters) within the result cache
+    TTL return the stored response without re-running the models.
+
+    With `stored_series`, the history is read from the history store (see
+    /api/ml/history) and the payload only carries new observations.
     """
-    if not anomaly_detector:
-        raise HTTPException(status_code=503, detail="Anomaly Detector not initialized")
+    served = acquire(ANOMALY_DETECTOR)
+    detector = served.model
+
+    try:
+        logger.info(f"Detecting anomalies for {request.n_rows} data points")
+
+        # Convert to pandas DataFrame (or read the stored history)
+        if request.stored_series is not None:
+            df = stored_frame(request.stored_series, request.data_points, request.series, endpoint="detect_anomaly", min_items=30)
+        else:
+            df = request_frame(request.data_points, request.series, endpoint="detect_anomaly")
+
+        # Identical request seen recently: return the stored response
+        key = request_key(f"detect:{detector.version}:{served.tag}", df, sensitivity=request.sensitivity)
+        cached = result_cache.get(key) if result_cache else None
+        if cached is not None:
+            return AnomalyDetectionResponse(**cached)
+
+        # Run anomaly detection (micro-batched with concurrent requests, on the model executor)
+        result = await anomaly_batcher.submit((df, request.sensitivity), model=detector)
+        if result_cache:
+            result_cache.set(key, result)
+
+        logger.info(f"Anomaly detected: {result['is_anomaly']} (confidence: {result['confidence']:.2f})")
+
+        return AnomalyDetectionResponse(**result)
+
+    except ExecutorOverloaded as e:
+        raise overloaded(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in anomaly detection: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        served.release()
+
+
+# Batch Anomaly Detection endpoint
+@app.post("/api/ml/detect-anomaly/batch", response_model=BatchAnomalyDetectionResponse)
+async def detect_anomaly_batch(request: BatchAnomalyDetectionRequest, accept: Optional[str] = Header(None)):
+    """
+    Detect anomalies for many SKU series in one request
+
+    Data points are grouped by sku/warehouse_id and each series is scored
+    with the same ensemble as /api/ml/detect-anomaly. Series that are too
+    short or fail are reported in `errors` instead of failing the batch.
+
+    With `Accept: application/x-ndjson` results are streamed one line per
+    series as each chunk of series is scored.
+    """
+    served = acquire(ANOMALY_DETECTOR)
 
     try:
-        logger.info(f"Detecting anomalies for {len(request.data_points)} data points")
+        logger.info(f"Batch anomaly detection for {request.n_rows} data points")
 
         # Convert to pandas DataFrame
-        import pandas as pd
-        df = pd.DataFrame([dp.dict() for dp in request.data_points])
+        df = request_frame(request.data_points, request.series, endpoint="detect_anomaly_batch")
+
+        if wants_ndjson(accept):
+            chunks = series_chunks(df, get_settings().anomaly_stream_chunk_size)
+            return await stream_batches(
+                anomaly_executor.map(served.model, "detect_batch_sync", chunks, sensitivity=request.sensitivity),
+                SeriesAnomalyResult,
+                lease=served.acquire(),
+            )
 
-        # Run anomaly detection
-        result = await anomaly_detector.detect(
+        # Run anomaly detection per series (on the model executor)
+        result = await anomaly_executor.call(
+            served.model, "detect_batch_sync",
             data=df,
             sensitivity=request.sensitivity
         )
 
-        logger.info(f"Anomaly detected: {result['is_anomaly']} (confidence: {result['confidence']:.2f})")
+        anomalies = sum(1 for r in result['results'] if r['is_anomaly'])
+        logger.info(
+            f"Batch complete: {len(result['results'])} series scored, "
+            f"{anomalies} anomalies, {len(result['errors'])} errors"
+        )
+
+        return BatchAnomalyDetectionResponse(**result)
+
+    except ExecutorOverloaded as e:
+        raise overloaded(e)
+    except Exception as e:
+        logger.error(f"Error in batch anomaly detection: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        served.release()
+
+
+# Streaming (single point) Anomaly Detection endpoint
+@app.post("/api/ml/detect-anomaly/point", response_model=AnomalyDetectionResponse)
+async def detect_anomaly_point(request: PointAnomalyRequest):
+    """
+    Score one new observation without resending the series history
+
+    Uses per-series streaming feature state seeded by a previous
+    /api/ml/detect-anomaly (or batch) call with the full history.
+    Returns 404 if the series has no state yet.
+    """
+    single_worker("Point requests")
+    served = acquire(ANOMALY_DETECTOR)
+
+    try:
+        REQUEST_ROWS.labels(endpoint="detect_anomaly_point").observe(1)
+        result = await anomaly_executor.call(
+            served.model, "detect_point_sync",
+            observation=request.data_point.model_dump(),
+            sensitivity=request.sensitivity
+        )
 
         return AnomalyDetectionResponse(**result)
 
+    except ExecutorOverloaded as e:
+        raise overloaded(e)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
-        logger.error(f"Error in anomaly detection: {e}")
+        logger.error(f"Error in point anomaly detection: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        served.release()
 
 
 # Demand Forecasting endpoint
@@ -169,30 +896,284 @@ async def forecast_demand(request: DemandForecastRequest):
     1. Prophet: Seasonal decomposition (weekly, monthly patterns)
     2. LSTM: Deep learning for complex non-linear trends
     3. Ensemble: Weighted average based on historical accuracy
+
+    Identical requests (same data and parameters) within the result cache
+    TTL return the stored response without re-running the models.
+
+    With `stored_series`, the history is read from the history store (see
+    /api/ml/history) and the payload only carries new observations.
     """
-    if not demand_forecaster:
-        raise HTTPException(status_code=503, detail="Demand Forecaster not initialized")
+    served = acquire(DEMAND_FORECASTER)
+    forecaster = served.model
 
     try:
         logger.info(f"Forecasting demand for {request.forecast_horizon} days")
 
-        # Convert to pandas DataFrame
-        import pandas as pd
-        df = pd.DataFrame([dp.dict() for dp in request.historical_data])
+        # Convert to pandas DataFrame (or read the stored history)
+        if request.stored_series is not None:
+            df = stored_frame(request.stored_series, request.historical_data, request.series, endpoint="forecast_demand", min_items=90)
+        else:
+            df = request_frame(request.historical_data, request.series, endpoint="forecast_demand")
 
-        # Run demand forecasting
-        result = await demand_forecaster.forecast(
+        # Identical request seen recently: return the stored response
+        key = request_key(f"forecast:{forecaster.version}:{served.tag}", df, horizon=request.forecast_horizon)
+        cached = result_cache.get(key) if result_cache else None
+        if cached is not None:
+            return DemandForecastResponse(**cached)
+
+        # Run demand forecasting (on the model executor)
+        result = await forecast_executor.call(
+            forecaster, "forecast_sync",
             historical_data=df,
             horizon=request.forecast_horizon
         )
+        if result_cache:
+            result_cache.set(key, result)
 
         logger.info(f"Forecast generated: {len(result['forecasts'])} predictions")
 
         return DemandForecastResponse(**result)
 
+    except ExecutorOverloaded as e:
+        raise overloaded(e)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in demand forecasting: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        served.release()
+
+
+# Batch Demand Forecasting endpoint
+@app.post("/api/ml/forecast-demand/batch", response_model=BatchDemandForecastResponse)
+async def forecast_demand_batch(request: BatchDemandForecastRequest, accept: Optional[str] = Header(None)):
+    """
+    Forecast demand for many SKU series in one request
+
+    Data points are grouped by sku/warehouse_id and split into chunks of
+    whole series that are fitted in parallel on the bulk forecast pool
+    (one process per core by default). Results are listed in the order
+    chunks complete; series that are too short or fail are reported in
+    `errors` instead of failing the batch.
+
+    With `Accept: application/x-ndjson` results are streamed one line per
+    series as each chunk completes, instead of one response at the end.
+    """
+    served = acquire(DEMAND_FORECASTER)
+
+    try:
+        # Convert to pandas DataFrame
+        df = request_frame(request.historical_data, request.series, endpoint="forecast_demand_batch")
+
+        n_series = df.groupby(SERIES_KEYS, sort=False, dropna=False).ngroups
+        chunk_size = get_settings().bulk_forecast_chunk_size or chunk_size_for(n_series, bulk_forecast_executor.max_workers)
+        chunks = series_chunks(df, chunk_size)
+        logger.info(f"Batch forecasting {n_series} series in {len(chunks)} chunks")
+
+        batches = bulk_forecast_executor.map(
+            served.model, "forecast_batch_sync", chunks,
+            horizon=request.forecast_horizon
+        )
+        if wants_ndjson(accept):
+            return await stream_batches(batches, SeriesForecastResult, lease=served.acquire())
+
+        results, errors = [], []
+        async for chunk in batches:
+            results.extend(chunk['results'])
+            errors.extend(chunk['errors'])
+
+        logger.info(f"Batch forecast complete: {len(results)} series forecast, {len(errors)} errors")
+
+        return BatchDemandForecastResponse(results=results, errors=errors)
+
+    except ExecutorOverloaded as e:
+        raise overloaded(e)
+    except Exception as e:
+        logger.error(f"Error in batch demand forecasting: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        served.release()
+
+
+# History store endpoint
+@app.post("/api/ml/history", response_model=HistoryAppendResponse)
+async def append_history(request: HistoryAppendRequest):
+    """
+    Store inventory history for later requests
+
+    Seed the store once with each series' history, then call
+    /api/ml/detect-anomaly or /api/ml/forecast-demand with `stored_series`
+    and only the new observations. Rows not newer than the latest stored
+    point of their series are skipped, so retries are safe.
+    """
+    single_worker("Stored histories")
+
+    try:
+        df = request_frame(request.data_points, request.series, endpoint="history")
+        counts = history_store.append(df)
+        n_series = df.groupby(SERIES_KEYS, sort=False, dropna=False).ngroups
+
+        logger.info(f"Stored {counts['appended']} points for {n_series} series ({counts['skipped']} skipped)")
+
+        return HistoryAppendResponse(series=n_series, **counts)
+
+    except Exception as e:
+        logger.error(f"Error storing history: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Background training endpoints
+def get_training_job(job_id: str):
+    """Training job by id (404 when unknown or forgotten)"""
+    single_worker("Training jobs")
+    if training_jobs is None:
+        raise HTTPException(status_code=503, detail="Training jobs require MODEL_REGISTRY_DIR")
+
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No training job '{job_id}'")
+    return job
+
+
+@app.post("/api/ml/training/jobs", response_model=TrainingJobStatus, status_code=202)
+async def submit_training_job(request: TrainingJobRequest):
+    """
+    Train a model in the background
+
+    The job trains a fresh model on the payload (or, when none is sent,
+    on every series in the history store), saves it to the model registry
+    and then swaps it into serving. Requests keep using the current model
+    meanwhile. Poll /api/ml/training/jobs/{id} for its status.
+    """
+    single_worker("Training jobs")
+    if training_jobs is None:
+        raise HTTPException(status_code=503, detail="Training jobs require MODEL_REGISTRY_DIR")
+
+    try:
+        if payload_rows(request.data_points, request.series):
+            df = request_frame(request.data_points, request.series, endpoint="training_jobs")
+        else:
+            df = history_store.export()
+            if df.empty:
+                raise HTTPException(status_code=422, detail="No training data: send data points or POST history to /api/ml/history first")
+
+        job = training_jobs.submit(request.kind, df, request.params)
+        return TrainingJobStatus(**job.to_dict())
+
+    except ExecutorOverloaded as e:
+        raise overloaded(e)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error submitting training job: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/ml/training/jobs", response_model=List[TrainingJobStatus])
+async def list_training_jobs():
+    """Known training jobs, most recent first"""
+    single_worker("Training jobs")
+    if training_jobs is None:
+        raise HTTPException(status_code=503, detail="Training jobs require MODEL_REGISTRY_DIR")
+
+    return [TrainingJobStatus(**job.to_dict()) for job in training_jobs.recent()]
+
+
+@app.get("/api/ml/training/jobs/{job_id}", response_model=TrainingJobStatus)
+async def training_job_status(job_id: str):
+    """Status of a training job"""
+    return TrainingJobStatus(**get_training_job(job_id).to_dict())
+
+
+@app.get("/api/ml/training/jobs/{job_id}/result")
+async def training_job_result(job_id: str):
+    """
+    Saved version and training metrics of a finished job
+
+    409 while the job is queued or running, or when it failed.
+    """
+    job = get_training_job(job_id)
+    if job.status != "succeeded":
+        detail = f"Training job '{job_id}' is {job.status}" + (f": {job.error}" if job.error else "")
+        raise HTTPException(status_code=409, detail=detail)
+
+    return {"id": job.id, "kind": job.kind, **job.result}
+
+
+@app.get("/api/ml/baselines/{level}/{key}")
+async def get_baseline(level: str, key: str):
+    """
+    Price/quantity baseline of one supplier or warehouse
+
+    Count, mean, std and p05/p50/p95 of everything seen by the anomaly
+    detector; these are the context behind the *_zscore features.
+    """
+    anomaly_detector = served_model(ANOMALY_DETECTOR)
+    if anomaly_detector is None:
+        raise HTTPException(status_code=503, detail="Anomaly Detector not initialized")
+    if level not in BASELINE_LEVELS:
+        raise HTTPException(status_code=404, detail=f"Unknown baseline level '{level}', expected one of {list(BASELINE_LEVELS)}")
+
+    baseline = anomaly_detector.baselines.lookup(level, key)
+    if baseline is None:
+        raise HTTPException(status_code=404, detail=f"No baseline for {level} '{key}'")
+
+    return {"level": level, "key": key, **baseline}
+
+
+class ModelActivationRequest(BaseModel):
+    """Registry artifact versions to serve (artifacts not listed keep their version)"""
+    artifacts: Dict[str, int]  # e.g. {"anomaly_lstm_autoencoder": 3}
+
+
+def swappable(slot: str) -> None:
+    """404 for unknown slots, 503 when the model or the registry is missing"""
+    if slot not in SLOT_NAMES:
+        raise HTTPException(status_code=404, detail=f"Unknown model '{slot}', expected one of {list(SLOT_NAMES)}")
+    if served_model(slot) is None:
+        raise HTTPException(status_code=503, detail=f"{SLOT_NAMES[slot]} not initialized")
+    if model_registry is None:
+        raise HTTPException(status_code=503, detail="Model swaps require MODEL_REGISTRY_DIR")
+    single_worker("Model swaps")
+
+
+@app.post("/api/ml/models/{slot}/activate")
+async def activate_model(slot: str, request: ModelActivationRequest):
+    """
+    Serve other registry artifact versions without restarting the worker
+
+    The new version is loaded and warmed in the background while requests
+    keep using the active one, then new requests switch to it at once.
+    The replaced version drains its in-flight requests and stays loaded
+    as standby for /api/ml/models/{slot}/rollback.
+    """
+    swappable(slot)
+
+    try:
+        await model_manager.activate(slot, request.artifacts)
+        return model_manager.stats()["slots"][slot]
+
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error activating {slot} version: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/ml/models/{slot}/rollback")
+async def rollback_model(slot: str):
+    """Switch back to the standby (previous) version; 409 if there is none"""
+    swappable(slot)
+
+    try:
+        await model_manager.rollback(slot)
+        return model_manager.stats()["slots"][slot]
+
+    except LookupError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
 
 # Model info endpoint
@@ -203,6 +1184,8 @@ async def get_model_info():
         "anomaly_detector": None,
         "demand_forecaster": None,
     }
+    anomaly_detector = served_model(ANOMALY_DETECTOR)
+    demand_forecaster = served_model(DEMAND_FORECASTER)
 
     if anomaly_detector:
         info["anomaly_detector"] = {
@@ -210,6 +1193,17 @@ async def get_model_info():
             "version": anomaly_detector.version,
             "trained_at": anomaly_detector.trained_at,
             "accuracy": anomaly_detector.accuracy,
+            "fitted_forests": anomaly_detector.forests.stats(),
+            "feature_store": anomaly_detector.feature_store.stats(),
+            "baselines": anomaly_detector.baselines.stats(),
+            "lstm_autoencoder": {
+                "trained": anomaly_detector.lstm_threshold is not None,
+                "threshold": anomaly_detector.lstm_threshold,
+            },
+            "artifacts": {
+                name: {**artifact.info.to_dict(), "loaded": artifact.loaded, "backend": artifact.backend or artifact.info.format}
+                for name, artifact in anomaly_detector.artifacts.items()
+            },
         }
 
     if demand_forecaster:
@@ -218,11 +1212,63 @@ async def get_model_info():
             "version": demand_forecaster.version,
             "trained_at": demand_forecaster.trained_at,
             "metrics": demand_forecaster.metrics,
+            "prophet_cache": demand_forecaster.prophet_cache.stats(),
+            "engine": demand_forecaster.settings.forecast_engine,
+            "artifacts": {
+                name: {**artifact.info.to_dict(), "loaded": artifact.loaded, "backend": artifact.backend or artifact.info.format}
+                for name, artifact in demand_forecaster.artifacts.items()
+            },
         }
 
+    # Active and standby versions per model (see /api/ml/models/{slot}/activate)
+    info["serving"] = model_manager.stats() if model_manager else None
+
+    if model_registry:
+        info["registry"] = model_registry.list_models()
+
+    info["frameworks"] = {
+        "loaded": backends.loaded(),
+        "load_seconds": backends.load_times,
+    }
+
+    info["result_cache"] = result_cache.stats() if result_cache else None
+    info["history_store"] = history_store.stats() if history_store else None
+
+    info["batching"] = {"anomaly": anomaly_batcher.stats() if anomaly_batcher else None}
+
+    info["training_jobs"] = training_jobs.stats() if training_jobs else None
+
+    settings = get_settings()
+    info["process"] = {
+        "pid": os.getpid(),
+        "preloaded_by": preloaded_by,
+        "serving_workers": settings.serving_workers,
+        "threads": settings.worker_threads,
+    }
+
+    info["executors"] = {
+        "anomaly": anomaly_executor.stats() if anomaly_executor else None,
+        "forecast": forecast_executor.stats() if forecast_executor else None,
+        "bulk_forecast": bulk_forecast_executor.stats() if bulk_forecast_executor else None,
+        "training": training_executor.stats() if training_executor else None,
+    }
+
     return info
 
 
+# Prometheus metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus metrics
+
+    Stage latency histograms, HTTP latency, rows per request, cache hit
+    ratios, executor queue depth and model load times.
+    """
+    body, content_type = render(metrics_collector)
+    return Response(content=body, media_type=content_type)
+
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -233,8 +1279,17 @@ async def root():
         "endpoints": {
             "health": "/health",
             "detect_anomaly": "/api/ml/detect-anomaly",
+            "detect_anomaly_batch": "/api/ml/detect-anomaly/batch",
+            "detect_anomaly_point": "/api/ml/detect-anomaly/point",
             "forecast_demand": "/api/ml/forecast-demand",
+            "forecast_demand_batch": "/api/ml/forecast-demand/batch",
+            "history": "/api/ml/history",
+            "baselines": "/api/ml/baselines/{level}/{key}",
+            "training_jobs": "/api/ml/training/jobs",
             "model_info": "/api/ml/models/info",
+            "model_activate": "/api/ml/models/{slot}/activate",
+            "model_rollback": "/api/ml/models/{slot}/rollback",
+            "metrics": "/metrics",
         },
         "docs": "/docs",
     }
@@ -6,14 +6,45 @@ import numpy as np
 import pandas as pd
 from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler
-import tensorflow as tf
-from tensorflow import keras
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Sequence, Tuple, Union
 import logging
 from datetime import datetime
 
+from src.config import Settings, get_settings
+from src.models.backends import get_keras
+from src.models.forest_cache import SEGMENT_COLUMNS, ForestCache, FittedForest
+from src.models.registry import ModelRegistry, LazyModel
+from src.features.baselines import BASELINE_FEATURES, BaselineIndex
+from src.features.engineering import INPUT_COLUMNS, engineer_features, engineer_series
+from src.features.streaming import FeatureStore
+from src.utils.ingest import SERIES_KEYS, naive_utc
+from src.utils.metrics import stage
+from src.utils.windows import sliding_windows
+
+if TYPE_CHECKING:
+    from tensorflow import keras
+
 logger = logging.getLogger(__name__)
 
+# Registry artifact names
+FOREST_ARTIFACT = "anomaly_isolation_forests"
+LSTM_AUTOENCODER_ARTIFACT = "anomaly_lstm_autoencoder"
+
+# Minimum history needed to score a series (matches the API contract)
+MIN_HISTORY_POINTS = 30
+
+# Isolation Forest features (series features + supplier/warehouse context)
+FOREST_FEATURES = [
+    'price', 'quantity',
+    'price_change_rate', 'quantity_change_rate',
+    'price_deviation_7d', 'quantity_deviation_7d',
+    *BASELINE_FEATURES,
+]
+
+# LSTM Autoencoder input: 30-day windows of 5 features
+LSTM_TIMESTEPS = 30
+LSTM_FEATURES = ['price', 'quantity', 'quantity_change_rate', 'price_rolling_7d', 'quantity_rolling_30d']
+
 
 class AnomalyDetector:
     """
@@ -22,37 +53,224 @@ class AnomalyDetector:
     2. LSTM Autoencoder (time-series reconstruction error)
     """
 
-    def __init__(self):
-        self.isolation_forest: Optional[IsolationForest] = None
-        self.lstm_autoencoder: Optional[keras.Model] = None
+    # Registry artifacts the detector serves
+    ARTIFACTS = (FOREST_ARTIFACT, LSTM_AUTOENCODER_ARTIFACT)
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        self.isolation_forest: Optional[IsolationForest] = None  # Unfitted template
+        self.forests: Optional[ForestCache] = None
+        self.feature_store: Optional[FeatureStore] = None
+        self.baselines: Optional[BaselineIndex] = None
+        self._lstm_autoencoder: Optional["keras.Model"] = None  # Built on first use (imports TensorFlow)
         self.scaler = StandardScaler()
         self.version = "0.1.0"
         self.trained_at: Optional[datetime] = None
         self.accuracy: Optional[float] = None
+        self.lstm_threshold: Optional[float] = None  # Reconstruction error cutoff, set once trained
+        self.artifacts: Dict[str, LazyModel] = {}  # Fitted artifacts from the model registry
+
+    async def initialize(self, registry: Optional[ModelRegistry] = None, versions: Optional[Dict[str, int]] = None):
+        """
+        Initialize models (lazy loading)
 
-    async def initialize(self):
-        """Initialize models (lazy loading)"""
+        When a registry is given, fitted artifacts saved by a previous process
+        are attached so the detector serves warm models right away. They are
+        loaded on first use unless `model_registry_lazy_load` is disabled.
+
+        Args:
+            registry: Model registry to attach artifacts from
+            versions: Attach exactly these artifact versions (default: latest of each)
+        """
         logger.info("Initializing Anomaly Detector...")
 
-        # Initialize Isolation Forest
+        # Initialize Isolation Forest (template for per-segment forests)
         self.isolation_forest = IsolationForest(
-            contamination=0.05,  # 5% expected anomalies
+            contamination=self.settings.anomaly_contamination,  # 5% expected anomalies
             random_state=42,
             n_estimators=100,
             max_samples='auto',
-            n_jobs=-1,  # Use all CPU cores
+            n_jobs=self.settings.worker_threads,  # This worker's share of the CPU cores
+        )
+
+        # Fitted forests are reused across requests (fit once, score many)
+        self.forests = ForestCache(
+            template=self.isolation_forest,
+            segment=self.settings.anomaly_forest_segment,
+            max_entries=self.settings.anomaly_forest_cache_size,
+            refit_interval_seconds=self.settings.anomaly_forest_refit_interval_seconds,
+            refit_after_points=self.settings.anomaly_forest_refit_after_points,
         )
 
-        # Initialize LSTM Autoencoder architecture
-        self.lstm_autoencoder = self._build_lstm_autoencoder(
-            timesteps=30,  # 30-day window
-            n_features=5,  # price, quantity, change_rate, rolling_avg_7d, rolling_avg_30d
+        # Streaming feature state per series (score new points without history)
+        self.feature_store = FeatureStore(
+            window_features=LSTM_FEATURES,
+            window_size=LSTM_TIMESTEPS,
+            max_series=self.settings.anomaly_feature_store_size,
         )
 
+        # Supplier/warehouse baselines, updated with every request's new points
+        self.baselines = BaselineIndex()
+
         self.trained_at = datetime.now()
+
+        if registry is not None:
+            self._attach_artifacts(registry, versions)
+
         logger.info("✅ Anomaly Detector initialized")
 
-    def _build_lstm_autoencoder(self, timesteps: int, n_features: int) -> keras.Model:
+    @property
+    def lstm_autoencoder(self) -> "keras.Model":
+        """
+        LSTM Autoencoder (scored only once trained)
+
+        The architecture is built on first access so TensorFlow is only
+        imported by workers that actually use the LSTM branch.
+        """
+        if self._lstm_autoencoder is None:
+            self._lstm_autoencoder = self._build_lstm_autoencoder(
+                timesteps=LSTM_TIMESTEPS,  # 30-day window
+                n_features=len(LSTM_FEATURES),  # price, quantity, change_rate, rolling_avg_7d, rolling_avg_30d
+            )
+        return self._lstm_autoencoder
+
+    @lstm_autoencoder.setter
+    def lstm_autoencoder(self, model: "keras.Model"):
+        self._lstm_autoencoder = model
+
+    def _attach_artifacts(self, registry: ModelRegistry, versions: Optional[Dict[str, int]] = None):
+        """Attach saved artifacts from the registry (metadata only until loaded)"""
+        for name in self.ARTIFACTS:
+            if versions is not None and name not in versions:
+                continue
+            version = versions[name] if versions else None
+            artifact = registry.lazy(name, version, backend=self.settings.lstm_inference_backend)
+            if artifact is not None:
+                self.artifacts[name] = artifact
+                logger.info(f"Found {name} v{artifact.info.version} (trained {artifact.info.trained_at})")
+
+        if FOREST_ARTIFACT in self.artifacts:
+            info = self.artifacts[FOREST_ARTIFACT].info
+            self.trained_at = datetime.fromisoformat(info.trained_at)
+            self.accuracy = info.metrics.get('accuracy')
+
+        if not self.settings.model_registry_lazy_load:
+            self.warm()
+
+    def warm(self, formats: Optional[Sequence[str]] = None):
+        """
+        Load attached artifacts now instead of on first use
+
+        Args:
+            formats: Only artifacts saved in these registry formats, e.g.
+                ("joblib",) to load the forests without importing TensorFlow
+        """
+        wanted = {name for name, artifact in self.artifacts.items() if formats is None or artifact.info.format in formats}
+        if FOREST_ARTIFACT in wanted:
+            self._load_forests()
+        if formats is None or LSTM_AUTOENCODER_ARTIFACT in wanted:
+            self._get_trained_lstm()
+
+    @property
+    def artifact_versions(self) -> Dict[str, int]:
+        """Registry version of every attached artifact"""
+        return {name: artifact.info.version for name, artifact in self.artifacts.items()}
+
+    def adopt(self, previous: "AnomalyDetector") -> None:
+        """
+        Take over the state of the instance this one replaces (model swap)
+
+        Streaming feature state describes the data, not the model, so it is
+        shared. Artifacts of the same version are reused as loaded, and so
+        are the fitted forests when the forest artifact did not change.
+        Baselines are shared too, until a new forest artifact brings its own.
+        """
+        self.baselines = previous.baselines
+        self.feature_store = previous.feature_store
+
+        for name, artifact in previous.artifacts.items():
+            if self.artifact_versions.get(name) == artifact.info.version:
+                self.artifacts[name] = artifact
+
+        if self.artifacts.get(FOREST_ARTIFACT) is previous.artifacts.get(FOREST_ARTIFACT):
+            self.forests = previous.forests
+
+    def _load_forests(self):
+        """
+        Seed the forest cache and baselines from the saved artifact (once)
+
+        The artifact's forests were fitted on features z-scored against its
+        baselines, so those replace the detector's. Artifacts saved before
+        baselines were persisted hold only the forests.
+        """
+        artifact = self.artifacts.get(FOREST_ARTIFACT)
+        if artifact is None or artifact.loaded:
+            return
+
+        saved = artifact.get()
+        forests = saved['forests'] if 'forests' in saved else saved  # Segment keys are tuples
+        if 'baselines' in saved:
+            self.baselines = saved['baselines']
+
+        for key, forest in forests.items():
+            if key not in self.forests:
+                self.forests.put(key, forest)
+
+        logger.info(f"Loaded {len(self.forests)} fitted forests from registry")
+
+    def _get_trained_lstm(self) -> Optional["keras.Model"]:
+        """Get the trained LSTM Autoencoder (None if never trained)"""
+        if self.lstm_threshold is not None:
+            return self.lstm_autoencoder
+
+        artifact = self.artifacts.get(LSTM_AUTOENCODER_ARTIFACT)
+        if artifact is None:
+            return None
+
+        self.lstm_autoencoder = artifact.get()
+        self.lstm_threshold = artifact.info.params['threshold']
+        return self.lstm_autoencoder
+
+    def save_artifacts(self, registry: ModelRegistry, merge: bool = False) -> Optional[Dict]:
+        """
+        Persist fitted forests, with the baselines of their features, to the registry as a new version
+
+        Args:
+            merge: Keep the latest saved version's forests of segments this
+                instance does not hold (never fitted here, or evicted), and
+                those fitted more recently than its own. Used for snapshots
+                of serving workers, which each see only part of the traffic.
+
+        Returns:
+            Saved version metadata, or None if nothing was fitted yet
+        """
+        self._load_forests()
+        forests = self.forests.snapshot()
+        if not forests:
+            return None
+
+        if not merge:
+            return self._save_forests(registry, forests)
+
+        with registry.exclusive(FOREST_ARTIFACT):  # Sibling workers merge one after another
+            if registry.latest_version(FOREST_ARTIFACT) is not None:
+                saved = registry.load(FOREST_ARTIFACT)
+                for key, forest in (saved['forests'] if 'forests' in saved else saved).items():
+                    if key not in forests or forest.fitted_at > forests[key].fitted_at:
+                        forests[key] = forest
+            return self._save_forests(registry, forests)
+
+    def _save_forests(self, registry: ModelRegistry, forests: Dict) -> Dict:
+        info = registry.save(
+            FOREST_ARTIFACT,
+            {"forests": forests, "baselines": self.baselines},
+            format="joblib",
+            metrics={"segments": len(forests), "accuracy": self.accuracy},
+            params={"segment": self.forests.segment, **self.isolation_forest.get_params()},
+        )
+        return info.to_dict()
+
+    def _build_lstm_autoencoder(self, timesteps: int, n_features: int) -> "keras.Model":
         """
         Build LSTM Autoencoder architecture
 
@@ -60,6 +278,8 @@ class AnomalyDetector:
         Decoder: Reconstructs original time-series
         High reconstruction error = anomaly
         """
+        keras = get_keras()
+
         # Input shape: (timesteps, n_features)
         input_layer = keras.Input(shape=(timesteps, n_features))
 
@@ -92,6 +312,7 @@ class AnomalyDetector:
 
         return autoencoder
 
+    @stage("engineer_features")
     def _engineer_features(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Feature engineering for anomaly detection
@@ -100,31 +321,30 @@ class AnomalyDetector:
         1. Raw values (price, quantity)
         2. Rate of change (% change from previous)
         3. Rolling averages (7-day, 30-day)
-        4. Supplier patterns (historical avg per supplier)
-        """
-        df = df.copy()
-        df = df.sort_values('timestamp')
-
-        # Calculate rate of change
-        df['price_change_rate'] = df['price'].pct_change().fillna(0)
-        df['quantity_change_rate'] = df['quantity'].pct_change().fillna(0)
-
-        # Rolling averages
-        df['price_rolling_7d'] = df['price'].rolling(window=7, min_periods=1).mean()
-        df['price_rolling_30d'] = df['price'].rolling(window=30, min_periods=1).mean()
-        df['quantity_rolling_7d'] = df['quantity'].rolling(window=7, min_periods=1).mean()
-        df['quantity_rolling_30d'] = df['quantity'].rolling(window=30, min_periods=1).mean()
+        4. Supplier patterns (z-scores against supplier/warehouse baselines)
 
-        # Deviation from rolling average
-        df['price_deviation_7d'] = (df['price'] - df['price_rolling_7d']) / df['price_rolling_7d'].replace(0, 1)
-        df['quantity_deviation_7d'] = (df['quantity'] - df['quantity_rolling_7d']) / df['quantity_rolling_7d'].replace(0, 1)
+        Computed per sku/warehouse_id series (rows sorted by series, then
+        timestamp), so a multi-SKU frame never mixes series. New points are
+        added to the baselines first.
+        """
+        self._update_baselines(df)
+        return engineer_features(df, baselines=self.baselines)
 
-        return df
+    def _update_baselines(self, data: pd.DataFrame) -> None:
+        self._load_forests()  # Saved forests come with the baselines they were fitted against
+        with stage("baselines_update"):
+            self.baselines.update(data)
 
     async def detect(self, data: pd.DataFrame, sensitivity: float = 0.05) -> Dict:
+        """Detect anomalies in inventory data (see detect_sync)"""
+        return self.detect_sync(data, sensitivity=sensitivity)
+
+    def detect_sync(self, data: pd.DataFrame, sensitivity: float = 0.05) -> Dict:
         """
         Detect anomalies in inventory data
 
+        Synchronous and CPU-bound: the API runs it on the model executor.
+
         Args:
             data: DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
             sensitivity: Contamination factor (0.01-0.2, default 0.05 = 5% expected anomalies)
@@ -132,29 +352,165 @@ class AnomalyDetector:
         Returns:
             Dict with is_anomaly, confidence, anomaly_type, severity, explanation
         """
-        # Feature engineering
         df = self._engineer_features(data)
+        self.feature_store.seed(self._series_key(df.iloc[-1]), df)
 
-        # Select features for model
-        feature_cols = [
-            'price', 'quantity',
-            'price_change_rate', 'quantity_change_rate',
-            'price_deviation_7d', 'quantity_deviation_7d',
-        ]
+        if_result = self._score_isolation_forest(df, sensitivity)
+        lstm_result = self._score_lstm([df])[0]
+
+        return self._build_result(df.iloc[-1], if_result, lstm_result)
 
-        X = df[feature_cols].fillna(0).values
+    async def detect_point(self, observation: Dict, sensitivity: float = 0.05) -> Dict:
+        """Score one new observation of a known series (see detect_point_sync)"""
+        return self.detect_point_sync(observation, sensitivity=sensitivity)
 
-        # Method 1: Isolation Forest (unsupervised)
-        if_predictions = self.isolation_forest.fit_predict(X)
-        if_scores = self.isolation_forest.score_samples(X)
+    def detect_point_sync(self, observation: Dict, sensitivity: float = 0.05) -> Dict:
+        """
+        Score one new observation without its history
+
+        Uses the streaming feature state kept per series (rolling windows,
+        last values) and the segment's fitted forest, so the cost is O(1) in
+        the history length. The series must have been scored once with its
+        full history (detect/detect_batch) to seed that state.
 
-        # Anomaly if prediction is -1
-        is_anomaly_if = if_predictions[-1] == -1
-        if_confidence = abs(if_scores[-1])  # More negative = more anomalous
+        Args:
+            observation: Dict with timestamp, sku, quantity, price, supplier_id, warehouse_id
+            sensitivity: Contamination factor (0.01-0.2)
+
+        Raises:
+            LookupError: Series or segment has no state yet (send full history first)
+            ValueError: Observation is older than the latest one seen
+        """
+        self._load_forests()
+        series_key = self._series_key(observation)
+        segment_key = self.forests.row_segment_key(observation)
+
+        # The series' state is updated and read under its lock (concurrent points of one series)
+        with self.feature_store.lock(series_key):
+            state = self.feature_store.get(series_key)
+            forest = self.forests.get(segment_key)
+
+            if state is None or forest is None:
+                raise LookupError(f"No history for series {series_key}; send its full history first")
+
+            n_observations = state.n_observations
+            features = state.update(observation['timestamp'], observation['price'], observation['quantity'])
+            window = state.standardized_window()
+
+            if state.n_observations > n_observations:  # Not a re-sent observation
+                with self.forests.lock(segment_key):
+                    forest.points_since_fit += 1
+                    forest.last_timestamp = max(forest.last_timestamp or state.last_timestamp, state.last_timestamp)
+
+        self.baselines.observe(observation)
+        features = {**features, **self.baselines.point_features(observation)}
+
+        X = np.nan_to_num(np.array([[features[col] for col in FOREST_FEATURES]]), nan=0.0)
+        latest_score = forest.score_samples(X)[0]
+        if_result = (bool(latest_score < forest.threshold(sensitivity)), float(abs(latest_score)))
+
+        lstm_result = self._score_lstm_windows([window])[0]
+
+        return self._build_result(features, if_result, lstm_result)
+
+    def _series_key(self, row) -> tuple:
+        """(sku, warehouse_id) of an observation"""
+        return tuple(None if pd.isna(row.get(col)) else row.get(col) for col in SERIES_KEYS)
+
+    def _score_isolation_forest(self, df: pd.DataFrame, sensitivity: float) -> Tuple[bool, float]:
+        """
+        Method 1: Isolation Forest (unsupervised, fitted once per segment)
+
+        Returns:
+            (is_anomaly, confidence) for the latest point
+        """
+        X = df[FOREST_FEATURES].fillna(0).values
+
+        forest = self._get_forest(df, X)
+        with stage("isolation_forest_score"):
+            latest_score = forest.score_samples(X[-1:])[0]
+
+        return self._forest_result(forest, latest_score, sensitivity)
+
+    def _forest_result(self, forest: FittedForest, score: float, sensitivity: float) -> Tuple[bool, float]:
+        """(is_anomaly, confidence) of a forest score"""
+        # Anomaly if latest point scores below the sensitivity threshold
+        is_anomaly = score < forest.threshold(sensitivity)
+        confidence = abs(score)  # More negative = more anomalous
+
+        return bool(is_anomaly), float(confidence)
+
+    def _score_lstm(self, dfs: List[pd.DataFrame]) -> List[Tuple[bool, float]]:
+        """
+        Method 2: LSTM Autoencoder reconstruction error
 
-        # Mock LSTM prediction for now (TODO: Implement training pipeline)
-        is_anomaly_lstm = False
-        lstm_confidence = 0.0
+        The latest 30-day window of every series is scored in one batched
+        predict call. Series are skipped (not anomalous) until the model is
+        trained or when they are shorter than one window.
+
+        Returns:
+            (is_anomaly, confidence) for the latest window of each series
+        """
+        if self._get_trained_lstm() is None:
+            return [(False, 0.0)] * len(dfs)
+
+        windows = []
+        for df in dfs:
+            values = self._lstm_inputs(df)
+            windows.append(values[-LSTM_TIMESTEPS:] if len(values) >= LSTM_TIMESTEPS else None)
+
+        return self._score_lstm_windows(windows)
+
+    def _score_lstm_windows(self, windows: List[Optional[np.ndarray]]) -> List[Tuple[bool, float]]:
+        """Score standardized (timesteps, features) windows in one batched call (None = skip)"""
+        results = [(False, 0.0)] * len(windows)
+
+        model = self._get_trained_lstm()
+        if model is None:
+            return results
+
+        windows = {i: window for i, window in enumerate(windows) if window is not None}
+        if not windows:
+            return results
+
+        errors = self._reconstruction_errors(model, np.stack(list(windows.values())))
+
+        for i, error in zip(windows, errors):
+            # Confidence is 0.5 at the threshold and approaches 1 for large errors
+            results[i] = (bool(error > self.lstm_threshold), float(error / (error + self.lstm_threshold)))
+
+        return results
+
+    def _lstm_inputs(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        LSTM input features of one series, standardized per series
+
+        Per-series scaling lets one autoencoder serve SKUs with very
+        different price and quantity levels.
+        """
+        values = df[LSTM_FEATURES].fillna(0).to_numpy(dtype=np.float32)
+        values[~np.isfinite(values)] = 0.0
+
+        std = values.std(axis=0)
+        std[std == 0] = 1.0
+
+        return (values - values.mean(axis=0)) / std
+
+    @stage("lstm_score")
+    def _reconstruction_errors(self, model: "keras.Model", X: np.ndarray, batch_size: int = 1024) -> np.ndarray:
+        """Mean squared reconstruction error per window"""
+        errors = []
+        for start in range(0, len(X), batch_size):
+            batch = X[start:start + batch_size]
+            reconstructed = np.asarray(model.predict_on_batch(batch))
+            errors.append(np.mean((reconstructed - batch) ** 2, axis=(1, 2)))
+
+        return np.concatenate(errors) if errors else np.empty(0, dtype=np.float32)
+
+    def _build_result(self, latest: Mapping, if_result: Tuple[bool, float], lstm_result: Tuple[bool, float]) -> Dict:
+        """Combine model outputs into the detection response for the latest point (engineered features)"""
+        is_anomaly_if, if_confidence = if_result
+        is_anomaly_lstm, lstm_confidence = lstm_result
 
         # Ensemble: Combine both methods
         is_anomaly = is_anomaly_if or is_anomaly_lstm
@@ -165,8 +521,6 @@ class AnomalyDetector:
         severity = "low"
 
         if is_anomaly:
-            latest = df.iloc[-1]
-
             # Price spike detection
             if abs(latest['price_deviation_7d']) > 0.5:  # 50% deviation
                 anomaly_type = "price_spike"
@@ -190,7 +544,7 @@ class AnomalyDetector:
         explanation = self._generate_explanation(
             is_anomaly=is_anomaly,
             anomaly_type=anomaly_type,
-            data=df.iloc[-1] if is_anomaly else None
+            data=latest if is_anomaly else None
         )
 
         # Recommended action
@@ -205,7 +559,268 @@ class AnomalyDetector:
             "recommended_action": recommended_action,
         }
 
-    def _generate_explanation(self, is_anomaly: bool, anomaly_type: Optional[str], data: Optional[pd.Series]) -> str:
+    def train_lstm(
+        self,
+        data: pd.DataFrame,
+        epochs: int = 20,
+        batch_size: int = 256,
+        threshold_quantile: float = 0.99,
+    ) -> Dict:
+        """
+        Train the LSTM Autoencoder offline on historical series
+
+        Every 30-day window of every sku/warehouse_id series is used as a
+        training sample. The anomaly threshold is the `threshold_quantile`
+        of reconstruction errors on the training windows.
+
+        Args:
+            data: Long-format DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
+            epochs: Training epochs
+            batch_size: Training batch size
+            threshold_quantile: Share of training windows considered normal
+
+        Returns:
+            Dict with training metrics (windows, series, loss, threshold)
+        """
+        windows = []
+        with stage("engineer_features"):
+            featured = engineer_series(data)
+        for df in featured:
+            values = self._lstm_inputs(df)
+            if len(values) >= LSTM_TIMESTEPS:
+                windows.append(sliding_windows(values, LSTM_TIMESTEPS))
+
+        if not windows:
+            raise ValueError(f"No series with at least {LSTM_TIMESTEPS} data points to train on")
+
+        X = np.concatenate(windows)
+        logger.info(f"Training LSTM Autoencoder on {len(X)} windows from {len(windows)} series")
+
+        model = self._build_lstm_autoencoder(timesteps=LSTM_TIMESTEPS, n_features=len(LSTM_FEATURES))
+        history = model.fit(X, X, epochs=epochs, batch_size=batch_size, shuffle=True, verbose=0)
+
+        errors = self._reconstruction_errors(model, X)
+        threshold = float(np.quantile(errors, threshold_quantile))
+
+        self.lstm_autoencoder = model
+        self.lstm_threshold = threshold
+        self.trained_at = datetime.now()
+
+        metrics = {
+            "windows": int(len(X)),
+            "series": len(windows),
+            "loss": round(float(history.history['loss'][-1]), 6),
+            "threshold": round(threshold, 6),
+            "threshold_quantile": threshold_quantile,
+        }
+        logger.info(f"✅ LSTM Autoencoder trained: {metrics}")
+
+        return metrics
+
+    def train_forests(self, data: pd.DataFrame) -> Dict:
+        """
+        Fit the Isolation Forest of every segment offline on historical series
+
+        Features are the serving ones: supplier/warehouse baselines are built
+        from `data` first, then each segment's forest is fitted on all of
+        its rows. Segments with fewer than MIN_HISTORY_POINTS rows are skipped.
+
+        Args:
+            data: Long-format DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
+
+        Returns:
+            Dict with training metrics (segments, rows, skipped segments)
+        """
+        self._update_baselines(data)
+        with stage("engineer_features"):
+            featured = engineer_features(data, baselines=self.baselines)
+
+        columns = SEGMENT_COLUMNS[self.forests.segment]
+        groups = featured.groupby(columns, sort=False, dropna=False) if columns else [((), featured)]
+
+        rows, skipped = 0, 0
+        for values, df in groups:
+            if len(df) < MIN_HISTORY_POINTS:
+                skipped += 1
+                continue
+
+            key = tuple(None if pd.isna(value) else value for value in values)
+            self.forests.fit(key, df[FOREST_FEATURES].fillna(0).values, last_timestamp=df['timestamp'].max())
+            rows += len(df)
+
+        if not rows:
+            raise ValueError(f"No segment with at least {MIN_HISTORY_POINTS} data points to train on")
+
+        self.trained_at = datetime.now()
+
+        metrics = {"segments": len(self.forests), "rows": rows, "skipped_segments": skipped}
+        logger.info(f"✅ Isolation Forests trained: {metrics}")
+
+        return metrics
+
+    def save_lstm(self, registry: ModelRegistry, metrics: Optional[Dict] = None) -> Dict:
+        """Persist the trained LSTM Autoencoder to the registry as a new version"""
+        if self.lstm_threshold is None:
+            raise ValueError("LSTM Autoencoder is not trained")
+
+        info = registry.save(
+            LSTM_AUTOENCODER_ARTIFACT,
+            self.lstm_autoencoder,
+            format="keras",
+            metrics=metrics,
+            params={
+                "threshold": self.lstm_threshold,
+                "timesteps": LSTM_TIMESTEPS,
+                "features": LSTM_FEATURES,
+            },
+            trained_at=self.trained_at,
+        )
+        return info.to_dict()
+
+    def _get_forest(self, df: pd.DataFrame, X: np.ndarray) -> FittedForest:
+        """
+        Get the fitted forest for the segment of a series
+
+        Fits on the series history the first time a segment is seen, then only
+        counts new observations until the forest is due for refresh.
+        """
+        self._load_forests()
+
+        key = self.forests.segment_key(df)
+        last_timestamp = df['timestamp'].iloc[-1]
+
+        with self.forests.lock(key):
+            forest = self.forests.get(key)
+
+            if forest is not None:
+                if forest.last_timestamp is not None:
+                    forest.points_since_fit += int((df['timestamp'] > forest.last_timestamp).sum())
+                forest.last_timestamp = max(forest.last_timestamp or last_timestamp, last_timestamp)
+
+            if forest is None or self.forests.needs_refit(forest, X.shape[1]):
+                forest = self.forests.fit(key, X, last_timestamp=last_timestamp)
+
+        return forest
+
+    async def detect_batch(self, data: pd.DataFrame, sensitivity: float = 0.05) -> Dict:
+        """Detect anomalies for many SKU series in a single call (see detect_batch_sync)"""
+        return self.detect_batch_sync(data, sensitivity=sensitivity)
+
+    def detect_batch_sync(self, data: pd.DataFrame, sensitivity: float = 0.05) -> Dict:
+        """
+        Detect anomalies for many SKU series in a single call
+
+        Rows are grouped by (sku, warehouse_id) and each series is scored
+        independently, so one request can replace thousands of single-SKU calls.
+
+        Args:
+            data: Long-format DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
+            sensitivity: Contamination factor applied to every series
+
+        Returns:
+            Dict with per-series `results` (detect() output + sku/warehouse_id)
+            and `errors` for series that could not be scored
+        """
+        scored = []  # (sku, warehouse_id, features, Isolation Forest result)
+        errors = []
+
+        # Features of every series in one vectorized pass
+        self._update_baselines(data)
+        with stage("engineer_features"):
+            featured = engineer_series(data, baselines=self.baselines)
+
+        for df in featured:
+            sku, warehouse_id = self._series_key(df.iloc[-1])
+
+            if len(df) < MIN_HISTORY_POINTS:
+                errors.append({
+                    "sku": sku,
+                    "warehouse_id": warehouse_id,
+                    "detail": f"At least {MIN_HISTORY_POINTS} data points required, got {len(df)}",
+                })
+                continue
+
+            try:
+                self.feature_store.seed((sku, warehouse_id), df)
+                scored.append((sku, warehouse_id, df, self._score_isolation_forest(df, sensitivity)))
+            except Exception as e:
+                logger.error(f"Anomaly detection failed for {sku}/{warehouse_id}: {e}")
+                errors.append({"sku": sku, "warehouse_id": warehouse_id, "detail": str(e)})
+
+        # LSTM scores all series in one batched call
+        lstm_results = self._score_lstm([df for _, _, df, _ in scored])
+
+        results = [
+            {"sku": sku, "warehouse_id": warehouse_id, **self._build_result(df.iloc[-1], if_result, lstm_result)}
+            for (sku, warehouse_id, df, if_result), lstm_result in zip(scored, lstm_results)
+        ]
+
+        return {"results": results, "errors": errors}
+
+    def detect_many_sync(self, requests: List[Tuple[pd.DataFrame, float]]) -> List[Union[Dict, Exception]]:
+        """
+        Score many independent detect requests in one call (micro-batching)
+
+        Same result per request as detect_sync, but the latest points of all
+        requests sharing a fitted forest go through one `score_samples` call
+        and every LSTM window through one batched predict. Requests may
+        repeat a series and use different sensitivities.
+
+        Args:
+            requests: (data, sensitivity) per request, as passed to detect_sync
+
+        Returns:
+            detect_sync() output, or the exception raised, per request (in order)
+        """
+        results: List[Union[Dict, Exception]] = [None] * len(requests)
+        prepared = []  # (request index, features, forest, latest forest inputs, sensitivity)
+
+        # Features of all well-formed requests in one pass (each request is its own series);
+        # the others are engineered alone below, so only they fail
+        batchable = [i for i, (data, _) in enumerate(requests) if len(data) and set(INPUT_COLUMNS) <= set(data.columns)]
+        featured = {}
+        if batchable:
+            try:
+                # One request's timestamps (tz-aware, unparsable) must not fail the others
+                combined = pd.concat([
+                    requests[i][0].assign(timestamp=naive_utc(requests[i][0]['timestamp'])) for i in batchable
+                ])
+                self._update_baselines(combined)
+                with stage("engineer_features"):
+                    codes = np.repeat(batchable, [len(requests[i][0]) for i in batchable])
+                    frames = engineer_series(combined, codes, baselines=self.baselines)
+                featured = dict(zip(batchable, frames))
+            except Exception as e:
+                logger.warning(f"Batched feature engineering failed, engineering requests one by one: {e}")
+
+        for i, (data, sensitivity) in enumerate(requests):
+            try:
+                df = featured[i] if i in featured else self._engineer_features(data)
+                self.feature_store.seed(self._series_key(df.iloc[-1]), df)
+                X = df[FOREST_FEATURES].fillna(0).values
+                prepared.append((i, df, self._get_forest(df, X), X[-1], sensitivity))
+            except Exception as e:
+                results[i] = e
+
+        # One score_samples call per fitted forest
+        by_forest: Dict[int, List[int]] = {}
+        for j, (_, _, forest, _, _) in enumerate(prepared):
+            by_forest.setdefault(id(forest), []).append(j)
+
+        scores = np.empty(len(prepared))
+        with stage("isolation_forest_score"):
+            for members in by_forest.values():
+                forest = prepared[members[0]][2]
+                scores[members] = forest.score_samples(np.stack([prepared[j][3] for j in members]))
+
+        lstm_results = self._score_lstm([df for _, df, _, _, _ in prepared])
+
+        for (i, df, forest, _, sensitivity), score, lstm_result in zip(prepared, scores, lstm_results):
+            results[i] = self._build_result(df.iloc[-1], self._forest_result(forest, score, sensitivity), lstm_result)
+
+        return results
+
+    def _generate_explanation(self, is_anomaly: bool, anomaly_type: Optional[str], data: Optional[Mapping]) -> str:
         """Generate human-readable explanation"""
         if not is_anomaly:
             return "No anomaly detected. Inventory data is within normal parameters."
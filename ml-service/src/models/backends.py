@@ -0,0 +1,64 @@
+"""
+Lazy loaders for heavy ML frameworks
+
+TensorFlow/Keras and Prophet cost seconds and hundreds of MB to import.
+They are imported on first use (or when warmed at startup), so workers
+that only serve the Isolation Forest path never load them.
+"""
+
+import sys
+import threading
+import time
+from typing import Any, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds spent importing each framework in this process
+load_times: Dict[str, float] = {}
+
+_lock = threading.Lock()
+_modules: Dict[str, Any] = {}
+
+
+def _load(name: str, loader) -> Any:
+    if name not in _modules:
+        with _lock:
+            if name not in _modules:
+                start = time.perf_counter()
+                _modules[name] = loader()
+                load_times[name] = time.perf_counter() - start
+                logger.info(f"Loaded {name} in {load_times[name]:.2f}s")
+    return _modules[name]
+
+
+def _import_keras():
+    from tensorflow import keras
+    return keras
+
+
+def _import_prophet():
+    from prophet import Prophet
+    return Prophet
+
+
+def get_keras() -> Any:
+    """The `tensorflow.keras` module (imported on first call)"""
+    return _load("tensorflow", _import_keras)
+
+
+def get_prophet() -> Any:
+    """The `prophet.Prophet` class (imported on first call)"""
+    return _load("prophet", _import_prophet)
+
+
+def warm() -> Dict[str, float]:
+    """Import all frameworks now (e.g. on pods that serve LSTM/Prophet traffic)"""
+    get_keras()
+    get_prophet()
+    return dict(load_times)
+
+
+def loaded() -> Dict[str, bool]:
+    """Which heavy frameworks are imported in this process"""
+    return {name: name in sys.modules for name in ("tensorflow", "prophet")}
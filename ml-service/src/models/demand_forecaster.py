@@ -1,19 +1,67 @@
 """
 Demand Forecaster using Prophet + LSTM ensemble
+
+Short or sparse histories are routed to a fast pure-NumPy engine
+(exponential smoothing / Croston, see fast_forecast.py) instead of Prophet.
 """
 
 import numpy as np
 import pandas as pd
-from prophet import Prophet
-import tensorflow as tf
-from tensorflow import keras
 from sklearn.metrics import mean_absolute_percentage_error, mean_squared_error, mean_absolute_error
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+from collections import defaultdict
 import logging
 from datetime import datetime, timedelta
 
+from src.config import Settings, get_settings
+from src.models.backends import get_keras, get_prophet
+from src.models.backtest import (
+    BACKTEST_ENGINES, backtest_fast, backtest_seasonal_naive, evaluate, fold_actuals, fold_windows, rolling_origins,
+)
+from src.models.fast_forecast import (
+    ENGINE_CROSTON, ENGINE_SMOOTHING, accuracy_metrics, daily_series, daily_series_many, forecast_panel, weekday,
+)
+from src.models.registry import ModelRegistry, LazyModel
+from src.models.prophet_cache import ProphetCache, history_digest
+from src.utils.ingest import SERIES_KEYS
+from src.utils.metrics import stage
+from src.utils.windows import window_targets, iter_window_batches
+
+if TYPE_CHECKING:
+    from prophet import Prophet
+    from tensorflow import keras
+
 logger = logging.getLogger(__name__)
 
+# Registry artifact names
+LSTM_FORECASTER_ARTIFACT = "demand_lstm_forecaster"
+BACKTEST_ARTIFACT = "demand_backtests"
+
+# Backtested engine behind each served model_type
+BACKTEST_ENGINE_OF = {
+    "prophet": "prophet",
+    "ensemble": "ensemble",
+    ENGINE_SMOOTHING: "fast",
+    ENGINE_CROSTON: "fast",
+}
+
+# Forecast engines (FORECAST_ENGINE setting)
+FORECAST_ENGINES = ("auto", "prophet", "fast")
+
+# Minimum history per series (3 months of daily data, matches the API contract)
+MIN_HISTORY_POINTS = 90
+
+# LSTM input: 30-day lookback of quantity, trend, seasonality
+LSTM_LOOKBACK = 30
+LSTM_FEATURES = ['quantity', 'trend', 'seasonality']
+
+
+def _warm_start_params(model: "Prophet") -> Dict:
+    """Fitted parameters of a Prophet model, as `init` for fitting a similar history"""
+    params = {name: model.params[name][0][0] for name in ('k', 'm', 'sigma_obs')}
+    params.update({name: model.params[name][0] for name in ('delta', 'beta')})
+    return params
+
 
 class DemandForecaster:
     """
@@ -22,19 +70,36 @@ class DemandForecaster:
     2. LSTM (deep learning for complex patterns)
     """
 
-    def __init__(self):
-        self.prophet_model: Optional[Prophet] = None
-        self.lstm_model: Optional[keras.Model] = None
+    # Registry artifacts the forecaster serves
+    ARTIFACTS = (LSTM_FORECASTER_ARTIFACT, BACKTEST_ARTIFACT)
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        self.prophet_params: Dict = {}
+        self.prophet_cache: Optional[ProphetCache] = None
+        self._lstm_model: Optional["keras.Model"] = None  # Built on first use (imports TensorFlow)
         self.version = "0.1.0"
         self.trained_at: Optional[datetime] = None
         self.metrics: Dict = {}
+        self.artifacts: Dict[str, LazyModel] = {}  # Fitted artifacts from the model registry
+        self._backtests: Optional[Dict[Tuple, Dict]] = None  # Out-of-sample metrics and ensemble weights per series
 
-    async def initialize(self):
-        """Initialize models"""
+    async def initialize(self, registry: Optional[ModelRegistry] = None, versions: Optional[Dict[str, int]] = None):
+        """
+        Initialize models
+
+        When a registry is given, the trained LSTM forecaster and backtest
+        results saved by a previous process are attached and loaded on
+        first use.
+
+        Args:
+            registry: Model registry to attach artifacts from
+            versions: Attach exactly these artifact versions (default: latest of each)
+        """
         logger.info("Initializing Demand Forecaster...")
 
         # Initialize Prophet with seasonality
-        self.prophet_model = Prophet(
+        self.prophet_params = dict(
             yearly_seasonality=True,
             weekly_seasonality=True,
             daily_seasonality=False,
@@ -42,22 +107,99 @@ class DemandForecaster:
             changepoint_prior_scale=0.05,
         )
 
-        # Initialize LSTM architecture
-        self.lstm_model = self._build_lstm_forecaster(
-            lookback_window=30,  # 30-day history
-            n_features=3,  # quantity, trend, seasonality
+        # Fitted models per series (a Prophet object can only be fitted once)
+        self.prophet_cache = ProphetCache(
+            max_entries=self.settings.prophet_cache_size,
+            max_bytes=int(self.settings.prophet_cache_max_mb * 1024 * 1024),
+            ttl_seconds=self.settings.prophet_cache_ttl_seconds,
         )
 
         self.trained_at = datetime.now()
+
+        if registry is not None:
+            self._attach_artifacts(registry, versions)
+
         logger.info("✅ Demand Forecaster initialized")
 
-    def _build_lstm_forecaster(self, lookback_window: int, n_features: int) -> keras.Model:
+    def _new_prophet(self) -> "Prophet":
+        """Unfitted Prophet with the configured seasonality (imports Prophet on first use)"""
+        return get_prophet()(**self.prophet_params)
+
+    @property
+    def lstm_model(self) -> "keras.Model":
+        """LSTM forecaster, built on first access so TensorFlow is only imported when used"""
+        if self._lstm_model is None:
+            self._lstm_model = self._build_lstm_forecaster(
+                lookback_window=LSTM_LOOKBACK,  # 30-day history
+                n_features=len(LSTM_FEATURES),  # quantity, trend, seasonality
+            )
+        return self._lstm_model
+
+    @lstm_model.setter
+    def lstm_model(self, model: "keras.Model"):
+        self._lstm_model = model
+
+    def _attach_artifacts(self, registry: ModelRegistry, versions: Optional[Dict[str, int]] = None):
+        """Attach saved artifacts from the registry (metadata only until loaded)"""
+        for name in self.ARTIFACTS:
+            if versions is not None and name not in versions:
+                continue
+            version = versions[name] if versions else None
+            artifact = registry.lazy(name, version, backend=self.settings.lstm_inference_backend)
+            if artifact is not None:
+                self.artifacts[name] = artifact
+                logger.info(f"Found {name} v{artifact.info.version} (trained {artifact.info.trained_at})")
+
+        if LSTM_FORECASTER_ARTIFACT in self.artifacts:
+            info = self.artifacts[LSTM_FORECASTER_ARTIFACT].info
+            self.trained_at = datetime.fromisoformat(info.trained_at)
+            self.metrics = info.metrics
+
+        if not self.settings.model_registry_lazy_load:
+            self.warm()
+
+    def warm(self, formats: Optional[Sequence[str]] = None):
+        """
+        Load attached artifacts now instead of on first use
+
+        Args:
+            formats: Only artifacts saved in these registry formats (default: all)
+        """
+        for artifact in self.artifacts.values():
+            if formats is None or artifact.info.format in formats:
+                artifact.get()
+
+    @property
+    def artifact_versions(self) -> Dict[str, int]:
+        """Registry version of every attached artifact"""
+        return {name: artifact.info.version for name, artifact in self.artifacts.items()}
+
+    def adopt(self, previous: "DemandForecaster") -> None:
+        """
+        Take over the state of the instance this one replaces (model swap)
+
+        Fitted Prophet models depend only on the history, so the cache is
+        shared. Artifacts of the same version are reused as loaded, and so
+        are backtest results when the backtest artifact did not change.
+        """
+        self.prophet_cache = previous.prophet_cache
+
+        for name, artifact in previous.artifacts.items():
+            if self.artifact_versions.get(name) == artifact.info.version:
+                self.artifacts[name] = artifact
+
+        if self.artifacts.get(BACKTEST_ARTIFACT) is previous.artifacts.get(BACKTEST_ARTIFACT):
+            self._backtests = previous._backtests
+
+    def _build_lstm_forecaster(self, lookback_window: int, n_features: int) -> "keras.Model":
         """
         Build LSTM forecasting architecture
 
         Input: Historical time-series (lookback_window days)
         Output: Next-day demand prediction
         """
+        keras = get_keras()
+
         model = keras.Sequential([
             keras.layers.LSTM(128, activation='relu', return_sequences=True, input_shape=(lookback_window, n_features)),
             keras.layers.Dropout(0.2),
@@ -90,79 +232,437 @@ class DemandForecaster:
 
         return prophet_df.sort_values('ds')
 
+    def _lstm_features(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        LSTM input features of one time-sorted series: (n_steps, 3) float32
+
+        1. quantity
+        2. trend (7-day rolling mean)
+        3. seasonality (quantity minus trend, i.e. the weekly residual)
+        """
+        quantity = df['quantity'].to_numpy(dtype=np.float32)
+        trend = df['quantity'].rolling(window=7, min_periods=1).mean().to_numpy(dtype=np.float32)
+
+        return np.column_stack([quantity, trend, quantity - trend])
+
     def _prepare_lstm_data(self, df: pd.DataFrame, lookback_window: int = 30):
         """
         Prepare sliding window sequences for LSTM
 
-        Creates sequences of (lookback_window) timesteps
+        Creates sequences of (lookback_window) timesteps of LSTM_FEATURES as
+        strided views (no per-window copies)
+
+        Returns:
+            X of shape (n_steps - lookback_window, lookback_window, 3),
+            y of shape (n_steps - lookback_window, 1) (next-day quantity)
         """
-        data = df[['quantity']].values
+        return window_targets(self._lstm_features(df), lookback_window)
 
-        X, y = [], []
-        for i in range(lookback_window, len(data)):
-            X.append(data[i-lookback_window:i])
-            y.append(data[i])
+    def _prepare_lstm_batches(self, data: pd.DataFrame, lookback_window: int = 30, batch_size: int = 1024):
+        """
+        Training batches of (X, y) across many SKU series
 
-        return np.array(X), np.array(y)
+        Windows never cross sku/warehouse_id boundaries; only one batch is
+        materialized at a time.
+        """
+        keys = [col for col in ('sku', 'warehouse_id') if col in data]
+        series = (
+            self._lstm_features(group.sort_values('timestamp'))
+            for _, group in data.groupby(keys, sort=False, dropna=False)
+        )
+        return iter_window_batches(series, lookback_window, batch_size=batch_size)
 
     async def forecast(self, historical_data: pd.DataFrame, horizon: int = 7) -> Dict:
+        """Forecast future demand (see forecast_sync)"""
+        return self.forecast_sync(historical_data, horizon=horizon)
+
+    def forecast_sync(self, historical_data: pd.DataFrame, horizon: int = 7) -> Dict:
         """
         Forecast future demand
 
+        Synchronous and CPU-bound: the API runs it on the model executor.
+
         Args:
             historical_data: DataFrame with columns [timestamp, sku, quantity, price]
             horizon: Number of days to forecast (1-30)
 
         Returns:
-            Dict with forecasts, model_type, accuracy_metrics, confidence
+            Dict with forecasts, model_type (engine used), accuracy_metrics, confidence
+        """
+        if self.settings.forecast_engine != "prophet":
+            daily = daily_series(historical_data)
+            if self._choose_engine(daily[1]) == "fast":
+                return self._with_backtest(self._series_key(historical_data), self._forecast_fast([daily], horizon)[0])
+
+        return self._forecast_prophet(historical_data, horizon)
+
+    def _choose_engine(self, daily: np.ndarray) -> str:
+        """
+        Route a series to Prophet or the fast NumPy engine
+
+        Prophet's yearly seasonality needs long histories and its fit costs
+        seconds, so short or sparse (intermittent) series use the fast path.
+        """
+        engine = self.settings.forecast_engine
+        if engine not in FORECAST_ENGINES:
+            raise ValueError(f"Unknown forecast engine '{engine}', expected one of {list(FORECAST_ENGINES)}")
+        if engine != "auto":
+            return engine
+
+        if len(daily) < self.settings.fast_forecast_max_days:
+            return "fast"
+        if np.mean(daily == 0) >= self.settings.fast_forecast_min_zero_fraction:
+            return "fast"
+        return "prophet"
+
+    @stage("fast_forecast")
+    def _forecast_fast(self, series: List[Tuple[np.datetime64, np.ndarray]], horizon: int) -> List[Dict]:
+        """
+        Forecast many daily series with the fast engine
+
+        Series of equal length are stacked into one panel and forecast with
+        vectorized array operations.
+
+        Args:
+            series: (first day, daily demand) per series, from daily_series()
+            horizon: Number of days to forecast
+
+        Returns:
+            forecast_sync()-shaped dicts, in input order
         """
+        results: List[Optional[Dict]] = [None] * len(series)
+
+        by_length = defaultdict(list)
+        for i, (_, daily) in enumerate(series):
+            by_length[len(daily)].append(i)
+
+        for n_days, positions in by_length.items():
+            panel = np.stack([series[i][1] for i in positions])
+            starts = np.array([series[i][0] for i in positions], dtype='datetime64[D]')
+            out = forecast_panel(panel, weekday(starts), horizon)
+            metrics = accuracy_metrics(panel, out['fitted'])
+
+            # Confidence (based on prediction interval width, as for Prophet)
+            avg_interval_width = (out['upper'] - out['lower']).mean(axis=1)
+            avg_prediction = out['yhat'].mean(axis=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                confidence = np.clip(1.0 - (avg_interval_width / avg_prediction) / 2, 0.0, 1.0)
+            confidence = np.nan_to_num(confidence, nan=0.0)
+
+            dates = (starts[:, None] + n_days + np.arange(horizon)).astype(str)
+            yhat, lower, upper = (out[k].astype(np.int64).tolist() for k in ('yhat', 'lower', 'upper'))
+
+            for row, i in enumerate(positions):
+                results[i] = {
+                    "forecasts": [
+                        {"date": d, "quantity_predicted": q, "lower_bound": lo, "upper_bound": hi}
+                        for d, q, lo, hi in zip(dates[row], yhat[row], lower[row], upper[row])
+                    ],
+                    "model_type": str(out['engine'][row]),
+                    "accuracy_metrics": {name: round(float(values[row]), 2) for name, values in metrics.items()},
+                    "confidence": float(confidence[row]),
+                }
+
+        return results
+
+    def _forecast_prophet(self, historical_data: pd.DataFrame, horizon: int) -> Dict:
+        """Forecast one series with Prophet (see forecast_sync)"""
         # Prepare data
         historical_data = historical_data.sort_values('timestamp')
 
         # Method 1: Prophet forecasting
         prophet_df = self._prepare_prophet_data(historical_data)
 
-        # Train Prophet (fast, handles seasonality well)
-        self.prophet_model.fit(prophet_df)
+        # Train Prophet (reuses the cached fit if the history is unchanged)
+        prophet_model = self._get_prophet_model(historical_data, prophet_df)
 
         # Generate forecast
-        future_dates = self.prophet_model.make_future_dataframe(periods=horizon, freq='D')
-        prophet_forecast = self.prophet_model.predict(future_dates)
+        future_dates = prophet_model.make_future_dataframe(periods=horizon, freq='D')
+        with stage("prophet_predict"):
+            prophet_forecast = prophet_model.predict(future_dates)
 
         # Extract forecasts for future dates only
-        prophet_predictions = prophet_forecast.tail(horizon)[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+        prophet_predictions = prophet_forecast.tail(horizon)
+        dates = prophet_predictions['ds'].dt.strftime('%Y-%m-%d').tolist()
+        yhat, lower, upper = (prophet_predictions[col].to_numpy() for col in ('yhat', 'yhat_lower', 'yhat_upper'))
 
         # Method 2: LSTM forecasting (mock for now - would require training pipeline)
         # TODO: Implement LSTM training and prediction
         lstm_predictions = None  # Placeholder
 
-        # Ensemble: Use Prophet for now (can add LSTM weighting later)
-        forecasts = []
-        for _, row in prophet_predictions.iterrows():
-            forecasts.append({
-                "date": row['ds'].strftime('%Y-%m-%d'),
-                "quantity_predicted": max(0, int(row['yhat'])),  # Ensure non-negative
-                "lower_bound": max(0, int(row['yhat_lower'])),
-                "upper_bound": int(row['yhat_upper']),
-            })
-
-        # Calculate accuracy metrics (on historical data)
+        # Ensemble: blend with the fast engine using the series' backtest weights
+        key = self._series_key(historical_data)
+        weights = self._get_backtests().get(key, {}).get('weights', {})
+        model_type = "prophet"
+        if weights.get('fast'):
+            start, daily = daily_series(historical_data)
+            fast = forecast_panel(daily[None], weekday(np.array([start], dtype='datetime64[D]')), horizon)
+            w_prophet, w_fast = weights.get('prophet', 0.0), weights['fast']
+            yhat, lower, upper = (
+                w_prophet * values + w_fast * fast[name][0]
+                for values, name in ((yhat, 'yhat'), (lower, 'lower'), (upper, 'upper'))
+            )
+            model_type = "ensemble"
+
+        forecasts = [
+            {
+                "date": date,
+                "quantity_predicted": max(0, int(q)),  # Ensure non-negative
+                "lower_bound": max(0, int(lo)),
+                "upper_bound": int(hi),
+            }
+            for date, q, lo, hi in zip(dates, yhat, lower, upper)
+        ]
+
+        # Calculate accuracy metrics (on historical data; replaced by backtest metrics when available)
         accuracy_metrics = self._calculate_accuracy_metrics(
             actual=prophet_df['y'].values,
             predicted=prophet_forecast.head(len(prophet_df))['yhat'].values
         )
 
         # Confidence score (based on prediction interval width)
-        avg_interval_width = (prophet_predictions['yhat_upper'] - prophet_predictions['yhat_lower']).mean()
-        avg_prediction = prophet_predictions['yhat'].mean()
+        avg_interval_width = (upper - lower).mean()
+        avg_prediction = yhat.mean()
         confidence = max(0.0, min(1.0, 1.0 - (avg_interval_width / avg_prediction) / 2))
 
-        return {
+        return self._with_backtest(key, {
             "forecasts": forecasts,
-            "model_type": "prophet",  # Will be "ensemble" when LSTM is added
+            "model_type": model_type,
             "accuracy_metrics": accuracy_metrics,
             "confidence": float(confidence),
-        }
+        })
+
+    def forecast_batch_sync(self, data: pd.DataFrame, horizon: int = 7) -> Dict:
+        """
+        Forecast many SKU series in a single call
+
+        Rows are grouped by (sku, warehouse_id) and each series is forecast
+        independently; series routed to the fast engine are forecast together
+        in one vectorized call. Bulk forecasting sends chunks of series to
+        process pool workers, which call this on their own forecaster.
+
+        Args:
+            data: Long-format DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
+            horizon: Number of days to forecast for every series
+
+        Returns:
+            Dict with per-series `results` (forecast() output + sku/warehouse_id)
+            and `errors` for series that could not be forecast
+        """
+        results: List[Optional[Dict]] = []
+        errors = []
+        fast = []  # (position in results, sku, warehouse_id, daily series) for the fast engine
+
+        # Row positions of each series (frames are only built for Prophet)
+        codes = data.groupby(SERIES_KEYS, sort=False, dropna=False).ngroup().to_numpy()
+        order = np.argsort(codes, kind='stable')
+        rows = np.split(order, np.flatnonzero(np.diff(codes[order])) + 1)
+        keys = data[SERIES_KEYS].to_numpy()[[r[0] for r in rows]]
+        dailies = daily_series_many(data, codes) if self.settings.forecast_engine != "prophet" else None
+
+        for n, ((sku, warehouse_id), positions) in enumerate(zip(keys, rows)):
+            warehouse_id = None if pd.isna(warehouse_id) else warehouse_id
+
+            if len(positions) < MIN_HISTORY_POINTS:
+                errors.append({
+                    "sku": sku,
+                    "warehouse_id": warehouse_id,
+                    "detail": f"At least {MIN_HISTORY_POINTS} data points required, got {len(positions)}",
+                })
+                continue
+
+            try:
+                if dailies is not None and self._choose_engine(dailies[n][1]) == "fast":
+                    fast.append((len(results), sku, warehouse_id, dailies[n]))
+                    results.append(None)
+                    continue
+
+                series = data.iloc[positions]
+                results.append({"sku": sku, "warehouse_id": warehouse_id, **self._forecast_prophet(series, horizon)})
+            except Exception as e:
+                logger.error(f"Demand forecasting failed for {sku}/{warehouse_id}: {e}")
+                errors.append({"sku": sku, "warehouse_id": warehouse_id, "detail": str(e)})
+
+        # Fast engine forecasts all its series in one vectorized call
+        if fast:
+            try:
+                for (position, sku, warehouse_id, _), result in zip(fast, self._forecast_fast([f[3] for f in fast], horizon)):
+                    result = self._with_backtest((sku, warehouse_id), result)
+                    results[position] = {"sku": sku, "warehouse_id": warehouse_id, **result}
+            except Exception as e:
+                logger.error(f"Fast demand forecasting failed for {len(fast)} series: {e}")
+                errors.extend({"sku": sku, "warehouse_id": warehouse_id, "detail": str(e)} for _, sku, warehouse_id, _ in fast)
+
+        return {"results": [r for r in results if r is not None], "errors": errors}
+
+    def backtest_sync(
+        self,
+        data: pd.DataFrame,
+        horizon: int = 7,
+        folds: int = 4,
+        step: Optional[int] = None,
+        engines: Tuple[str, ...] = BACKTEST_ENGINES,
+    ) -> Dict:
+        """
+        Rolling-origin backtest of many SKU series (see backtest.py)
+
+        Series are binned to daily demand and grouped by length; each group
+        is one (series, fold, horizon) error array per engine. Results are
+        kept for forecasting: the out-of-sample metrics replace the in-sample
+        ones and the weights blend Prophet with the fast engine.
+
+        Args:
+            data: Long-format DataFrame with columns [timestamp, sku, quantity, price, supplier_id, warehouse_id]
+            horizon: Days forecast from every origin
+            folds: Forecast origins per series
+            step: Days between origins (default: horizon)
+            engines: Engines to backtest (fast, seasonal_naive, prophet)
+
+        Returns:
+            Dict with per-series `results` (metrics per engine, ensemble
+            weights) and `errors` for series that could not be backtested
+        """
+        unknown = set(engines) - set(BACKTEST_ENGINES)
+        if unknown:
+            raise ValueError(f"Unknown backtest engines {sorted(unknown)}, expected some of {list(BACKTEST_ENGINES)}")
+
+        codes = data.groupby(SERIES_KEYS, sort=False, dropna=False).ngroup().to_numpy()
+        first_rows = np.unique(codes, return_index=True)[1]
+        keys = [
+            tuple(None if pd.isna(value) else value for value in row)
+            for row in data[SERIES_KEYS].to_numpy(dtype=object)[first_rows]
+        ]
+        dailies = daily_series_many(data, codes)
+
+        results: List[Optional[Dict]] = [None] * len(keys)
+        errors = []
+        backtests = self._get_backtests()
+
+        by_length = defaultdict(list)
+        for i, (_, daily) in enumerate(dailies):
+            by_length[len(daily)].append(i)
+
+        for n_days, positions in by_length.items():
+            try:
+                cutoffs = rolling_origins(n_days, horizon, folds, step)
+            except ValueError as e:
+                errors.extend({"sku": keys[i][0], "warehouse_id": keys[i][1], "detail": str(e)} for i in positions)
+                continue
+
+            # Fixed-length training windows: every (series, fold) has the same shape
+            window = int(cutoffs[0])
+            panel = np.stack([dailies[i][1] for i in positions])
+            starts = np.array([dailies[i][0] for i in positions], dtype='datetime64[D]')
+            window_starts = starts[:, None] + (cutoffs - window)
+            windows = fold_windows(panel, cutoffs, window)
+
+            predictions = {}
+            with stage("backtest"):
+                if "fast" in engines:
+                    predictions["fast"] = backtest_fast(windows, weekday(window_starts), horizon)
+                if "seasonal_naive" in engines:
+                    predictions["seasonal_naive"] = backtest_seasonal_naive(windows, horizon)
+                if "prophet" in engines:
+                    predictions["prophet"] = self._backtest_prophet(windows, window_starts, horizon)
+
+                evaluation = evaluate(predictions, fold_actuals(panel, cutoffs, horizon))
+
+            weights = evaluation.pop("weights", {})
+            for row, i in enumerate(positions):
+                backtest = {
+                    "metrics": {
+                        engine: {name: round(float(values[row]), 2) for name, values in metrics.items()}
+                        for engine, metrics in evaluation.items()
+                    },
+                    "weights": {engine: round(float(w[row]), 4) for engine, w in weights.items()},
+                }
+                backtests[keys[i]] = backtest
+                results[i] = {"sku": keys[i][0], "warehouse_id": keys[i][1], "folds": folds, "horizon": horizon, **backtest}
+
+        return {"results": [r for r in results if r is not None], "errors": errors}
+
+    def _backtest_prophet(self, windows: np.ndarray, window_starts: np.ndarray, horizon: int) -> np.ndarray:
+        """
+        Prophet forecasts of every (series, fold) window
+
+        Folds of a series are fitted in order, each warm-started from the
+        previous fold's parameters, so later fits converge in few iterations.
+        """
+        n_series, folds, window = windows.shape
+        predictions = np.empty((n_series, folds, horizon))
+
+        for s in range(n_series):
+            warm_start = {}
+            for f in range(folds):
+                days = window_starts[s, f] + np.arange(window + horizon)
+                history = pd.DataFrame({'ds': pd.to_datetime(days[:window]), 'y': windows[s, f]})
+
+                model = self._new_prophet()
+                with stage("prophet_fit"):
+                    model.fit(history, **warm_start)
+                forecast = model.predict(pd.DataFrame({'ds': pd.to_datetime(days[window:])}))
+
+                predictions[s, f] = np.maximum(forecast['yhat'].to_numpy(), 0)
+                warm_start = {'init': _warm_start_params(model)}
+
+        return predictions
+
+    def _get_backtests(self) -> Dict[Tuple, Dict]:
+        """Backtest results per series (loaded from the registry on first use)"""
+        if self._backtests is None:
+            artifact = self.artifacts.get(BACKTEST_ARTIFACT)
+            self._backtests = dict(artifact.get()) if artifact is not None else {}
+        return self._backtests
+
+    def set_backtests(self, results: List[Dict]) -> None:
+        """Use backtest_sync() results (e.g. merged from bulk workers) for forecasting"""
+        backtests = self._get_backtests()
+        for result in results:
+            backtests[(result['sku'], result['warehouse_id'])] = {
+                "metrics": result['metrics'],
+                "weights": result['weights'],
+            }
+
+    def save_backtests(self, registry: ModelRegistry) -> Dict:
+        """Persist backtest metrics and ensemble weights to the registry as a new version"""
+        backtests = self._get_backtests()
+        if not backtests:
+            raise ValueError("No backtest results to save")
+
+        info = registry.save(BACKTEST_ARTIFACT, backtests, format="joblib", metrics={"series": len(backtests)})
+        return info.to_dict()
+
+    def _series_key(self, df: pd.DataFrame) -> Tuple:
+        """(sku, warehouse_id) of a single-series frame"""
+        latest = df.iloc[-1]
+        return tuple(None if pd.isna(latest.get(col)) else latest.get(col) for col in SERIES_KEYS)
+
+    def _with_backtest(self, key: Tuple, result: Dict) -> Dict:
+        """Report the series' out-of-sample metrics for the engine used, when it was backtested"""
+        backtest = self._get_backtests().get(key)
+        engine = BACKTEST_ENGINE_OF.get(result['model_type'])
+        if backtest is not None and engine in backtest['metrics']:
+            result['accuracy_metrics'] = dict(backtest['metrics'][engine])
+        return result
+
+    def _get_prophet_model(self, historical_data: pd.DataFrame, prophet_df: pd.DataFrame) -> "Prophet":
+        """
+        Get a Prophet model fitted on this history
+
+        Cached per series (sku/warehouse_id) and history digest, so only new
+        or changed data triggers a Stan fit.
+        """
+        key = self._series_key(historical_data)
+        digest = history_digest(prophet_df)
+
+        model = self.prophet_cache.get(key, digest)
+        if model is None:
+            model = self._new_prophet()
+            with stage("prophet_fit"):
+                model.fit(prophet_df)
+            self.prophet_cache.set(key, digest, model)
+
+        return model
 
     def _calculate_accuracy_metrics(self, actual: np.ndarray, predicted: np.ndarray) -> Dict:
         """
@@ -0,0 +1,202 @@
+"""
+LSTM inference without TensorFlow
+
+Keras artifacts in the registry can be exported to ONNX or TFLite, and
+served through ONNX Runtime or the TFLite interpreter instead of Keras
+(LSTM_INFERENCE_BACKEND=onnx|tflite):
+
+- Exporting needs TensorFlow; it runs offline or in the training job,
+  next to the Keras file of the same registry version
+- Serving imports only the small runtime; runners expose the
+  `predict_on_batch` the models already call, so they are drop-in
+  replacements for the Keras model
+- LSTMs are exported unrolled over their (fixed) timesteps: plain builtin
+  ops with a dynamic batch dimension, no TensorList/Flex ops
+- A version without the requested export is served with Keras
+
+Usage:
+    python -m src.models.inference --registry /app/models --backend tflite onnx
+"""
+
+import argparse
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Inference backends of Keras artifacts ("keras": the saved model itself)
+INFERENCE_BACKENDS = ("keras", "onnx", "tflite")
+
+ONNX_OPSET = 13
+
+
+def _threads(threads: Optional[int]) -> int:
+    from src.config import get_settings
+    return threads or get_settings().worker_threads
+
+
+class OnnxRunner:
+    """Exported model served by ONNX Runtime (thread-safe)"""
+
+    backend = "onnx"
+
+    def __init__(self, path: str, threads: Optional[int] = None):
+        import onnxruntime
+
+        options = onnxruntime.SessionOptions()
+        options.intra_op_num_threads = _threads(threads)
+        options.inter_op_num_threads = 1
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict_on_batch(self, X: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: np.asarray(X, dtype=np.float32)})[0]
+
+
+def _tflite_interpreter() -> Any:
+    """TFLite interpreter class, from the standalone runtimes when installed"""
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            logger.warning("No standalone TFLite runtime installed, using TensorFlow's interpreter")
+            import tensorflow as tf
+            return tf.lite.Interpreter
+    return Interpreter
+
+
+class TFLiteRunner:
+    """
+    Exported model served by the TFLite interpreter
+
+    The interpreter is resized when the batch size changes and is not
+    thread-safe, so calls are serialized.
+    """
+
+    backend = "tflite"
+
+    def __init__(self, path: str, threads: Optional[int] = None):
+        self.interpreter = _tflite_interpreter()(model_path=path, num_threads=_threads(threads))
+        self._input = self.interpreter.get_input_details()[0]['index']
+        self._output = self.interpreter.get_output_details()[0]['index']
+        self._shape: Optional[tuple] = None
+        self._lock = threading.Lock()
+
+    def predict_on_batch(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        with self._lock:
+            if X.shape != self._shape:
+                self.interpreter.resize_tensor_input(self._input, X.shape)
+                self.interpreter.allocate_tensors()
+                self._shape = X.shape
+            self.interpreter.set_tensor(self._input, X)
+            self.interpreter.invoke()
+            return self.interpreter.get_tensor(self._output).copy()
+
+
+RUNNERS = {"onnx": OnnxRunner, "tflite": TFLiteRunner}
+
+
+def load_runner(backend: str, path: str, threads: Optional[int] = None) -> Any:
+    """
+    Runner serving an exported model file
+
+    Args:
+        threads: Intra-op threads (default: the worker's thread budget)
+    """
+    return RUNNERS[backend](path, threads)
+
+
+def _keras() -> Any:
+    from src.models.backends import get_keras
+    return get_keras()
+
+
+def unrolled(model: Any) -> Any:
+    """Copy of a Keras model with every recurrent layer unrolled (same weights)"""
+    keras = _keras()
+
+    def clone(layer):
+        config = layer.get_config()
+        if isinstance(layer, keras.layers.RNN):
+            config['unroll'] = True
+        return layer.__class__.from_config(config)
+
+    copy = keras.models.clone_model(model, clone_function=clone)
+    copy.set_weights(model.get_weights())
+    return copy
+
+
+def export_model(model: Any, backend: str) -> bytes:
+    """
+    Serialized ONNX or TFLite copy of a Keras model
+
+    Raises:
+        ValueError: Unknown backend
+    """
+    import tensorflow as tf
+
+    model = unrolled(model)
+    if backend == "tflite":
+        return tf.lite.TFLiteConverter.from_keras_model(model).convert()
+
+    if backend == "onnx":
+        import tf2onnx
+
+        spec = (tf.TensorSpec((None, *model.inputs[0].shape[1:]), tf.float32, name="inputs"),)
+        forward = tf.function(lambda inputs: model(inputs, training=False), input_signature=spec)
+        proto, _ = tf2onnx.convert.from_function(forward, input_signature=spec, opset=ONNX_OPSET)
+        return proto.SerializeToString()
+
+    raise ValueError(f"Unknown export backend '{backend}', expected one of {list(RUNNERS)}")
+
+
+def export_artifact(registry: Any, name: str, backend: str, version: Optional[int] = None) -> Dict:
+    """
+    Export a Keras registry artifact and store the copy with its version
+
+    Returns:
+        Updated version metadata
+    """
+    info = registry.get_info(name, version)
+    if info is None:
+        raise FileNotFoundError(f"No saved version of model '{name}'")
+    if info.format != "keras":
+        raise ValueError(f"{name} v{info.version} is a {info.format} artifact, only keras artifacts are exported")
+
+    model = registry.load(name, info.version)
+    info = registry.add_export(name, info.version, backend, export_model(model, backend))
+    logger.info(f"📤 Exported {name} v{info.version} to {backend}")
+    return info.to_dict()
+
+
+def main(argv: Optional[List[str]] = None):
+    from src.models.anomaly_detector import LSTM_AUTOENCODER_ARTIFACT
+    from src.models.demand_forecaster import LSTM_FORECASTER_ARTIFACT
+    from src.models.registry import ModelRegistry
+    from src.utils.logger import setup_logger
+
+    parser = argparse.ArgumentParser(description="Export Keras registry artifacts to ONNX/TFLite")
+    parser.add_argument("--registry", required=True, help="Model registry directory")
+    parser.add_argument("--backend", nargs="+", default=["tflite"], choices=list(RUNNERS))
+    parser.add_argument("--models", nargs="+", default=[LSTM_AUTOENCODER_ARTIFACT, LSTM_FORECASTER_ARTIFACT])
+    parser.add_argument("--version", type=int, default=None, help="Version to export (default: latest)")
+    args = parser.parse_args(argv)
+
+    setup_logger(__name__)
+    registry = ModelRegistry(args.registry)
+    for name in args.models:
+        if registry.get_info(name, args.version) is None:
+            logger.warning(f"No saved version of {name}, skipped")
+            continue
+        for backend in args.backend:
+            export_artifact(registry, name, backend, args.version)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Served model versions with atomic hot swap
+
+The API serves one model instance per slot (anomaly_detector,
+demand_forecaster). Deploying new registry artifact versions does not
+restart the worker:
+
+- The new instance is built and warmed in a thread from pinned artifact
+  versions while requests keep using the active one
+- Switching is one reference assignment on the event loop, so every
+  request sees either the old or the new version, never a mix
+- Requests lease the version they run on; a replaced version drains
+  (waits for its leases) before it becomes the standby
+- Data state that does not depend on artifacts (baselines, streaming
+  features, Prophet fits) is handed over, so caches stay warm
+- The standby (previous) version is kept loaded for an instant rollback
+- Serving an artifact version older than the newest one served (rollback,
+  or activating an old version) pins it: see `pinned()`
+"""
+
+import asyncio
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.models.registry import ModelRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class ServedVersion:
+    """
+    One served instance of a model and the artifact versions it was built from
+
+    States: active (receives new requests), draining (replaced, requests in
+    flight), standby (replaced and idle, kept for rollback), retired.
+    """
+
+    def __init__(self, model: Any, generation: int):
+        self.model = model
+        self.generation = generation
+        self.artifacts: Dict[str, int] = dict(model.artifact_versions)
+        self.activated_at = datetime.now()
+        self.state = "active"
+        self.in_flight = 0
+        self._idle: Optional[asyncio.Event] = None
+
+    @property
+    def tag(self) -> str:
+        """Artifact versions as a string, e.g. for result cache keys"""
+        return ",".join(f"{name}:v{version}" for name, version in sorted(self.artifacts.items())) or "untrained"
+
+    def acquire(self) -> "ServedVersion":
+        """Hold this version for a request (event loop only; pair with release())"""
+        self.in_flight += 1
+        return self
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        if self.in_flight == 0 and self._idle is not None:
+            self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait until no request holds this version (False on timeout)"""
+        if self.in_flight == 0:
+            return True
+
+        self._idle = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._idle = None
+
+    def to_dict(self) -> Dict:
+        return {
+            "generation": self.generation,
+            "artifacts": self.artifacts,
+            "activated_at": self.activated_at,
+            "state": self.state,
+            "in_flight": self.in_flight,
+        }
+
+
+class ModelManager:
+    """
+    Active and standby versions of every served model
+
+    Args:
+        registry: Model registry new versions are loaded from (None: no swaps)
+        drain_timeout: Seconds to wait for requests on a replaced version
+    """
+
+    def __init__(self, registry: Optional[ModelRegistry] = None, drain_timeout: float = 30.0):
+        self.registry = registry
+        self.drain_timeout = drain_timeout
+        self._active: Dict[str, ServedVersion] = {}
+        self._standby: Dict[str, Optional[ServedVersion]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._generations: Dict[str, int] = {}
+        self._newest: Dict[str, Dict[str, int]] = {}  # Slot -> artifact -> newest version served
+        self.swaps = 0
+        self.rollbacks = 0
+
+    def register(self, slot: str, model: Any) -> ServedVersion:
+        """Serve an initialized model instance as the slot's first version"""
+        served = ServedVersion(model, generation=1)
+        self._active[slot] = served
+        self._standby[slot] = None
+        self._locks[slot] = asyncio.Lock()
+        self._generations[slot] = 1
+        self._newest[slot] = dict(served.artifacts)
+        return served
+
+    def __contains__(self, slot: str) -> bool:
+        return slot in self._active
+
+    def active(self, slot: str) -> ServedVersion:
+        """
+        Active version of a slot
+
+        Raises:
+            KeyError: Unknown slot
+        """
+        return self._active[slot]
+
+    def acquire(self, slot: str) -> ServedVersion:
+        """Hold the active version for a request (pair with release())"""
+        return self._active[slot].acquire()
+
+    def pinned(self, slot: str) -> Dict[str, int]:
+        """
+        Artifacts the active version serves at an older version than the newest served
+
+        A rolled back or explicitly activated old version stays pinned
+        until a newer one is activated.
+
+        Raises:
+            KeyError: Unknown slot
+        """
+        newest = self._newest[slot]
+        return {name: version for name, version in self._active[slot].artifacts.items() if version < newest.get(name, 0)}
+
+    def served_versions(self, slot: str, name: str) -> List[int]:
+        """Versions of an artifact loaded by the slot's active and standby versions"""
+        versions = [served.artifacts.get(name) for served in (self._active.get(slot), self._standby.get(slot)) if served]
+        return sorted({version for version in versions if version is not None})
+
+    @contextmanager
+    def lease(self, slot: str) -> Iterator[ServedVersion]:
+        """Hold the active version for the duration of a block"""
+        served = self.acquire(slot)
+        try:
+            yield served
+        finally:
+            served.release()
+
+    async def activate(self, slot: str, artifacts: Dict[str, int]) -> ServedVersion:
+        """
+        Build a version serving the given artifact versions and switch to it
+
+        Artifacts not listed keep the active version's. Swaps of one slot
+        run one at a time.
+
+        Args:
+            artifacts: Registry artifact name -> version
+
+        Raises:
+            KeyError: Unknown slot
+            ValueError: Artifact the slot's model does not use
+            LookupError: Version not in the registry
+            RuntimeError: No registry configured
+        """
+        if self.registry is None:
+            raise RuntimeError("Model swaps require a model registry")
+
+        async with self._locks[slot]:
+            current = self._active[slot]
+            model_cls = type(current.model)
+            for name, version in artifacts.items():
+                if name not in model_cls.ARTIFACTS:
+                    raise ValueError(f"{slot} does not use artifact '{name}', expected one of {list(model_cls.ARTIFACTS)}")
+                if self.registry.get_info(name, version) is None:
+                    raise LookupError(f"No version {version} of '{name}' in the registry")
+
+            pinned = {**current.artifacts, **artifacts}
+            model = await asyncio.to_thread(self._build, current.model, pinned)
+
+            self._generations[slot] += 1
+            served = ServedVersion(model, generation=self._generations[slot])
+            await self._switch(slot, served)
+            self.swaps += 1
+            return served
+
+    def _build(self, current: Any, artifacts: Dict[str, int]) -> Any:
+        """New instance of the current model's class with pinned artifacts, loaded and warm"""
+        model = type(current)(current.settings)
+        asyncio.run(model.initialize(registry=self.registry, versions=artifacts))
+        model.adopt(current)
+        model.warm()
+        return model
+
+    async def rollback(self, slot: str) -> ServedVersion:
+        """
+        Switch back to the standby (previous) version
+
+        The replaced version becomes the standby, so a second rollback
+        rolls forward again.
+
+        Raises:
+            KeyError: Unknown slot
+            LookupError: No previous version
+        """
+        async with self._locks[slot]:
+            standby = self._standby[slot]
+            if standby is None:
+                raise LookupError(f"No previous version of {slot} to roll back to")
+
+            standby.activated_at = datetime.now()
+            await self._switch(slot, standby)
+            self.rollbacks += 1
+            return standby
+
+    async def _switch(self, slot: str, served: ServedVersion) -> None:
+        """Make a version active, then drain the replaced one into standby"""
+        previous = self._active[slot]
+        for name, version in served.artifacts.items():
+            self._newest[slot][name] = max(version, self._newest[slot].get(name, 0))
+        served.state = "active"
+        self._active[slot] = served  # New requests use the new version from here on
+        previous.state = "draining"
+        logger.info(f"🔄 Serving {slot} generation {served.generation} ({served.tag})")
+
+        if not await previous.drain(self.drain_timeout):
+            logger.warning(
+                f"{slot} generation {previous.generation} still has {previous.in_flight} "
+                f"requests in flight after {self.drain_timeout}s"
+            )
+
+        retired = self._standby[slot]
+        if retired is not None and retired is not served:
+            retired.state = "retired"
+        previous.state = "standby"
+        self._standby[slot] = previous
+
+    def stats(self) -> Dict:
+        """Active and standby versions per slot"""
+        return {
+            "slots": {
+                slot: {
+                    "active": served.to_dict(),
+                    "standby": self._standby[slot].to_dict() if self._standby[slot] else None,
+                    "pinned": self.pinned(slot),
+                }
+                for slot, served in self._active.items()
+            },
+            "swaps": self.swaps,
+            "rollbacks": self.rollbacks,
+        }
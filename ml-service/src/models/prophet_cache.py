@@ -0,0 +1,100 @@
+"""
+Fitted Prophet cache
+
+A Prophet fit is a Stan optimization costing seconds, and a Prophet object
+can only be fitted once. Fitted models are cached per series together with
+a digest of the history they were fitted on: repeat forecasts over the same
+history skip the fit, and a changed history triggers exactly one refit.
+"""
+
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Hashable, Optional
+
+from src.utils.cache import LRUCache
+
+
+def history_digest(prophet_df: pd.DataFrame) -> str:
+    """Stable digest of a Prophet training frame (ds, y)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(pd.to_datetime(prophet_df['ds']).values.astype('datetime64[ns]').view('i8').tobytes())
+    digest.update(np.asarray(prophet_df['y'], dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def prophet_nbytes(entry: Any) -> int:
+    """Estimate memory held by a cached (digest, fitted Prophet) entry"""
+    _, model = entry
+    nbytes = 0
+
+    if getattr(model, 'history', None) is not None:
+        nbytes += int(model.history.memory_usage(deep=True).sum())
+
+    for value in (getattr(model, 'params', None) or {}).values():
+        nbytes += getattr(value, 'nbytes', 0)
+
+    return nbytes
+
+
+class ProphetCache:
+    """
+    LRU/TTL cache of fitted Prophet models keyed by series
+
+    Each series keeps only its latest fit; a lookup with a different history
+    digest counts as a miss (`stale`) and the caller refits.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 5000,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self._models = LRUCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            sizeof=prophet_nbytes,
+        )
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0  # Misses caused by a changed history
+
+    def get(self, key: Hashable, digest: str) -> Optional[Any]:
+        """Get model fitted on exactly this history (None if refit needed)"""
+        entry = self._models.get(key)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        cached_digest, model = entry
+        if cached_digest != digest:
+            self.misses += 1
+            self.stale += 1
+            return None
+
+        self.hits += 1
+        return model
+
+    def set(self, key: Hashable, digest: str, model: Any) -> None:
+        """Cache model fitted on history with `digest` (replaces older fit)"""
+        self._models.set(key, (digest, model))
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def stats(self) -> Dict:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._models),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "evictions": self._models.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "bytes": self._models.nbytes,
+            "max_bytes": self._models.max_bytes,
+        }
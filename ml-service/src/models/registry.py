@@ -0,0 +1,344 @@
+"""
+Filesystem model registry
+
+Stores fitted model artifacts as versioned directories:
+
+    {root}/{name}/{version}/metadata.json
+    {root}/{name}/{version}/model.joblib | model.keras | model.json
+    {root}/{name}/{version}/model.onnx, model.tflite (exports of a keras version)
+
+Old versions are deleted with `prune()`, which keeps the newest ones and
+any version still served.
+
+Formats:
+- joblib: scikit-learn objects (loaded memory-mapped when possible, so
+  processes forked after loading or loading the same file share the pages)
+- keras: Keras models (.keras archive), optionally exported to ONNX/TFLite
+  and served without TensorFlow (see src.models.inference)
+- prophet: Prophet models (prophet.serialize JSON)
+"""
+
+import errno
+import fcntl
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import joblib
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_FILES = {
+    "joblib": "model.joblib",
+    "keras": "model.keras",
+    "prophet": "model.json",
+}
+
+# Inference copies of keras artifacts, stored with the version they were exported from
+EXPORT_FILES = {
+    "onnx": "model.onnx",
+    "tflite": "model.tflite",
+}
+
+
+@dataclass
+class ModelVersion:
+    """Metadata of one saved model version"""
+    name: str
+    version: int
+    format: str
+    trained_at: str
+    metrics: Dict = field(default_factory=dict)
+    params: Dict = field(default_factory=dict)
+    exports: List[str] = field(default_factory=list)  # Backends of EXPORT_FILES available
+
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+
+class LazyModel:
+    """
+    Model artifact loaded on first access
+
+    Lets workers start with metadata only and pay the load cost when the
+    model is first used (or when `get()` is called to warm it). With an
+    inference `backend`, the exported copy is loaded instead.
+    """
+
+    def __init__(self, registry: "ModelRegistry", info: ModelVersion, backend: Optional[str] = None):
+        self.registry = registry
+        self.info = info
+        self.backend = backend
+        self._model: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self) -> Any:
+        """Load (once) and return the model"""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self.registry.load(self.info.name, self.info.version, self.backend)
+        return self._model
+
+
+class ModelRegistry:
+    """Versioned model artifacts on the local filesystem"""
+
+    def __init__(self, root_dir: str, mmap_mode: Optional[str] = "r"):
+        self.root = Path(root_dir)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.mmap_mode = mmap_mode
+        self._lock = threading.Lock()
+        self.load_times: Dict[str, float] = {}  # Seconds spent loading each model's artifact (last load)
+
+    def save(
+        self,
+        name: str,
+        model: Any,
+        format: str = "joblib",
+        metrics: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        trained_at: Optional[datetime] = None,
+    ) -> ModelVersion:
+        """
+        Save model as a new version
+
+        The artifact is written to a temporary directory and renamed into
+        place, so readers never see a partially written version. When
+        another process (e.g. a sibling serving worker) took the version
+        meanwhile, the next one is used.
+        """
+        if format not in ARTIFACT_FILES:
+            raise ValueError(f"Unknown model format '{format}', expected one of {list(ARTIFACT_FILES)}")
+
+        model_dir = self.root / name
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            tmp_dir = Path(tempfile.mkdtemp(prefix=".new-", dir=model_dir))
+            try:
+                self._write_artifact(model, format, tmp_dir / ARTIFACT_FILES[format])
+                while True:
+                    info = ModelVersion(
+                        name=name,
+                        version=(self.latest_version(name) or 0) + 1,
+                        format=format,
+                        trained_at=(trained_at or datetime.now()).isoformat(),
+                        metrics=metrics or {},
+                        params=params or {},
+                    )
+                    (tmp_dir / "metadata.json").write_text(json.dumps(info.to_dict(), indent=2, default=str))
+                    try:
+                        os.rename(tmp_dir, model_dir / str(info.version))
+                        break
+                    except OSError as e:
+                        if e.errno not in (errno.ENOTEMPTY, errno.EEXIST):
+                            raise
+            except Exception:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+
+        logger.info(f"💾 Saved model {name} v{info.version} ({format})")
+        return info
+
+    @contextmanager
+    def exclusive(self, name: str) -> Iterator[None]:
+        """
+        Hold a model's lock across processes (e.g. read, merge and save)
+
+        An advisory file lock: only writers that take it are serialized.
+        """
+        model_dir = self.root / name
+        model_dir.mkdir(parents=True, exist_ok=True)
+        with open(model_dir / ".lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def prune(self, name: str, keep: int, protect: Collection[int] = ()) -> List[int]:
+        """
+        Delete all but the `keep` newest versions of a model
+
+        Args:
+            protect: Versions never deleted (e.g. the ones being served)
+
+        Returns:
+            Deleted versions
+        """
+        if keep < 1:
+            raise ValueError(f"keep must be at least 1, got {keep}")
+
+        deleted = []
+        with self._lock:
+            for version in self.list_versions(name)[:-keep]:
+                if version in protect:
+                    continue
+                # Renamed first so readers never see a partially deleted version
+                trash = self.root / name / f".old-{version}-{os.getpid()}"
+                try:
+                    os.rename(self.root / name / str(version), trash)
+                except FileNotFoundError:
+                    continue  # Pruned by another process
+                shutil.rmtree(trash, ignore_errors=True)
+                deleted.append(version)
+
+        if deleted:
+            logger.info(f"🗑️ Pruned {len(deleted)} old versions of {name}")
+        return deleted
+
+    def load(self, name: str, version: Optional[int] = None, backend: Optional[str] = None) -> Any:
+        """
+        Load model artifact (latest version by default)
+
+        Args:
+            backend: Load the version's ONNX/TFLite export as an inference runner
+
+        Raises:
+            FileNotFoundError: No such version, or no such export of it
+        """
+        info = self.get_info(name, version)
+        if info is None:
+            raise FileNotFoundError(f"No saved version of model '{name}'")
+        if backend is not None and backend not in info.exports:
+            raise FileNotFoundError(f"{name} v{info.version} has no {backend} export")
+
+        version_dir = self.root / name / str(info.version)
+        start = time.perf_counter()
+        if backend is not None:
+            from src.models.inference import load_runner
+            model = load_runner(backend, str(version_dir / EXPORT_FILES[backend]))
+        else:
+            model = self._read_artifact(version_dir / ARTIFACT_FILES[info.format], info.format)
+        self.load_times[name] = time.perf_counter() - start
+        return model
+
+    def lazy(self, name: str, version: Optional[int] = None, backend: Optional[str] = None) -> Optional[LazyModel]:
+        """
+        Get a lazily loaded handle (None if model was never saved)
+
+        Args:
+            backend: Serve a keras artifact through its ONNX/TFLite export;
+                versions without that export are served with Keras
+        """
+        info = self.get_info(name, version)
+        if info is None:
+            return None
+
+        if backend in EXPORT_FILES and info.format == "keras":
+            if backend in info.exports:
+                return LazyModel(self, info, backend)
+            logger.warning(f"{name} v{info.version} has no {backend} export, serving it with Keras")
+        return LazyModel(self, info)
+
+    def add_export(self, name: str, version: int, backend: str, content: bytes) -> ModelVersion:
+        """
+        Store an inference copy (ONNX/TFLite) of a saved version
+
+        The file and the updated metadata are each renamed into place.
+
+        Raises:
+            ValueError: Unknown backend
+            FileNotFoundError: No such version
+        """
+        if backend not in EXPORT_FILES:
+            raise ValueError(f"Unknown export backend '{backend}', expected one of {list(EXPORT_FILES)}")
+
+        with self._lock:
+            info = self.get_info(name, version)
+            if info is None:
+                raise FileNotFoundError(f"No version {version} of model '{name}'")
+
+            version_dir = self.root / name / str(version)
+            self._replace(version_dir / EXPORT_FILES[backend], content)
+            info.exports = sorted(set(info.exports) | {backend})
+            self._replace(version_dir / "metadata.json", json.dumps(info.to_dict(), indent=2, default=str).encode())
+
+        return info
+
+    @staticmethod
+    def _replace(path: Path, content: bytes) -> None:
+        """Write a file atomically (temporary file renamed over it)"""
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}-", dir=path.parent)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def get_info(self, name: str, version: Optional[int] = None) -> Optional[ModelVersion]:
+        """Get metadata of a version (latest by default)"""
+        version = version or self.latest_version(name)
+        if version is None:
+            return None
+
+        metadata_path = self.root / name / str(version) / "metadata.json"
+        if not metadata_path.exists():
+            return None
+
+        return ModelVersion(**json.loads(metadata_path.read_text()))
+
+    def list_versions(self, name: str) -> List[int]:
+        """List saved versions of a model (ascending)"""
+        model_dir = self.root / name
+        if not model_dir.is_dir():
+            return []
+
+        return sorted(int(p.name) for p in model_dir.iterdir() if p.is_dir() and p.name.isdigit())
+
+    def latest_version(self, name: str) -> Optional[int]:
+        """Get latest saved version of a model"""
+        versions = self.list_versions(name)
+        return versions[-1] if versions else None
+
+    def list_models(self) -> Dict[str, Dict]:
+        """Get latest version metadata for every saved model"""
+        models = {}
+        for model_dir in sorted(self.root.iterdir()):
+            if model_dir.is_dir() and not model_dir.name.startswith('.'):
+                info = self.get_info(model_dir.name)
+                if info:
+                    models[info.name] = info.to_dict()
+        return models
+
+    def _write_artifact(self, model: Any, format: str, path: Path) -> None:
+        if format == "joblib":
+            joblib.dump(model, path)
+        elif format == "keras":
+            model.save(path)
+        elif format == "prophet":
+            from prophet.serialize import model_to_json
+            path.write_text(model_to_json(model))
+
+    def _read_artifact(self, path: Path, format: str) -> Any:
+        if format == "joblib":
+            try:
+                return joblib.load(path, mmap_mode=self.mmap_mode)
+            except OSError as e:
+                # Every array is its own mapping and file descriptor; artifacts
+                # of many small arrays (per-segment forests) can exhaust them
+                if self.mmap_mode is None or e.errno not in (errno.EMFILE, errno.ENFILE, errno.ENOMEM):
+                    raise
+                logger.warning(f"Cannot memory-map {path} ({e.strerror}), loading it into memory")
+                return joblib.load(path)
+        elif format == "keras":
+            from tensorflow import keras
+            return keras.models.load_model(path)
+        elif format == "prophet":
+            from prophet.serialize import model_from_json
+            return model_from_json(path.read_text())
@@ -0,0 +1,173 @@
+"""
+Pre-fork multi-worker server
+
+`uvicorn --workers N` starts N independent interpreters, and each one
+loads its own models with one sklearn/BLAS thread per core. This server
+prepares everything once in a parent process, then forks the workers:
+
+- The thread budget (CPU count / workers) is exported before NumPy,
+  scikit-learn or TensorFlow are imported, so every worker sizes its
+  OpenMP/BLAS/TensorFlow pools, forest n_jobs and executors to its share
+- Registry artifacts saved with joblib are loaded in the parent with
+  memory-mapped arrays and fitted forests are packed, then gc.freeze()
+  keeps the garbage collector from touching those objects, so forked
+  workers share the pages copy-on-write
+- TensorFlow is never imported in the parent (its runtime threads do not
+  survive fork()); workers load Keras artifacts on first use
+- Workers accept on one listening socket; the parent restarts workers
+  that die and forwards SIGTERM/SIGINT for a graceful shutdown
+
+Each worker still runs its own startup (executors, caches, history store).
+State kept per process (stored histories, streaming point state, training
+jobs, model swaps) is not shared, so those endpoints answer 503 with more
+than one worker, and HISTORY_STORE_DIR is refused: workers would append to
+the same column files without a lock. Only stateless scoring scales out.
+
+Usage:
+    python -m src.serve --workers 4 --port 8000
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, List, Optional, Set
+
+from pydantic import ValidationError
+
+from src.config import Settings
+from src.utils.threads import set_thread_env, threads_per_worker
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before replacing a worker that died (avoids a tight crash loop)
+RESPAWN_DELAY_SECONDS = 1.0
+
+
+class PreforkServer:
+    """
+    Parent of the forked uvicorn workers
+
+    Args:
+        config: uvicorn.Config of the app (shared by all workers)
+        workers: Worker processes to keep running
+    """
+
+    def __init__(self, config: Any, workers: int):
+        self.config = config
+        self.workers = workers
+        self.children: Set[int] = set()
+        self.stopping = False
+        self.respawns = 0
+
+    def run(self) -> None:
+        """Bind the socket, fork the workers and supervise them until stopped"""
+        sock = self.config.bind_socket()
+
+        # Objects loaded so far are never collected: the collector's writes
+        # to their headers would copy shared pages into every worker
+        gc.freeze()
+
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        for _ in range(self.workers):
+            self._spawn(sock)
+        logger.info(f"🚀 Serving on {self.config.host}:{self.config.port} with {self.workers} workers")
+
+        while self.children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            self.children.discard(pid)
+            if not self.stopping:
+                logger.warning(f"⚠️ Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}, restarting")
+                time.sleep(RESPAWN_DELAY_SECONDS)
+                if not self.stopping:
+                    self.respawns += 1
+                    self._spawn(sock)
+
+        sock.close()
+        logger.info("👋 All workers stopped")
+
+    def _spawn(self, sock: socket.socket) -> int:
+        """Fork one worker serving the app on the shared socket"""
+        pid = os.fork()
+        if pid:
+            self.children.add(pid)
+            return pid
+
+        # Worker: uvicorn installs its own graceful shutdown handlers
+        import uvicorn
+
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            uvicorn.Server(self.config).run(sockets=[sock])
+        except BaseException:
+            logger.exception("❌ Worker failed")
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _stop(self, signum: int, frame: Any) -> None:
+        """Stop respawning and ask every worker to shut down"""
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Pre-fork multi-worker ML service")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("ML_SERVICE_PORT", 8000)))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.environ.get("SERVING_WORKERS") or 1),
+        help="Worker processes (default: SERVING_WORKERS, else 1)",
+    )
+    parser.add_argument(
+        "--threads", type=int, default=int(os.environ.get("MODEL_THREADS") or 0) or None,
+        help="Model threads per worker (default: MODEL_THREADS, else CPU count / workers)",
+    )
+    parser.add_argument("--no-preload", action="store_true", help="Load models in each worker instead of the parent")
+    parser.add_argument("--log-level", default=os.environ.get("LOG_LEVEL", "info").lower())
+    args = parser.parse_args(argv)
+
+    # The budget must be in the environment before NumPy and friends are imported
+    threads = args.threads or threads_per_worker(args.workers)
+    os.environ["SERVING_WORKERS"] = str(args.workers)
+    os.environ["MODEL_THREADS"] = str(threads)
+    try:
+        Settings()
+    except ValidationError as e:
+        parser.error("; ".join(error['msg'] for error in e.errors()))
+    set_thread_env(threads)
+
+    import uvicorn
+    from src import main as service
+    from src.utils.logger import setup_logger
+
+    setup_logger(__name__)
+    if not args.no_preload:
+        start = time.perf_counter()
+        loaded = service.preload_models()
+        logger.info(f"📦 Preloaded {loaded} in {time.perf_counter() - start:.2f}s")
+
+    config = uvicorn.Config(service.app, host=args.host, port=args.port, log_level=args.log_level)
+    logger.info(f"🧵 {args.workers} workers x {threads} model threads")
+    PreforkServer(config, args.workers).run()
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
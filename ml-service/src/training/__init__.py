@@ -0,0 +1,3 @@
+"""
+Offline training pipelines for ML Service models
+"""
@@ -0,0 +1,75 @@
+"""
+Offline training pipeline for the LSTM Autoencoder
+
+Trains on a long-format history export (CSV or Parquet with columns
+timestamp, sku, quantity, price, supplier_id, warehouse_id) and saves the
+model to the registry, where serving workers pick it up at startup.
+
+Usage:
+    python -m src.training.anomaly_lstm --data history.csv --registry /app/models --epochs 20 --export tflite
+"""
+
+import argparse
+import asyncio
+import json
+import pandas as pd
+from typing import Dict, List, Optional
+
+from src.models.anomaly_detector import AnomalyDetector
+from src.models.inference import RUNNERS, export_artifact
+from src.models.registry import ModelRegistry
+from src.utils.logger import setup_logger
+
+logger = setup_logger("ml-training")
+
+
+def load_history(path: str) -> pd.DataFrame:
+    """Load a history export (CSV or Parquet)"""
+    if path.endswith(".parquet"):
+        data = pd.read_parquet(path)
+    else:
+        data = pd.read_csv(path)
+
+    data['timestamp'] = pd.to_datetime(data['timestamp'])
+    for col in ('supplier_id', 'warehouse_id'):
+        if col not in data:
+            data[col] = None
+
+    return data
+
+
+def train(data: pd.DataFrame, registry: ModelRegistry, epochs: int = 20, batch_size: int = 256) -> Dict:
+    """
+    Train the LSTM Autoencoder and save it as a new registry version
+
+    Returns:
+        Saved version metadata (name, version, trained_at, metrics, params)
+    """
+    detector = AnomalyDetector()
+    asyncio.run(detector.initialize())
+
+    metrics = detector.train_lstm(data, epochs=epochs, batch_size=batch_size)
+    return detector.save_lstm(registry, metrics)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Train the anomaly LSTM Autoencoder")
+    parser.add_argument("--data", required=True, help="History export (CSV or Parquet)")
+    parser.add_argument("--registry", required=True, help="Model registry directory")
+    parser.add_argument("--epochs", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--export", nargs="*", default=[], choices=list(RUNNERS), help="Also export to these inference backends")
+    args = parser.parse_args(argv)
+
+    data = load_history(args.data)
+    logger.info(f"Loaded {len(data)} rows from {args.data}")
+
+    registry = ModelRegistry(args.registry)
+    info = train(data, registry, epochs=args.epochs, batch_size=args.batch_size)
+    for backend in args.export:
+        info = export_artifact(registry, info['name'], backend, info['version'])
+    print(json.dumps(info, indent=2))
+
+
+if __name__ == "__main__":
+    main()
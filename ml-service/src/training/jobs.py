@@ -0,0 +1,241 @@
+"""
+Background training jobs
+
+Training runs out of band instead of inside serving requests:
+
+- Jobs are queued on a bounded training executor (a process pool by
+  default, so training never competes with request threads for the GIL)
+- Each job trains a fresh model instance and saves it to the model
+  registry as a new version
+- Once saved, the new version is hot-swapped into the served models (see
+  ModelManager); the previous one keeps serving until then
+"""
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import pandas as pd
+
+from src.utils.executor import ExecutorOverloaded, ModelExecutor
+
+logger = logging.getLogger(__name__)
+
+# Job kind -> served model it updates
+JOB_KINDS = {
+    "anomaly_forests": "anomaly_detector",  # Isolation Forest of every segment
+    "anomaly_lstm": "anomaly_detector",  # LSTM Autoencoder
+    "demand_backtest": "demand_forecaster",  # Out-of-sample metrics and ensemble weights
+}
+
+# Parameters accepted per job kind (passed to the training method)
+JOB_PARAMS = {
+    "anomaly_forests": (),
+    "anomaly_lstm": ("epochs", "batch_size", "threshold_quantile"),
+    "demand_backtest": ("horizon", "folds", "step", "engines"),
+}
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+
+def check_job(kind: str, params: Dict) -> None:
+    """
+    Validate a job kind and its parameters
+
+    Raises:
+        ValueError: Unknown kind or parameter
+    """
+    if kind not in JOB_KINDS:
+        raise ValueError(f"Unknown training job kind '{kind}', expected one of {list(JOB_KINDS)}")
+
+    unknown = set(params) - set(JOB_PARAMS[kind])
+    if unknown:
+        raise ValueError(f"Unknown parameters {sorted(unknown)} for '{kind}', expected some of {list(JOB_PARAMS[kind])}")
+
+
+def train_artifact(kind: str, data: pd.DataFrame, registry_dir: str, params: Dict) -> Dict:
+    """
+    Train one job's model on a fresh instance and save it to the registry
+
+    Module-level so process pools can run it.
+
+    Returns:
+        Dict with the saved version metadata (`artifact`) and training `metrics`
+    """
+    from src.models.anomaly_detector import AnomalyDetector
+    from src.models.backtest import summarize
+    from src.models.demand_forecaster import DemandForecaster
+    from src.models.inference import export_artifact
+    from src.models.registry import ModelRegistry
+
+    registry = ModelRegistry(registry_dir)
+
+    if kind == "demand_backtest":
+        forecaster = DemandForecaster()
+        asyncio.run(forecaster.initialize())
+        backtest = forecaster.backtest_sync(data, **params)
+        if not backtest['results']:
+            raise ValueError(f"No series could be backtested: {backtest['errors'][0]['detail']}")
+
+        metrics = {"series": len(backtest['results']), "errors": len(backtest['errors']), **summarize(backtest['results'])}
+        return {"artifact": forecaster.save_backtests(registry), "metrics": metrics}
+
+    detector = AnomalyDetector()
+    asyncio.run(detector.initialize())
+
+    if kind == "anomaly_forests":
+        metrics = detector.train_forests(data)
+        return {"artifact": detector.save_artifacts(registry), "metrics": metrics}
+
+    metrics = detector.train_lstm(data, **params)
+    artifact = detector.save_lstm(registry, metrics)
+
+    # Serving workers without TensorFlow load the export of the new version
+    backend = detector.settings.lstm_inference_backend
+    if backend != "keras":
+        try:
+            artifact = export_artifact(registry, artifact['name'], backend, artifact['version'])
+        except Exception as e:
+            logger.warning(f"⚠️ Could not export {artifact['name']} v{artifact['version']} to {backend}, served with Keras: {e}")
+
+    return {"artifact": artifact, "metrics": metrics}
+
+
+@dataclass
+class TrainingJob:
+    """State of one training job"""
+    id: str
+    kind: str
+    params: Dict = field(default_factory=dict)
+    rows: int = 0
+    status: str = "queued"
+    submitted_at: datetime = field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict] = None  # artifact (saved version) and metrics, once succeeded
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def to_dict(self) -> Dict:
+        status = asdict(self)
+        status.pop('result')
+        return status
+
+
+class JobManager:
+    """
+    Queue of background training jobs
+
+    - At most `max_jobs` jobs may be queued or running; beyond that
+      `ExecutorOverloaded` is raised (mapped to HTTP 429 by the API)
+    - Jobs run `max_workers` at a time on the executor
+    - After a job saved its version, `await on_trained(kind, artifact)`
+      hot-swaps it into the served models
+    - The latest `history` finished jobs are kept for status queries
+    """
+
+    def __init__(
+        self,
+        executor: ModelExecutor,
+        registry_dir: str,
+        on_trained: Callable[[str, Dict], Awaitable[Any]],
+        max_jobs: int = 8,
+        history: int = 100,
+    ):
+        self.executor = executor
+        self.registry_dir = registry_dir
+        self.on_trained = on_trained
+        self.max_jobs = max_jobs
+        self.history = history
+        self.jobs: "OrderedDict[str, TrainingJob]" = OrderedDict()
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._slots = asyncio.Semaphore(executor.max_workers)
+        self.rejected = 0
+
+    def submit(self, kind: str, data: pd.DataFrame, params: Optional[Dict] = None) -> TrainingJob:
+        """
+        Queue a training job (call from the event loop)
+
+        Raises:
+            ValueError: Unknown kind or parameter
+            ExecutorOverloaded: `max_jobs` jobs already queued or running
+        """
+        params = params or {}
+        check_job(kind, params)
+
+        if len(self._tasks) >= self.max_jobs:
+            self.rejected += 1
+            raise ExecutorOverloaded(f"Training queue is full ({self.max_jobs} jobs queued or running)")
+
+        job = TrainingJob(id=uuid.uuid4().hex, kind=kind, params=params, rows=len(data))
+        self.jobs[job.id] = job
+        self._tasks[job.id] = asyncio.get_running_loop().create_task(self._run(job, data))
+        self._prune()
+
+        logger.info(f"📋 Queued training job {job.id} ({kind}, {job.rows} rows)")
+        return job
+
+    async def _run(self, job: TrainingJob, data: pd.DataFrame) -> None:
+        try:
+            async with self._slots:
+                job.status = "running"
+                job.started_at = datetime.now()
+                result = await self.executor.run(train_artifact, job.kind, data, self.registry_dir, job.params)
+
+                # Requests keep the old version until the new one is loaded
+                await self.on_trained(job.kind, result['artifact'])
+
+            job.result = result
+            job.status = "succeeded"
+            logger.info(f"✅ Training job {job.id} succeeded: {result['artifact']['name']} v{result['artifact']['version']}")
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            raise
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            logger.error(f"❌ Training job {job.id} failed: {e}")
+        finally:
+            job.finished_at = datetime.now()
+            self._tasks.pop(job.id, None)
+
+    def _prune(self) -> None:
+        """Forget the oldest finished jobs beyond `history`"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.history)]:
+            del self.jobs[job_id]
+
+    def get(self, job_id: str) -> Optional[TrainingJob]:
+        return self.jobs.get(job_id)
+
+    def recent(self) -> List[TrainingJob]:
+        """Known jobs, most recent first"""
+        return list(reversed(self.jobs.values()))
+
+    async def wait(self, job_id: str) -> TrainingJob:
+        """Wait until a job is finished"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return self.jobs[job_id]
+
+    async def shutdown(self) -> None:
+        """Cancel queued and running jobs"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        """Get job counts per status"""
+        counts = {status: 0 for status in JOB_STATUSES}
+        for job in self.jobs.values():
+            counts[job.status] += 1
+        return {**counts, "max_jobs": self.max_jobs, "rejected": self.rejected}
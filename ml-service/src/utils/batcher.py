@@ -0,0 +1,136 @@
+"""
+Micro-batching for concurrent single-item model calls
+
+Webhooks send many single-SKU requests at once. Instead of one executor
+call per request, requests arriving within `max_wait_ms` (or until
+`max_batch_size` are waiting) are scored by one call of a batched model
+method, and each caller's future is resolved with its own result.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.utils.executor import ModelExecutor
+from src.utils.metrics import BATCH_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent requests into batched model calls
+
+    The batched method takes a list of items and returns one result per
+    item, in order; an Exception in the list fails only that item's caller.
+    Each batch takes one pending slot on the executor, so executor
+    backpressure (ExecutorOverloaded) fails the whole batch. Items submitted
+    for different model instances (e.g. across a model swap) are never
+    batched together.
+
+    Args:
+        executor: Model executor running the batched calls
+        model: Default model instance (process pools use the worker's own instance)
+        method: Batched method name, e.g. "detect_many_sync"
+        max_batch_size: Dispatch as soon as this many items are waiting (1 = no batching)
+        max_wait_ms: Dispatch at most this long after the first waiting item
+    """
+
+    def __init__(
+        self,
+        executor: ModelExecutor,
+        model: Any,
+        method: str,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 2.0,
+        name: Optional[str] = None,
+    ):
+        self.executor = executor
+        self.model = model
+        self.method = method
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self.name = name or executor.name
+        self._waiting: List[Tuple[Any, Any, asyncio.Future]] = []  # (model, item, future)
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._running: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+
+    async def submit(self, item: Any, model: Any = None) -> Any:
+        """
+        Queue one item and wait for its result
+
+        Args:
+            model: Instance to run the item on (default: the batcher's model)
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._waiting.append((self.model if model is None else model, item, future))
+
+        if len(self._waiting) >= self.max_batch_size:
+            self._dispatch()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._dispatch)
+
+        return await future
+
+    def _dispatch(self) -> None:
+        """Start a batched call for the waiting items"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiting:
+            batch = self._waiting[:self.max_batch_size]
+            del self._waiting[:self.max_batch_size]
+
+            models = {id(model): model for model, _, _ in batch}
+            for key, model in models.items():
+                items = [(item, future) for m, item, future in batch if id(m) == key]
+                task = asyncio.ensure_future(self._run(model, items))
+                self._running.add(task)
+                task.add_done_callback(self._running.discard)
+
+    async def _run(self, model: Any, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        # Callers that went away (client disconnected) are not scored
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+        BATCH_SIZE.labels(batcher=self.name).observe(len(batch))
+
+        try:
+            results = await self.executor.call(model, self.method, [item for item, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    async def drain(self) -> None:
+        """Dispatch waiting items and wait for every running batch"""
+        self._dispatch()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def stats(self) -> Dict:
+        """Get batcher statistics"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "waiting": len(self._waiting),
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+        }
@@ -0,0 +1,144 @@
+"""
+In-memory caching utilities for ML Service
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+class StripedLock:
+    """
+    Per-key locks from a fixed pool
+
+    Keys hash onto `stripes` locks, so updates of one key are serialized
+    while other keys mostly proceed in parallel, with bounded memory
+    however many keys are seen.
+    """
+
+    def __init__(self, stripes: int = 256):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def __call__(self, key: Hashable) -> threading.Lock:
+        """Lock guarding `key`"""
+        return self._locks[hash(key) % len(self._locks)]
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with optional TTL and memory bound
+
+    - Evicts least recently used entries beyond `max_entries`
+    - Evicts least recently used entries beyond `max_bytes` (sized by `sizeof`)
+    - Entries older than `ttl_seconds` are treated as misses
+    - Tracks hits, misses and evictions for monitoring
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl_seconds: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, stored_at, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get value for key, refreshing its recency"""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return default
+
+            value, stored_at, _ = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                self.misses += 1
+                return default
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value for key, evicting old entries if needed"""
+        nbytes = self.sizeof(value) if self.sizeof else 0
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, time.monotonic(), nbytes)
+            self._bytes += nbytes
+
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes and len(self._entries) > 1
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove key and return its value"""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            return self._remove(key)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """Get (key, value) pairs of all live entries, least recent first"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                (key, value)
+                for key, (value, stored_at, _) in self._entries.items()
+                if self.ttl_seconds is None or now - stored_at <= self.ttl_seconds
+            ]
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable) -> Any:
+        value, _, nbytes = self._entries.pop(key)
+        self._bytes -= nbytes
+        return value
+
+    @property
+    def nbytes(self) -> int:
+        """Estimated memory held by cached values"""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def stats(self) -> Dict:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        stats = {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+        if self.max_bytes is not None:
+            stats.update({"bytes": self._bytes, "max_bytes": self.max_bytes})
+        return stats
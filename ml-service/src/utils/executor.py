@@ -0,0 +1,190 @@
+"""
+Model executor: runs CPU-bound model work off the asyncio event loop
+
+Model calls (Isolation Forest fits, Prophet/Stan fits, Keras predict) are
+dispatched to a bounded pool so one slow request cannot block /health or
+other requests on the same uvicorn worker.
+"""
+
+import asyncio
+import functools
+import itertools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("thread", "process")
+
+# Process-local model instances, one per model class (process pools only),
+# with the artifact versions each was pinned to (None: latest at build time)
+_process_models: Dict[type, Tuple[Optional[Tuple], Any]] = {}
+
+
+class ExecutorOverloaded(Exception):
+    """Raised when an executor already has max_pending calls queued or running"""
+
+
+def _process_model(model_cls: type, versions: Optional[Dict[str, int]] = None) -> Any:
+    """
+    Model instance of a process pool worker
+
+    Each worker builds and initializes its own model instance on first use
+    (attached to the model registry when configured), then reuses it. When
+    `versions` pins other artifact versions than the instance serves (the
+    API swapped models), the instance is rebuilt with them.
+    """
+    pinned = None if versions is None else tuple(sorted(versions.items()))
+    cached = _process_models.get(model_cls)
+
+    if cached is None or (pinned is not None and cached[0] != pinned):
+        from src.config import get_settings
+        from src.models.registry import ModelRegistry
+
+        settings = get_settings()
+        registry = ModelRegistry(settings.model_registry_dir) if settings.model_registry_dir else None
+
+        model = model_cls()
+        pin = {} if versions is None else {"versions": versions}
+        asyncio.run(model.initialize(registry=registry, **pin))
+        cached = _process_models[model_cls] = (pinned, model)
+
+    return cached[1]
+
+
+def _call_process_model(model_cls: type, method: str, *args, **kwargs) -> Any:
+    """Call a model method inside a process pool worker"""
+    return getattr(_process_model(model_cls), method)(*args, **kwargs)
+
+
+def _call_pinned_model(model_cls: type, versions: Optional[Dict[str, int]], method: str, *args, **kwargs) -> Any:
+    """Call a model method inside a process pool worker, on an instance serving `versions`"""
+    return getattr(_process_model(model_cls, versions), method)(*args, **kwargs)
+
+
+class ModelExecutor:
+    """
+    Bounded executor for model calls with backpressure
+
+    - thread: shares in-process models and caches (sklearn, TensorFlow and
+      Stan release the GIL for the heavy parts)
+    - process: isolates pure-Python heavy work; each worker process keeps
+      its own model instance and caches
+    - At most `max_pending` calls may be queued or running; beyond that
+      `ExecutorOverloaded` is raised (mapped to HTTP 429 by the API)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = "thread",
+        max_workers: Optional[int] = None,
+        max_pending: int = 64,
+    ):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind '{kind}', expected one of {list(EXECUTOR_KINDS)}")
+
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+        if kind == "process":
+            self._executor: Executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=name)
+
+    def _acquire(self) -> None:
+        """Reserve a pending slot or raise ExecutorOverloaded"""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise ExecutorOverloaded(f"{self.name} executor is at capacity ({self.max_pending} pending calls)")
+        self.pending += 1
+
+    def _release(self) -> None:
+        self.pending -= 1
+        self.completed += 1
+
+    def _bind(self, model: Any, method: str) -> Callable:
+        """
+        Callable for a model method on this pool
+
+        Thread pools call the shared model instance; process pools call the
+        same method on the worker's own instance of the model class, serving
+        the same artifact versions.
+        """
+        if self.kind == "process":
+            return functools.partial(_call_pinned_model, type(model), getattr(model, "artifact_versions", None), method)
+
+        return getattr(model, method)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a picklable (process) or any (thread) callable on the pool"""
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            self._release()
+
+    async def call(self, model: Any, method: str, *args, **kwargs) -> Any:
+        """Call a synchronous model method on the pool"""
+        return await self.run(self._bind(model, method), *args, **kwargs)
+
+    async def map(
+        self, model: Any, method: str, chunks: Iterable[Any], window: Optional[int] = None, **kwargs
+    ) -> AsyncIterator[Any]:
+        """
+        Call a model method once per chunk, yielding results as they complete
+
+        - At most `window` chunks (default: max_workers) are submitted at a
+          time, so a large map never queues more than one round of chunks
+          ahead of other calls on the pool
+        - The next chunk is submitted only once the consumer took a result:
+          a slow consumer pauses the map instead of piling up results
+        - The whole map holds a single pending slot, so one bulk request cannot
+          be rejected halfway through
+        - Chunks not yet started are cancelled if the consumer stops early
+        """
+        self._acquire()
+        try:
+            loop = asyncio.get_running_loop()
+            fn = self._bind(model, method)
+            chunks = iter(chunks)
+
+            def submit(chunk: Any) -> asyncio.Future:
+                return loop.run_in_executor(self._executor, functools.partial(fn, chunk, **kwargs))
+
+            running = {submit(chunk) for chunk in itertools.islice(chunks, window or self.max_workers)}
+            try:
+                while running:
+                    done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                        for chunk in itertools.islice(chunks, 1):
+                            running.add(submit(chunk))
+            finally:
+                for future in running:
+                    future.cancel()
+        finally:
+            self._release()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work and release pool workers"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict:
+        """Get executor statistics"""
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "pending": self.pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
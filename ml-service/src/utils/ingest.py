@@ -0,0 +1,95 @@
+"""
+Request ingestion: build model DataFrames from API payloads
+
+Two payload layouts are supported:
+- Row format: list of data point objects (one pydantic model per row)
+- Columnar format: one array per field, converted to NumPy in bulk
+
+Timestamps are normalized to naive UTC whatever the input (epoch seconds,
+ISO 8601 with or without offset, tz-aware datetimes), so the same series
+sent in different formats lands in the same frame dtype.
+
+Batch endpoints split the resulting long-format frame into chunks of whole
+series (series_chunks) to fan work out and stream results.
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Any, List, Optional, Sequence, Union
+
+# Model DataFrame columns, in order
+FRAME_COLUMNS = ['timestamp', 'sku', 'quantity', 'price', 'supplier_id', 'warehouse_id']
+
+# Columns identifying one inventory time-series
+SERIES_KEYS = ['sku', 'warehouse_id']
+
+
+def points_to_frame(points: Sequence[Any]) -> pd.DataFrame:
+    """
+    Build DataFrame from row-format data points
+
+    Reads attributes column by column instead of dumping every row to a dict.
+    """
+    frame = pd.DataFrame(
+        {col: [getattr(point, col) for point in points] for col in FRAME_COLUMNS},
+        columns=FRAME_COLUMNS,
+    )
+    frame['timestamp'] = naive_utc(frame['timestamp'])
+    return frame
+
+
+def naive_utc(timestamps: pd.Series) -> pd.Series:
+    """Datetimes as naive UTC (naive values are taken as UTC already)"""
+    return pd.to_datetime(timestamps, utc=True).dt.tz_convert(None)
+
+
+def _to_timestamps(timestamps: Sequence[Union[int, float, str]]) -> pd.DatetimeIndex:
+    """Parse epoch seconds or ISO 8601 strings in one vectorized call (naive UTC)"""
+    if len(timestamps) and isinstance(timestamps[0], str):
+        return pd.to_datetime(timestamps, format='ISO8601', utc=True).tz_convert(None)
+
+    return pd.to_datetime(np.asarray(timestamps, dtype=np.float64), unit='s', utc=True).tz_convert(None)
+
+
+def _broadcast(value: Union[None, str, List[Optional[str]]]) -> Any:
+    """Scalar (or None) for every row, or one value per row"""
+    if value is None or isinstance(value, str):
+        return value
+    return np.asarray(value, dtype=object)
+
+
+def columns_to_frame(
+    timestamps: Sequence[Union[int, float, str]],
+    sku: Union[str, List[str]],
+    quantities: Sequence[int],
+    prices: Sequence[float],
+    supplier_id: Union[None, str, List[Optional[str]]] = None,
+    warehouse_id: Union[None, str, List[Optional[str]]] = None,
+) -> pd.DataFrame:
+    """
+    Build DataFrame from columnar arrays
+
+    Numeric columns become contiguous NumPy arrays handed to pandas without
+    per-row work; scalar sku/supplier_id/warehouse_id are broadcast.
+    """
+    return pd.DataFrame(
+        {
+            'timestamp': _to_timestamps(timestamps),
+            'sku': _broadcast(sku),
+            'quantity': np.asarray(quantities, dtype=np.int64),
+            'price': np.asarray(prices, dtype=np.float64),
+            'supplier_id': _broadcast(supplier_id),
+            'warehouse_id': _broadcast(warehouse_id),
+        },
+        columns=FRAME_COLUMNS,
+    )
+
+
+def series_chunks(data: pd.DataFrame, chunk_size: int) -> List[pd.DataFrame]:
+    """
+    Split long-format data into chunks of whole series
+
+    Series keep their first-seen order; a series is never split across chunks.
+    """
+    codes = data.groupby(SERIES_KEYS, sort=False, dropna=False).ngroup().to_numpy()
+    return [chunk for _, chunk in data.groupby(codes // chunk_size, sort=True)]
@@ -0,0 +1,144 @@
+"""
+Prometheus metrics for ML Service
+
+- Histograms are recorded where the work happens (stage timings, rows per
+  request, HTTP latency)
+- Cache, executor and model load statistics already kept by the service
+  objects are read at scrape time by ServiceCollector, so the hot paths
+  pay nothing for them
+- With PROMETHEUS_MULTIPROC_DIR set (process pools, several uvicorn
+  workers), histograms from every process are aggregated
+"""
+
+import os
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Histogram, REGISTRY, generate_latest
+from prometheus_client.core import GaugeMetricFamily, CounterMetricFamily
+from prometheus_client.registry import Collector
+
+# Model pipeline stages, from sub-millisecond scoring to multi-second Stan fits
+STAGE_SECONDS = Histogram(
+    "ml_stage_duration_seconds",
+    "Time spent in one model pipeline stage",
+    ["stage"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+REQUEST_SECONDS = Histogram(
+    "ml_http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "endpoint", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.2, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+REQUEST_ROWS = Histogram(
+    "ml_request_rows",
+    "Data points per request",
+    ["endpoint"],
+    buckets=(1, 30, 90, 365, 1_000, 10_000, 100_000, 1_000_000),
+)
+
+BATCH_SIZE = Histogram(
+    "ml_batch_size",
+    "Requests scored per micro-batch",
+    ["batcher"],
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+
+def stage(name: str):
+    """
+    Time a pipeline stage
+
+    Usage:
+        with stage("engineer_features"):
+            ...
+    """
+    return STAGE_SECONDS.labels(stage=name).time()
+
+
+class ServiceCollector(Collector):
+    """
+    Exposes service statistics at scrape time
+
+    Args:
+        caches: Returns {cache name: stats()} for caches with hits/misses/entries
+        executors: Returns {executor name: stats()} for ModelExecutors
+        load_times: Returns {(kind, name): seconds} for framework imports and model loads
+    """
+
+    def __init__(
+        self,
+        caches: Callable[[], Dict[str, Dict]],
+        executors: Callable[[], Dict[str, Dict]],
+        load_times: Callable[[], Dict[Tuple[str, str], float]],
+    ):
+        self.caches = caches
+        self.executors = executors
+        self.load_times = load_times
+
+    def collect(self) -> Iterable:
+        caches = {name: stats for name, stats in self.caches().items() if stats}
+
+        entries = GaugeMetricFamily("ml_cache_entries", "Entries held in each cache", labels=["cache"])
+        hits = CounterMetricFamily("ml_cache_hits", "Cache hits", labels=["cache"])
+        misses = CounterMetricFamily("ml_cache_misses", "Cache misses", labels=["cache"])
+        hit_ratio = GaugeMetricFamily("ml_cache_hit_ratio", "Cache hits / lookups since start", labels=["cache"])
+        for name, stats in caches.items():
+            entries.add_metric([name], stats.get("entries", 0))
+            hits.add_metric([name], stats.get("hits", 0))
+            misses.add_metric([name], stats.get("misses", 0))
+            hit_ratio.add_metric([name], stats.get("hit_ratio", 0.0))
+        yield from (entries, hits, misses, hit_ratio)
+
+        executors = {name: stats for name, stats in self.executors().items() if stats}
+
+        pending = GaugeMetricFamily("ml_executor_pending", "Calls queued or running on each executor", labels=["executor"])
+        capacity = GaugeMetricFamily("ml_executor_max_pending", "Pending calls before HTTP 429", labels=["executor"])
+        workers = GaugeMetricFamily("ml_executor_workers", "Executor pool size", labels=["executor"])
+        completed = CounterMetricFamily("ml_executor_completed", "Calls completed", labels=["executor"])
+        rejected = CounterMetricFamily("ml_executor_rejected", "Calls rejected with HTTP 429", labels=["executor"])
+        for name, stats in executors.items():
+            pending.add_metric([name], stats["pending"])
+            capacity.add_metric([name], stats["max_pending"])
+            workers.add_metric([name], stats["max_workers"])
+            completed.add_metric([name], stats["completed"])
+            rejected.add_metric([name], stats["rejected"])
+        yield from (pending, capacity, workers, completed, rejected)
+
+        load = GaugeMetricFamily(
+            "ml_model_load_seconds",
+            "Seconds spent importing a framework or loading a model artifact",
+            labels=["kind", "name"],
+        )
+        for (kind, name), seconds in self.load_times().items():
+            load.add_metric([kind, name], seconds)
+        yield load
+
+
+def register_collector(collector: Collector) -> None:
+    """Register a scrape-time collector on the default registry (once)"""
+    try:
+        REGISTRY.register(collector)
+    except ValueError:
+        pass  # Already registered (app restarted in the same process, e.g. tests)
+
+
+def render(collector: Optional[Collector] = None) -> Tuple[bytes, str]:
+    """
+    Metrics in the Prometheus text format
+
+    In multiprocess mode, histograms are read from PROMETHEUS_MULTIPROC_DIR
+    (all processes) and the collector adds this process' service statistics.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        if collector is not None:
+            registry.register(collector)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,208 @@
+"""
+Result cache for repeated identical requests
+
+ERP connectors retry and re-poll with the exact same payload; a hit returns
+the stored response instead of re-running the models.
+
+- Keys are a content hash of the canonicalized input frame (row and
+  columnar payloads, ISO strings and epoch seconds of the same data hash
+  alike) plus the request parameters and model version
+- Backends are pluggable: in-process LRU (TTL + entry/memory bounds) or
+  Redis (shared by every worker, TTL per key, eviction by the server's
+  maxmemory policy)
+- A failing backend is treated as a miss and never fails the request
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+RESULT_CACHE_BACKENDS = ("memory", "redis", "none")
+
+# Columns hashed as raw numeric buffers / as factorized labels
+_NUMERIC_COLUMNS = {'quantity': np.int64, 'price': np.float64}
+_LABEL_COLUMNS = ('sku', 'supplier_id', 'warehouse_id')
+
+
+def request_key(kind: str, data: pd.DataFrame, **params: Any) -> str:
+    """
+    Stable content hash of one request
+
+    Timestamps are normalized to naive UTC nanoseconds and numeric columns
+    to int64/float64, so the key only depends on the data, not on how it
+    was sent. The hash is the same in every process (usable with Redis).
+
+    Args:
+        kind: Request kind and model version, e.g. "detect:0.1.0"
+        data: Model DataFrame built from the request
+        **params: Parameters affecting the result (sensitivity, horizon...)
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps([kind, len(data), sorted(params.items())]).encode())
+
+    timestamps = data['timestamp']
+    if not pd.api.types.is_datetime64_any_dtype(timestamps):
+        timestamps = pd.to_datetime(timestamps)
+    if getattr(timestamps.dtype, 'tz', None) is not None:
+        timestamps = timestamps.dt.tz_convert(None)
+    digest.update(timestamps.to_numpy().astype('datetime64[ns]').tobytes())
+
+    for column, dtype in _NUMERIC_COLUMNS.items():
+        digest.update(data[column].to_numpy(dtype=dtype).tobytes())
+
+    for column in _LABEL_COLUMNS:
+        codes, labels = pd.factorize(data[column].to_numpy())
+        digest.update(codes.astype(np.int64).tobytes())
+        digest.update(json.dumps(list(labels)).encode())
+
+    return f"{kind}:{digest.hexdigest()}"
+
+
+class MemoryResultCache:
+    """
+    In-process result cache (per worker)
+
+    Results are stored as-is, so a hit costs one dict lookup.
+    """
+
+    backend = "memory"
+
+    def __init__(self, max_entries: int = 10_000, ttl_seconds: Optional[float] = 300, max_bytes: Optional[int] = None):
+        self._cache = LRUCache(
+            max_entries=max_entries,
+            ttl_seconds=ttl_seconds,
+            max_bytes=max_bytes,
+            sizeof=lambda result: len(json.dumps(result, default=str)),
+        )
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self._cache.get(key)
+
+    def set(self, key: str, result: Dict) -> None:
+        self._cache.set(key, result)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        return {"backend": self.backend, **self._cache.stats()}
+
+
+class RedisResultCache:
+    """
+    Result cache shared through Redis
+
+    Results are stored as JSON with a TTL per key; configure the server with
+    a maxmemory policy (e.g. allkeys-lru) to bound its size. Results larger
+    than `max_value_bytes` are not stored.
+
+    Args:
+        client: redis.Redis (or a compatible stand-in) with get/set/delete/scan_iter
+        prefix: Namespace for keys written by this service
+    """
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        client: Any,
+        ttl_seconds: Optional[float] = 300,
+        max_value_bytes: Optional[int] = 1 << 20,
+        prefix: str = "ml:result:",
+    ):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.max_value_bytes = max_value_bytes
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, socket_timeout: float = 0.1, **kwargs) -> "RedisResultCache":
+        """Connect to Redis (imported on first use, as it is optional)"""
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=socket_timeout), **kwargs)
+
+    def get(self, key: str) -> Optional[Dict]:
+        try:
+            payload = self.client.get(self.prefix + key)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Result cache read failed: {e}")
+            return None
+
+        self._count("misses" if payload is None else "hits")
+        return None if payload is None else json.loads(payload)
+
+    def set(self, key: str, result: Dict) -> None:
+        payload = json.dumps(result, default=str)
+        if self.max_value_bytes is not None and len(payload) > self.max_value_bytes:
+            return
+
+        try:
+            ttl_ms = int(self.ttl_seconds * 1000) if self.ttl_seconds else None
+            self.client.set(self.prefix + key, payload, px=ttl_ms)
+        except Exception as e:
+            self._count("errors")
+            logger.warning(f"Result cache write failed: {e}")
+
+    def clear(self) -> None:
+        """Delete the keys written by this service (not the whole database)"""
+        for key in self.client.scan_iter(match=self.prefix + "*"):
+            self.client.delete(key)
+
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def create_result_cache(settings) -> Optional[Any]:
+    """
+    Result cache configured by settings (None when disabled)
+
+    Falls back to the in-process backend when Redis cannot be reached.
+    """
+    backend = settings.result_cache_backend
+    if backend not in RESULT_CACHE_BACKENDS:
+        raise ValueError(f"Unknown result cache backend '{backend}', expected one of {RESULT_CACHE_BACKENDS}")
+
+    if backend == "none":
+        return None
+
+    if backend == "redis":
+        if not settings.result_cache_redis_url:
+            raise ValueError("RESULT_CACHE_REDIS_URL is required for the redis result cache")
+        try:
+            cache = RedisResultCache.from_url(settings.result_cache_redis_url, ttl_seconds=settings.result_cache_ttl_seconds)
+            cache.client.ping()
+            return cache
+        except Exception as e:
+            logger.warning(f"⚠️ Redis result cache unavailable ({e}), using in-process cache")
+
+    return MemoryResultCache(
+        max_entries=settings.result_cache_size,
+        ttl_seconds=settings.result_cache_ttl_seconds,
+        max_bytes=int(settings.result_cache_max_mb * 1024 * 1024),
+    )
@@ -0,0 +1,64 @@
+"""
+Thread budget of numerical libraries per serving worker
+
+OpenMP/BLAS, TensorFlow and scikit-learn (n_jobs=-1) each default to one
+thread per core, so N workers on one host run N threads per core. The
+budget splits the cores between workers instead:
+
+- Thread count variables are read when a library initializes, so they
+  are set before NumPy/TensorFlow load (by the pre-fork server, or at
+  startup for TensorFlow, which is imported on first use)
+- threadpoolctl caps BLAS/OpenMP pools already loaded in the process
+- scikit-learn n_jobs and the default executor sizes use the same budget
+  (Settings.worker_threads)
+
+Kept free of NumPy imports so it can run before them.
+"""
+
+import os
+from typing import Dict, Optional
+
+# Thread count variables of OpenMP, BLAS backends, numexpr and TensorFlow (intra-op)
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+)
+
+
+def threads_per_worker(workers: int, cpus: Optional[int] = None) -> int:
+    """Cores available to each of `workers` processes (at least 1)"""
+    return max(1, (cpus or os.cpu_count() or 1) // max(1, workers))
+
+
+def set_thread_env(threads: int) -> Dict[str, str]:
+    """
+    Set thread count variables the operator did not set
+
+    Only libraries initialized afterwards are affected.
+
+    Returns:
+        Variables set by this call
+    """
+    values = {var: str(threads) for var in THREAD_ENV_VARS}
+    values["TF_NUM_INTEROP_THREADS"] = str(min(2, threads))  # Independent ops run side by side
+
+    applied = {var: value for var, value in values.items() if var not in os.environ}
+    os.environ.update(applied)
+    return applied
+
+
+def limit_threads(threads: int) -> Dict[str, int]:
+    """
+    Cap the thread pools of BLAS/OpenMP libraries loaded in this process
+
+    Returns:
+        Threads per loaded library API (e.g. {"openblas": 2, "openmp": 2})
+    """
+    from threadpoolctl import threadpool_info, threadpool_limits
+
+    threadpool_limits(limits=threads)
+    return {info['internal_api']: info['num_threads'] for info in threadpool_info()}
@@ -0,0 +1,104 @@
+"""
+Sliding window utilities for sequence models
+
+Windows are strided views over the input array (no per-window copies).
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from typing import Iterator, Sequence, Tuple
+
+
+def sliding_windows(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Zero-copy sliding windows over the time axis
+
+    Args:
+        values: Array of shape (n_steps,) or (n_steps, n_features)
+        window: Timesteps per window
+
+    Returns:
+        Read-only view of shape (n_steps - window + 1, window, n_features)
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+
+    if len(values) < window:
+        return np.empty((0, window, values.shape[1]), dtype=values.dtype)
+
+    # sliding_window_view appends the window axis last: (n_windows, n_features, window)
+    return sliding_window_view(values, window, axis=0).transpose(0, 2, 1)
+
+
+def window_targets(values: np.ndarray, window: int, target: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Supervised (input window, next value) pairs as zero-copy views
+
+    Equivalent to the loop `X[i] = values[i - window:i]`, `y[i] = values[i, target]`
+    for i in range(window, n_steps).
+
+    Args:
+        values: Array of shape (n_steps,) or (n_steps, n_features)
+        window: Lookback timesteps
+        target: Feature column predicted
+
+    Returns:
+        X view of shape (n_steps - window, window, n_features),
+        y view of shape (n_steps - window, 1)
+    """
+    values = np.asarray(values)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+
+    # The last window has no next value to predict
+    X = sliding_windows(values, window)[:-1]
+    y = values[window:, target:target + 1]
+
+    return X, y
+
+
+def panel_windows(panel: np.ndarray, window: int) -> np.ndarray:
+    """
+    Sliding windows over many equal-length series at once
+
+    Args:
+        panel: Array of shape (n_series, n_steps, n_features)
+
+    Returns:
+        Read-only view of shape (n_series, n_steps - window + 1, window, n_features)
+    """
+    return sliding_window_view(panel, window, axis=1).transpose(0, 1, 3, 2)
+
+
+def iter_window_batches(
+    series: Sequence[np.ndarray],
+    window: int,
+    batch_size: int = 1024,
+    target: int = 0,
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Training batches of (X, y) across many series of any length
+
+    Windows never cross series boundaries. Each series is windowed as a
+    view; only the yielded batch is materialized, so peak memory is one
+    batch instead of every window of every series.
+    """
+    X_parts, y_parts, n_pending = [], [], 0
+
+    for values in series:
+        X, y = window_targets(values, window, target)
+        start = 0
+        while start < len(X):
+            take = min(batch_size - n_pending, len(X) - start)
+            X_parts.append(X[start:start + take])
+            y_parts.append(y[start:start + take])
+            n_pending += take
+            start += take
+
+            if n_pending == batch_size:
+                yield np.concatenate(X_parts), np.concatenate(y_parts)
+                X_parts, y_parts, n_pending = [], [], 0
+
+    if n_pending:
+        yield np.concatenate(X_parts), np.concatenate(y_parts)
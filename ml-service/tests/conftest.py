@@ -0,0 +1,25 @@
+"""
+Shared test fixtures
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+
+
+@pytest.fixture
+def make_history():
+    """Factory of long-format histories for several SKUs (one point per day)"""
+    def make(skus, n=60, start=datetime(2024, 1, 1), warehouse_id="WH001"):
+        rows = len(skus) * n
+        return pd.DataFrame({
+            'timestamp': [start + timedelta(days=i) for i in range(n)] * len(skus),
+            'sku': np.repeat(skus, n),
+            'quantity': np.random.normal(100, 10, rows).astype(int),
+            'price': np.random.normal(50, 2, rows),
+            'supplier_id': ['SUP001'] * rows,
+            'warehouse_id': [warehouse_id] * rows,
+        })
+
+    return make
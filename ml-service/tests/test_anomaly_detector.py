@@ -3,13 +3,14 @@ Unit tests for Anomaly Detector
 """
 
 import pytest
+import pytest_asyncio
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from src.models.anomaly_detector import AnomalyDetector
 
 
-@pytest.fixture
+@pytest_asyncio.fixture
 async def detector():
     """Create and initialize detector"""
     detector = AnomalyDetector()
@@ -156,3 +157,122 @@ async def test_sensitivity_parameter(detector, normal_data):
     # Both should complete without error
     assert 'is_anomaly' in result_low
     assert 'is_anomaly' in result_high
+
+
+@pytest.fixture
+def multi_sku_data(normal_data, anomaly_price_spike_data):
+    """Long-format data with two SKUs and one short series"""
+    spike = anomaly_price_spike_data.copy()
+    spike['sku'] = 'SKU002'
+
+    short = normal_data.tail(10).copy()
+    short['sku'] = 'SKU003'
+
+    return pd.concat([normal_data, spike, short], ignore_index=True)
+
+
+@pytest.mark.asyncio
+async def test_detect_batch_groups_by_series(detector, multi_sku_data):
+    """Test batch detection returns one result per sku/warehouse series"""
+    result = await detector.detect_batch(multi_sku_data)
+
+    by_sku = {r['sku']: r for r in result['results']}
+    assert set(by_sku) == {'SKU001', 'SKU002'}
+    assert by_sku['SKU002']['is_anomaly'] == True
+    assert by_sku['SKU002']['anomaly_type'] == "price_spike"
+    assert by_sku['SKU001']['warehouse_id'] == 'WH001'
+
+    # Short series are reported, not scored
+    assert len(result['errors']) == 1
+    assert result['errors'][0]['sku'] == 'SKU003'
+
+
+@pytest.mark.asyncio
+async def test_forest_fitted_once_per_series(detector, normal_data):
+    """Test repeated detection reuses the fitted forest instead of refitting"""
+    await detector.detect(normal_data)
+    await detector.detect(normal_data, sensitivity=0.2)
+
+    assert detector.forests.fits == 1
+    assert len(detector.forests) == 1
+
+
+@pytest.mark.asyncio
+async def test_forest_refit_after_new_points(detector, normal_data):
+    """Test forest is refreshed once enough new observations were scored"""
+    detector.forests.refit_after_points = 5
+
+    await detector.detect(normal_data.iloc[:-10])
+    await detector.detect(normal_data.iloc[:-5])  # 5 new points -> refit
+
+    assert detector.forests.fits == 2
+
+
+@pytest.mark.asyncio
+async def test_lstm_trained_scores_batch_in_one_call(detector, multi_sku_data, monkeypatch):
+    """Test trained LSTM branch scores all series with one predict call"""
+    metrics = detector.train_lstm(multi_sku_data, epochs=1, batch_size=64)
+
+    assert metrics['windows'] == 2 * (60 - 30 + 1)
+    assert detector.lstm_threshold is not None
+
+    calls = []
+    predict = detector.lstm_autoencoder.predict_on_batch
+    monkeypatch.setattr(
+        detector.lstm_autoencoder, "predict_on_batch",
+        lambda X: calls.append(X.shape) or predict(X),
+    )
+
+    result = await detector.detect_batch(multi_sku_data)
+
+    assert calls == [(2, 30, 5)]
+    assert len(result['results']) == 2
+    assert all(0.0 <= r['confidence'] <= 1.0 for r in result['results'])
+
+
+@pytest.mark.asyncio
+async def test_detect_many_matches_detect(detector, normal_data, anomaly_price_spike_data):
+    """Test micro-batched scoring gives each request its detect_sync result"""
+    requests = [
+        (normal_data, 0.05),
+        (anomaly_price_spike_data, 0.1),
+        (normal_data.drop(columns=['price']), 0.05),  # Fails alone
+    ]
+
+    # Same supplier/warehouse baselines for both paths
+    detector.baselines.update(pd.concat([normal_data, anomaly_price_spike_data]))
+
+    expected = [detector.detect_sync(data, sensitivity) for data, sensitivity in requests[:2]]
+    results = detector.detect_many_sync(requests)
+
+    assert results[:2] == expected
+    assert results[1]['anomaly_type'] == "price_spike"
+    assert isinstance(results[2], KeyError)
+
+
+@pytest.mark.asyncio
+async def test_detect_many_isolates_timestamp_formats(detector, normal_data, anomaly_price_spike_data):
+    """Test tz-aware, naive and unparsable timestamps in one micro-batch only fail their own request"""
+    aware = normal_data.assign(timestamp=normal_data['timestamp'].dt.tz_localize("UTC"))
+    broken = anomaly_price_spike_data.assign(timestamp="not a date")
+
+    results = detector.detect_many_sync([(aware, 0.05), (anomaly_price_spike_data, 0.1)])
+    assert all(isinstance(r, dict) for r in results)
+    assert results[1]['anomaly_type'] == "price_spike"
+
+    results = detector.detect_many_sync([(normal_data, 0.05), (broken, 0.1)])
+    assert isinstance(results[0], dict)
+    assert isinstance(results[1], Exception)
+
+
+def test_packed_forest_scores_match_sklearn():
+    """Test the vectorized tree walk reproduces IsolationForest.score_samples"""
+    from sklearn.ensemble import IsolationForest
+    from src.models.forest_cache import PackedTrees
+
+    X = np.random.normal(0, 1, (200, 10))
+    new = np.vstack([np.random.normal(0, 3, (20, 10)), X[:5]])
+
+    for max_features in (1.0, 0.5):
+        model = IsolationForest(n_estimators=50, max_features=max_features, random_state=42).fit(X)
+        np.testing.assert_allclose(PackedTrees.from_model(model).score_samples(new), model.score_samples(new), rtol=1e-12)
@@ -0,0 +1,386 @@
+"""
+API tests for ML Service endpoints
+"""
+
+import asyncio
+import json
+import pytest
+import numpy as np
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+
+from src.main import app
+
+
+@pytest.fixture
+def client():
+    """Test client with startup events run"""
+    with TestClient(app) as client:
+        yield client
+
+
+def make_points(sku: str, n: int = 60, price_spike: bool = False):
+    """Generate JSON data points for one SKU"""
+    dates = [datetime.now() - timedelta(days=i) for i in range(n, 0, -1)]
+    prices = np.random.normal(50, 2, n)
+    if price_spike:
+        prices[-1] = 150
+
+    return [
+        {
+            "timestamp": date.isoformat(),
+            "sku": sku,
+            "quantity": int(np.random.normal(100, 10)),
+            "price": float(price),
+            "supplier_id": "SUP001",
+            "warehouse_id": "WH001",
+        }
+        for date, price in zip(dates, prices)
+    ]
+
+
+def test_detect_anomaly_batch(client):
+    """Test batch endpoint returns per-series results"""
+    payload = {
+        "data_points": make_points("SKU001") + make_points("SKU002", price_spike=True) + make_points("SKU003", n=5),
+        "sensitivity": 0.05,
+    }
+
+    response = client.post("/api/ml/detect-anomaly/batch", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    by_sku = {r['sku']: r for r in body['results']}
+    assert set(by_sku) == {"SKU001", "SKU002"}
+    assert by_sku["SKU002"]['anomaly_type'] == "price_spike"
+    assert [e['sku'] for e in body['errors']] == ["SKU003"]
+
+
+def test_detect_anomaly_overloaded_returns_429(client):
+    """Test executor backpressure is surfaced as HTTP 429"""
+    from src import main
+
+    main.anomaly_executor.max_pending = 0
+    response = client.post("/api/ml/detect-anomaly", json={"data_points": make_points("SKU001")})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+
+
+def to_columnar(points):
+    """Convert row-format JSON points to the columnar layout"""
+    return {
+        "timestamps": [p["timestamp"] for p in points],
+        "sku": points[0]["sku"],
+        "quantities": [p["quantity"] for p in points],
+        "prices": [p["price"] for p in points],
+        "supplier_id": points[0]["supplier_id"],
+        "warehouse_id": [p["warehouse_id"] for p in points],
+    }
+
+
+def test_detect_anomaly_columnar_matches_rows(client):
+    """Test columnar payload gives the same verdict as the row payload"""
+    points = make_points("SKU001", price_spike=True)
+
+    rows = client.post("/api/ml/detect-anomaly", json={"data_points": points})
+    columnar = client.post("/api/ml/detect-anomaly", json={"series": to_columnar(points)})
+
+    assert columnar.status_code == 200
+    assert columnar.json() == rows.json()
+
+
+def test_forecast_demand_columnar_epoch_timestamps(client, monkeypatch):
+    """Test epoch and ISO timestamps both forecast with Prophet, for the same dates"""
+    from src.config import get_settings
+    monkeypatch.setattr(get_settings(), "forecast_engine", "prophet")
+    iso = to_columnar(make_points("SKU-EPOCH", n=100))
+    epoch = {**iso, "timestamps": [datetime.fromisoformat(t).timestamp() for t in iso["timestamps"]]}
+
+    from_epoch = client.post("/api/ml/forecast-demand", json={"series": epoch, "forecast_horizon": 3})
+    from_iso = client.post("/api/ml/forecast-demand", json={"series": iso, "forecast_horizon": 3})
+
+    assert from_epoch.status_code == 200
+    assert from_epoch.json()['model_type'] == "prophet"
+    assert [f['date'] for f in from_epoch.json()['forecasts']] == [f['date'] for f in from_iso.json()['forecasts']]
+
+
+def test_detect_anomaly_mixed_timestamp_formats(client):
+    """Test one series can be sent with epoch, ISO and offset timestamps in turn"""
+    points = make_points("SKU-MIXED", n=61)
+    iso = to_columnar(points)
+    epoch = {**iso, "timestamps": [datetime.fromisoformat(t).timestamp() for t in iso["timestamps"]]}
+    offset = [{**p, "timestamp": datetime.fromisoformat(p["timestamp"]).astimezone().isoformat()} for p in points]
+
+    for payload in ({"series": epoch}, {"series": iso}, {"data_points": offset}, {"series": epoch}):
+        assert client.post("/api/ml/detect-anomaly", json=payload).status_code == 200
+
+
+def test_columnar_payload_validation(client):
+    """Test columnar arrays must have equal lengths and enough rows"""
+    series = to_columnar(make_points("SKU001"))
+    series["prices"] = series["prices"][:-1]
+    assert client.post("/api/ml/detect-anomaly", json={"series": series}).status_code == 422
+
+    short = to_columnar(make_points("SKU001", n=10))
+    assert client.post("/api/ml/detect-anomaly", json={"series": short}).status_code == 422
+
+    both = {"data_points": make_points("SKU001"), "series": to_columnar(make_points("SKU001"))}
+    assert client.post("/api/ml/detect-anomaly", json=both).status_code == 422
+
+
+def test_detect_anomaly_point(client):
+    """Test single points are scored after the series history was sent once"""
+    points = make_points("SKU-POINT", n=61)
+
+    unseen = client.post("/api/ml/detect-anomaly/point", json={"data_point": points[-1]})
+    assert unseen.status_code == 404
+
+    client.post("/api/ml/detect-anomaly", json={"data_points": points[:-1]})
+    response = client.post("/api/ml/detect-anomaly/point", json={"data_point": points[-1]})
+
+    assert response.status_code == 200
+    assert "is_anomaly" in response.json()
+
+
+def test_detect_anomaly_point_utc_timestamp(client):
+    """Test points with a "Z" timestamp are compared with the stored naive UTC state"""
+    points = make_points("SKU-POINT-UTC", n=60)
+    client.post("/api/ml/detect-anomaly", json={"data_points": points})
+
+    latest = datetime.fromisoformat(points[-1]["timestamp"])
+    point = {**points[-1], "timestamp": (latest + timedelta(days=1)).isoformat() + "Z"}
+    response = client.post("/api/ml/detect-anomaly/point", json={"data_point": point})
+
+    assert response.status_code == 200
+    assert "is_anomaly" in response.json()
+
+
+def test_forecast_demand_batch(client):
+    """Test batch forecast endpoint returns per-series forecasts"""
+    payload = {
+        "historical_data": make_points("SKU001", n=100) + make_points("SKU002", n=100) + make_points("SKU003", n=20),
+        "forecast_horizon": 5,
+    }
+
+    response = client.post("/api/ml/forecast-demand/batch", json=payload)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert sorted(r['sku'] for r in body['results']) == ["SKU001", "SKU002"]
+    assert all(len(r['forecasts']) == 5 for r in body['results'])
+    assert [e['sku'] for e in body['errors']] == ["SKU003"]
+
+
+def read_ndjson(client, url: str, payload: dict):
+    """POST with Accept: application/x-ndjson and parse the streamed lines"""
+    with client.stream("POST", url, json=payload, headers={"Accept": "application/x-ndjson"}) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_detect_anomaly_batch_streams_ndjson(client, monkeypatch):
+    """Test streamed batch detection emits one line per series across chunks"""
+    from src.config import get_settings
+    monkeypatch.setattr(get_settings(), "anomaly_stream_chunk_size", 1)
+    payload = {
+        "data_points": make_points("SKU001") + make_points("SKU002", price_spike=True) + make_points("SKU003", n=5),
+        "sensitivity": 0.05,
+    }
+
+    lines = read_ndjson(client, "/api/ml/detect-anomaly/batch", payload)
+
+    results = {line['sku']: line for line in lines if 'error' not in line}
+    assert set(results) == {"SKU001", "SKU002"}
+    assert results["SKU002"]['anomaly_type'] == "price_spike"
+    assert [line['error']['sku'] for line in lines if 'error' in line] == ["SKU003"]
+
+
+@pytest.mark.asyncio
+async def test_stream_batches_pauses_for_slow_reader():
+    """Test streamed chunks are computed at most one executor window ahead of the reader"""
+    from src.main import stream_batches, SeriesAnomalyResult
+    from src.utils.executor import ModelExecutor
+
+    executor = ModelExecutor(name="test", max_workers=2)
+    started = []
+
+    class FailingModel:
+        def detect_batch_sync(self, chunk):
+            started.append(chunk)
+            return {"results": [], "errors": [{"sku": chunk, "warehouse_id": None, "detail": "failed"}]}
+
+    skus = [f"SKU{i:03d}" for i in range(10)]
+    response = await stream_batches(executor.map(FailingModel(), "detect_batch_sync", skus), SeriesAnomalyResult)
+    body = response.body_iterator
+    first = await body.__anext__()
+    await asyncio.sleep(0.05)  # Reader is slow
+
+    assert len(started) == 2
+    lines = [first] + [line async for line in body]
+    assert sorted(json.loads(line)['error']['sku'] for line in lines) == skus
+    executor.shutdown()
+
+
+def test_forecast_demand_batch_streams_ndjson(client, monkeypatch):
+    """Test streamed batch forecasting emits forecast-shaped lines"""
+    from src.config import get_settings
+    monkeypatch.setattr(get_settings(), "forecast_engine", "auto")  # Short histories take the fast engine
+    payload = {
+        "historical_data": make_points("SKU001", n=100) + make_points("SKU002", n=100),
+        "forecast_horizon": 3,
+    }
+
+    lines = read_ndjson(client, "/api/ml/forecast-demand/batch", payload)
+
+    assert sorted(line['sku'] for line in lines) == ["SKU001", "SKU002"]
+    assert all(len(line['forecasts']) == 3 and line['model_type'] == "exponential_smoothing" for line in lines)
+
+
+def test_metrics_endpoint(client):
+    """Test /metrics exposes stage timings, rows, caches and executors"""
+    client.post("/api/ml/detect-anomaly", json={"data_points": make_points("SKU001"), "sensitivity": 0.05})
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    body = response.text
+    assert 'ml_stage_duration_seconds_count{stage="frame_build"}' in body
+    assert 'ml_stage_duration_seconds_count{stage="engineer_features"}' in body
+    assert 'ml_stage_duration_seconds_count{stage="isolation_forest_score"}' in body
+    assert 'ml_request_rows_count{endpoint="detect_anomaly"}' in body
+    assert 'ml_http_request_duration_seconds_count{endpoint="/api/ml/detect-anomaly",method="POST",status="200"}' in body
+    assert 'ml_cache_hit_ratio{cache="isolation_forests"}' in body
+    assert 'ml_executor_pending{executor="anomaly"} 0.0' in body
+
+
+def test_detect_anomaly_repeated_request_is_cached(client):
+    """Test an identical retry is answered from the result cache, not the models"""
+    from src import main
+
+    payload = {"data_points": make_points("SKU001"), "sensitivity": 0.05}
+    first = client.post("/api/ml/detect-anomaly", json=payload)
+
+    main.anomaly_executor.max_pending = 0  # Any model call would now get HTTP 429
+    retry = client.post("/api/ml/detect-anomaly", json=payload)
+    changed = client.post("/api/ml/detect-anomaly", json={**payload, "sensitivity": 0.1})
+
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert changed.status_code == 429
+    assert main.result_cache.stats()['hits'] == 1
+
+
+def test_baseline_lookup_after_detection(client):
+    """Test detection feeds the supplier/warehouse baselines served by the lookup endpoint"""
+    points = [{**point, "supplier_id": "SUP-BASELINE"} for point in make_points("SKU-BASELINE")]
+    client.post("/api/ml/detect-anomaly", json={"data_points": points})
+
+    response = client.get("/api/ml/baselines/supplier/SUP-BASELINE")
+    assert response.status_code == 200
+    baseline = response.json()
+    assert baseline['count'] == 60
+    assert baseline['price_p05'] < baseline['price_p50'] < baseline['price_p95']
+
+    assert client.get("/api/ml/baselines/supplier/SUP-UNKNOWN").status_code == 404
+    assert client.get("/api/ml/baselines/region/EU").status_code == 404
+
+
+def test_detect_anomaly_with_stored_history(client):
+    """Test a request with only the new observation reads its history from the store"""
+    points = make_points("SKU001", n=61, price_spike=True)
+    stored = client.post("/api/ml/history", json={"data_points": points[:-1]})
+
+    response = client.post("/api/ml/detect-anomaly", json={
+        "stored_series": {"sku": "SKU001", "warehouse_id": "WH001"},
+        "data_points": points[-1:],
+    })
+    full = client.post("/api/ml/detect-anomaly", json={"data_points": points})
+
+    assert stored.json() == {"appended": 60, "skipped": 0, "series": 1}
+    assert response.status_code == 200
+    assert response.json()['anomaly_type'] == full.json()['anomaly_type'] == "price_spike"
+
+    unknown = client.post("/api/ml/detect-anomaly", json={"stored_series": {"sku": "SKU404"}})
+    mismatched = client.post("/api/ml/detect-anomaly", json={
+        "stored_series": {"sku": "SKU001", "warehouse_id": "WH001"},
+        "data_points": make_points("SKU002", n=1),
+    })
+    assert unknown.status_code == 404
+    assert mismatched.status_code == 422
+
+
+def test_training_job_hot_swaps_served_model(tmp_path, monkeypatch):
+    """Test a background job trains on stored history and the served detector switches to its version"""
+    import time
+    from src.config import get_settings
+
+    monkeypatch.setattr(get_settings(), "model_registry_dir", str(tmp_path))
+    with TestClient(app) as client:
+        assert client.post("/api/ml/training/jobs", json={"kind": "anomaly_forests"}).status_code == 422  # Nothing stored
+        assert client.post("/api/ml/training/jobs", json={"kind": "prophet"}).status_code == 422
+
+        client.post("/api/ml/history", json={"data_points": make_points("SKU001") + make_points("SKU002")})
+        submitted = client.post("/api/ml/training/jobs", json={"kind": "anomaly_forests"})
+        assert submitted.status_code == 202
+        job_id = submitted.json()['id']
+
+        deadline = time.time() + 60
+        while client.get(f"/api/ml/training/jobs/{job_id}").json()['status'] in ("queued", "running"):
+            assert time.time() < deadline
+            time.sleep(0.1)
+
+        result = client.get(f"/api/ml/training/jobs/{job_id}/result")
+        assert result.status_code == 200, client.get(f"/api/ml/training/jobs/{job_id}").json()
+        assert result.json()['metrics']['segments'] == 2
+
+        info = client.get("/api/ml/models/info").json()
+        artifact = info['anomaly_detector']['artifacts']['anomaly_isolation_forests']
+        assert artifact['version'] == result.json()['artifact']['version']
+        assert info['training_jobs']['succeeded'] == 1
+        assert info['serving']['slots']['anomaly_detector']['active']['generation'] == 2
+
+        assert client.get("/api/ml/training/jobs/unknown").status_code == 404
+
+        # The version served before the job is kept for rollback
+        rolled_back = client.post("/api/ml/models/anomaly_detector/rollback")
+        assert rolled_back.json()['active']['artifacts'] == {}
+        activated = client.post("/api/ml/models/anomaly_detector/activate", json={"artifacts": {"anomaly_isolation_forests": artifact['version']}})
+        assert activated.json()['active']['generation'] == 3
+        assert client.post("/api/ml/models/anomaly_detector/activate", json={"artifacts": {"anomaly_isolation_forests": 99}}).status_code == 404
+        assert client.post("/api/ml/models/forecaster/rollback").status_code == 404
+
+
+def test_shutdown_saves_online_forests_unless_pinned(tmp_path, monkeypatch, make_history):
+    """Test shutdown adds forests fitted while serving as a version, except when nothing changed or a version is pinned"""
+    from src.config import get_settings
+    from src.models.anomaly_detector import FOREST_ARTIFACT
+    from src.models.registry import ModelRegistry
+    from src.training.jobs import train_artifact
+
+    train_artifact("anomaly_forests", make_history(["SKU001"]), str(tmp_path), {})
+    train_artifact("anomaly_forests", make_history(["SKU001"]), str(tmp_path), {})
+    registry = ModelRegistry(str(tmp_path))
+    monkeypatch.setattr(get_settings(), "model_registry_dir", str(tmp_path))
+    monkeypatch.setattr(get_settings(), "model_registry_keep_versions", 2)
+
+    with TestClient(app) as client:
+        client.get("/health")
+    assert registry.list_versions(FOREST_ARTIFACT) == [1, 2]  # Nothing fitted
+
+    with TestClient(app) as client:
+        client.post("/api/ml/detect-anomaly", json={"data_points": make_points("SKU002")})
+    saved = registry.load(FOREST_ARTIFACT)['forests']
+    assert registry.list_versions(FOREST_ARTIFACT) == [2, 3]  # Older versions pruned
+    assert set(saved) == {("SKU001", "WH001"), ("SKU002", "WH001")}
+
+    with TestClient(app) as client:
+        client.post("/api/ml/models/anomaly_detector/activate", json={"artifacts": {FOREST_ARTIFACT: 2}})
+        client.post("/api/ml/detect-anomaly", json={"data_points": make_points("SKU003")})
+        assert client.get("/api/ml/models/info").json()['serving']['slots']['anomaly_detector']['pinned'] == {FOREST_ARTIFACT: 2}
+    assert registry.list_versions(FOREST_ARTIFACT) == [2, 3]
+
+
+def test_training_jobs_require_registry(client):
+    assert client.post("/api/ml/training/jobs", json={"kind": "anomaly_forests"}).status_code == 503
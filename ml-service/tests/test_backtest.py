@@ -0,0 +1,93 @@
+"""
+Unit tests for rolling-origin backtesting
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+
+from src.config import Settings
+from src.models.backtest import backtest_fast, ensemble_weights, evaluate, fold_actuals, fold_windows, rolling_origins
+from src.models.demand_forecaster import DemandForecaster
+from src.models.fast_forecast import forecast_panel
+
+
+def make_series(sku: str, n: int = 120) -> pd.DataFrame:
+    """Daily demand with weekly seasonality"""
+    weekly = 1 + 0.2 * np.sin(np.arange(n) * 2 * np.pi / 7)
+    return pd.DataFrame({
+        'timestamp': [datetime(2025, 1, 1) + timedelta(days=i) for i in range(n)],
+        'sku': sku,
+        'quantity': (100 * weekly + np.random.normal(0, 5, n)).astype(int),
+        'price': 50.0,
+        'supplier_id': "SUP001",
+        'warehouse_id': None,
+    })
+
+
+def test_rolling_origins():
+    """Test the last fold ends with the history and earlier ones step back"""
+    np.testing.assert_array_equal(rolling_origins(100, horizon=7, folds=3), [79, 86, 93])
+    np.testing.assert_array_equal(rolling_origins(100, horizon=7, folds=3, step=1), [91, 92, 93])
+
+    with pytest.raises(ValueError):
+        rolling_origins(40, horizon=7, folds=3)
+
+
+def test_vectorized_backtest_matches_fold_by_fold():
+    """Test one panel call over (series, fold) windows equals forecasting each fold alone"""
+    panel = np.random.poisson(20, (5, 90)).astype(np.float64)
+    first_weekday = np.arange(5) % 7
+    cutoffs = rolling_origins(90, horizon=7, folds=3)
+    window = int(cutoffs[0])
+
+    windows = fold_windows(panel, cutoffs, window)
+    predicted = backtest_fast(windows, (first_weekday[:, None] + cutoffs - window) % 7, horizon=7)
+    actual = fold_actuals(panel, cutoffs, 7)
+
+    for f, cutoff in enumerate(cutoffs):
+        train = panel[:, cutoff - window:cutoff]
+        expected = forecast_panel(train, (first_weekday + cutoff - window) % 7, 7)['yhat']
+        np.testing.assert_allclose(predicted[:, f], expected)
+        np.testing.assert_array_equal(actual[:, f], panel[:, cutoff:cutoff + 7])
+
+    # Metrics over the (series, fold, horizon) array equal a per-series loop
+    metrics = evaluate({"fast": predicted}, actual)["fast"]
+    for s in range(5):
+        errors = (predicted[s] - actual[s]).ravel()
+        assert metrics['mae'][s] == pytest.approx(np.abs(errors).mean())
+        assert metrics['rmse'][s] == pytest.approx(np.sqrt((errors ** 2).mean()))
+
+
+def test_ensemble_weights_favor_the_more_accurate_engine():
+    actual = np.full((2, 3, 7), 100.0)
+    predictions = {
+        "prophet": actual + np.array([10.0, 0.0])[:, None, None],
+        "fast": actual + np.array([5.0, 20.0])[:, None, None],
+    }
+
+    weights = ensemble_weights(predictions, actual)
+
+    np.testing.assert_allclose(weights["fast"], [0.8, 0.0])
+    np.testing.assert_allclose(weights["prophet"] + weights["fast"], 1.0)
+
+
+@pytest.mark.asyncio
+async def test_backtest_feeds_ensemble_forecast():
+    """Test backtest weights blend Prophet with the fast engine and replace in-sample metrics"""
+    forecaster = DemandForecaster(Settings(forecast_engine="prophet"))
+    await forecaster.initialize()
+    history = make_series("SKU001")
+
+    backtest = forecaster.backtest_sync(pd.concat([history, make_series("SKU002", n=30)]), horizon=7, folds=2)
+
+    assert [r['sku'] for r in backtest['results']] == ["SKU001"]
+    assert [e['sku'] for e in backtest['errors']] == ["SKU002"]  # Too short for 2 folds
+    result = backtest['results'][0]
+    assert set(result['metrics']) == {"fast", "seasonal_naive", "prophet", "ensemble"}
+    assert sum(result['weights'].values()) == pytest.approx(1.0, abs=1e-3)
+
+    forecast = forecaster.forecast_sync(history, horizon=7)
+    assert forecast['model_type'] == "ensemble"
+    assert forecast['accuracy_metrics'] == result['metrics']['ensemble']
@@ -0,0 +1,78 @@
+"""
+Unit tests for supplier/warehouse baselines
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+
+from src.features.baselines import BASELINE_FEATURES, BaselineIndex
+from src.features.engineering import engineer_features
+
+
+def make_series(sku, supplier_id, warehouse_id, n=60, start=0):
+    return pd.DataFrame({
+        'timestamp': [datetime(2025, 1, 1) + timedelta(days=start + i) for i in range(n)],
+        'sku': sku,
+        'quantity': np.random.normal(100, 10, n).astype(int),
+        'price': np.random.normal(50, 2, n),
+        'supplier_id': supplier_id,
+        'warehouse_id': warehouse_id,
+    })
+
+
+def test_incremental_baselines_match_full_statistics():
+    """Test baselines merged batch by batch equal statistics over all rows"""
+    data = pd.concat([
+        make_series("SKU001", "SUP001", "WH001"),
+        make_series("SKU002", "SUP001", "WH002"),
+        make_series("SKU003", "SUP002", "WH001"),
+    ], ignore_index=True).sort_values('timestamp', kind='stable')  # Interleaved series, arriving in time order
+
+    index = BaselineIndex()
+    for start in range(0, len(data), 40):
+        index.update(data.iloc[start:start + 40])
+
+    for level, column in (("supplier", "supplier_id"), ("warehouse", "warehouse_id")):
+        for key, group in data.groupby(column):
+            baseline = index.lookup(level, key)
+            assert baseline['count'] == len(group)
+            for value in ('price', 'quantity'):
+                assert baseline[f'{value}_mean'] == pytest.approx(group[value].mean())
+                assert baseline[f'{value}_std'] == pytest.approx(group[value].std(ddof=0))
+                for q in (5, 50, 95):
+                    assert baseline[f'{value}_p{q:02d}'] == pytest.approx(group[value].quantile(q / 100), rel=0.1)  # Histogram resolution
+
+    assert index.lookup("supplier", "SUP999") is None
+
+
+def test_resent_history_is_not_counted_twice():
+    """Test rows not newer than a series' latest timestamp are skipped"""
+    index = BaselineIndex()
+    history = make_series("SKU001", "SUP001", "WH001")
+
+    assert index.update(history) == 60
+    assert index.update(history) == 0
+    assert index.update(pd.concat([history, make_series("SKU001", "SUP001", "WH001", n=5, start=60)])) == 5
+
+    new = make_series("SKU001", "SUP001", "WH001", n=1, start=65).iloc[0].to_dict()
+    assert index.observe(new) == 1
+    assert index.observe(new) == 0
+    assert index.lookup("supplier", "SUP001")['count'] == 66
+    assert index.stats()['skipped'] == 121
+
+
+def test_baseline_features():
+    """Test z-scores against each level, NaN for groups without enough history"""
+    index = BaselineIndex()
+    index.update(make_series("SKU001", "SUP001", "WH001"))
+    index.update(make_series("SKU002", "SUP002", None, n=10))
+
+    spike = make_series("SKU001", "SUP001", "WH001", n=1, start=60).assign(price=500.0)
+    features = index.point_features(spike.iloc[0].to_dict())
+    assert features['price_supplier_zscore'] > 10
+    assert features['price_warehouse_zscore'] > 10
+
+    featured = engineer_features(make_series("SKU002", "SUP002", None, n=10), baselines=index)
+    assert featured[BASELINE_FEATURES].isna().all().all()  # 10 points, no warehouse
@@ -0,0 +1,73 @@
+"""
+Unit tests for the request micro-batcher
+"""
+
+import asyncio
+import pytest
+
+from src.utils.batcher import MicroBatcher
+from src.utils.executor import ModelExecutor, ExecutorOverloaded
+
+
+class BatchModel:
+    """Doubles every item in one call; negative items fail individually"""
+
+    def __init__(self):
+        self.calls = []
+
+    def double_many(self, items):
+        self.calls.append(list(items))
+        return [ValueError(f"bad item {item}") if item < 0 else item * 2 for item in items]
+
+
+@pytest.fixture
+def executor():
+    executor = ModelExecutor(name="test", max_workers=1)
+    yield executor
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_call(executor):
+    """Test requests arriving within max_wait are scored together"""
+    model = BatchModel()
+    batcher = MicroBatcher(executor, model, "double_many", max_batch_size=32, max_wait_ms=20)
+
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+    assert results == [0, 2, 4, 6, 8]
+    assert model.calls == [[0, 1, 2, 3, 4]]
+    assert batcher.stats()['mean_batch_size'] == 5
+
+
+@pytest.mark.asyncio
+async def test_full_batch_dispatches_without_waiting(executor):
+    """Test max_batch_size splits the waiting requests and skips the wait"""
+    model = BatchModel()
+    batcher = MicroBatcher(executor, model, "double_many", max_batch_size=2, max_wait_ms=10_000)
+
+    results = await asyncio.wait_for(asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=1)
+
+    assert results == [0, 2, 4, 6]
+    assert model.calls == [[0, 1], [2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_item_errors_fail_only_their_caller(executor):
+    batcher = MicroBatcher(executor, BatchModel(), "double_many", max_wait_ms=5)
+
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(-1), return_exceptions=True)
+
+    assert results[0] == 2
+    assert isinstance(results[1], ValueError)
+
+
+@pytest.mark.asyncio
+async def test_executor_overload_fails_the_batch(executor):
+    """Test backpressure reaches every caller of the rejected batch"""
+    executor.max_pending = 0
+    batcher = MicroBatcher(executor, BatchModel(), "double_many", max_wait_ms=5)
+
+    results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    assert all(isinstance(r, ExecutorOverloaded) for r in results)
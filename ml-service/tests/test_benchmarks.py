@@ -0,0 +1,70 @@
+"""
+Tests for the benchmark suite (generators, measurement, comparison)
+"""
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generators import demand_history, inventory_history
+from benchmarks.suite import compare, measure, run_suite
+
+
+def test_inventory_history_is_seeded_with_spikes():
+    """Test generated history is reproducible and contains injected anomalies"""
+    first = inventory_history(20, 60, spike_rate=0.02)
+    second = inventory_history(20, 60, spike_rate=0.02)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert len(first) == 20 * 60
+    assert first.groupby('sku').size().eq(60).all()
+    assert (first['quantity'] < 0).any()
+    # Every 10th SKU ends with a price spike
+    last = first.groupby('sku').tail(1).set_index('sku')['price']
+    median = first.groupby('sku')['price'].median()
+    assert (last['SKU00000'] / median['SKU00000']) > 2.5
+
+
+def test_demand_history_sparse_skus():
+    """Test every n-th SKU is intermittent"""
+    data = demand_history(10, 100, sparse_every=5)
+
+    zero_share = data.groupby('sku')['quantity'].apply(lambda q: (q == 0).mean())
+    assert zero_share['SKU00000'] > 0.5
+    assert zero_share['SKU00001'] == 0
+
+
+def test_measure_reports_latency_throughput_memory():
+    """Test measure() returns the compared metrics"""
+    result = measure(lambda i: np.ones(100_000).sum(), items=100_000, repeats=3)
+
+    assert result['repeats'] == 3
+    assert 0 < result['min_seconds'] <= result['median_seconds'] <= result['p95_seconds']
+    assert result['throughput'] > 0
+    assert result['peak_mb'] >= 0.7  # 100k float64
+
+
+def test_compare_flags_regressions():
+    """Test slower, lower-throughput or bigger runs are regressions beyond the threshold"""
+    base = {"median_seconds": 1.0, "throughput": 100.0, "peak_mb": 10.0}
+    baseline = {"results": {"a": base, "b": base}}
+    current = {"results": {
+        "a": {"median_seconds": 1.05, "throughput": 95.0, "peak_mb": 10.0},  # Within 15%
+        "b": {"median_seconds": 1.5, "throughput": 66.0, "peak_mb": 20.0},
+        "new": base,  # Not in the baseline
+    }}
+
+    rows = compare(baseline, current, threshold=0.15)
+
+    assert {(r['case'], r['metric']) for r in rows if r['regression']} == {
+        ("b", "median_seconds"), ("b", "throughput"), ("b", "peak_mb"),
+    }
+    assert {r['case'] for r in rows} == {"a", "b"}
+
+
+def test_run_suite_document():
+    """Test a suite run records environment, params and per-case results"""
+    results = run_suite("quick", only=["engineer_features", "prepare_lstm_data"])
+
+    assert set(results['results']) == {"engineer_features", "prepare_lstm_data"}
+    assert results['environment']['numpy'] == np.__version__
+    assert results['results']['engineer_features']['items'] == results['params']['feature_days']
@@ -0,0 +1,185 @@
+"""
+Unit tests for Demand Forecaster
+"""
+
+import pytest
+import pytest_asyncio
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+from src.config import Settings
+from src.models.demand_forecaster import DemandForecaster
+from src.models.fast_forecast import forecast_panel, daily_series
+
+
+@pytest_asyncio.fixture
+async def forecaster():
+    """Create and initialize forecaster (Prophet engine)"""
+    forecaster = DemandForecaster(Settings(forecast_engine="prophet"))
+    await forecaster.initialize()
+    return forecaster
+
+
+@pytest_asyncio.fixture
+async def auto_forecaster():
+    """Forecaster routing between Prophet and the fast engine"""
+    forecaster = DemandForecaster(Settings(forecast_engine="auto", fast_forecast_max_days=365))
+    await forecaster.initialize()
+    return forecaster
+
+
+@pytest.fixture
+def history_data():
+    """Generate 120 days of demand with weekly seasonality"""
+    dates = [datetime(2025, 1, 1) + timedelta(days=i) for i in range(120)]
+    weekly = 1 + 0.2 * np.sin(np.arange(120) * 2 * np.pi / 7)
+    data = {
+        'timestamp': dates,
+        'sku': ['SKU001'] * 120,
+        'quantity': (100 * weekly + np.random.normal(0, 5, 120)).astype(int),
+        'price': np.random.normal(50, 2, 120),
+    }
+    return pd.DataFrame(data)
+
+
+@pytest.mark.asyncio
+async def test_forecast_horizon(forecaster, history_data):
+    """Test forecast returns one prediction per horizon day"""
+    result = await forecaster.forecast(history_data, horizon=7)
+
+    assert len(result['forecasts']) == 7
+    assert result['model_type'] == "prophet"
+    assert set(result['accuracy_metrics']) == {'mape', 'rmse', 'mae'}
+    assert all(f['lower_bound'] <= f['upper_bound'] for f in result['forecasts'])
+
+
+@pytest.mark.asyncio
+async def test_prophet_fit_cached_for_same_history(forecaster, history_data):
+    """Test repeat forecasts over the same history skip the refit"""
+    first = await forecaster.forecast(history_data, horizon=7)
+    second = await forecaster.forecast(history_data.sample(frac=1), horizon=14)  # Same rows, any order
+
+    stats = forecaster.prophet_cache.stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    # Point forecasts come from the same fit (intervals are sampled)
+    assert [f['quantity_predicted'] for f in second['forecasts'][:7]] == [f['quantity_predicted'] for f in first['forecasts']]
+
+
+@pytest.mark.asyncio
+async def test_prophet_refit_when_history_changes(forecaster, history_data):
+    """Test new rows trigger exactly one refit for the series"""
+    await forecaster.forecast(history_data.iloc[:-1], horizon=7)
+    await forecaster.forecast(history_data, horizon=7)
+
+    stats = forecaster.prophet_cache.stats()
+    assert stats['stale'] == 1
+    assert stats['entries'] == 1
+
+
+@pytest.mark.asyncio
+async def test_prepare_lstm_data_matches_model_input(forecaster, history_data):
+    """Test LSTM windows have the shape the forecaster model expects"""
+    X, y = forecaster._prepare_lstm_data(history_data)
+
+    assert X.shape == (120 - 30, 30, 3)
+    assert y.shape == (120 - 30, 1)
+    assert X.shape[1:] == tuple(forecaster.lstm_model.input_shape[1:])
+    np.testing.assert_array_equal(y[:, 0], history_data['quantity'].values[30:])
+
+
+@pytest.fixture
+def catalogue_data(history_data):
+    """Three SKUs with 120 days of history and one with too little"""
+    frames = [history_data.assign(sku=sku, warehouse_id="WH001") for sku in ("SKU001", "SKU002", "SKU003")]
+    frames.append(history_data.head(10).assign(sku="SKU004", warehouse_id="WH001"))
+    return pd.concat(frames, ignore_index=True)
+
+
+@pytest.mark.asyncio
+async def test_forecast_batch_per_series(forecaster, catalogue_data):
+    """Test batch forecasting returns one result per series and reports short ones"""
+    result = forecaster.forecast_batch_sync(catalogue_data, horizon=5)
+
+    assert [r['sku'] for r in result['results']] == ["SKU001", "SKU002", "SKU003"]
+    assert all(len(r['forecasts']) == 5 for r in result['results'])
+    assert [e['sku'] for e in result['errors']] == ["SKU004"]
+
+
+def test_series_chunks_keep_series_whole(catalogue_data):
+    """Test chunks never split a series and cover every row"""
+    from src.utils.ingest import series_chunks
+
+    chunks = series_chunks(catalogue_data, chunk_size=3)
+
+    assert [list(c['sku'].unique()) for c in chunks] == [["SKU001", "SKU002", "SKU003"], ["SKU004"]]
+    assert sum(len(c) for c in chunks) == len(catalogue_data)
+
+
+def test_forecast_bulk_process_pool(catalogue_data):
+    """Test bulk forecasting across worker processes covers every series"""
+    from src.models.bulk_forecast import forecast_bulk
+
+    chunks = list(forecast_bulk(catalogue_data, horizon=3, max_workers=2, chunk_size=1))
+
+    assert len(chunks) == 4
+    assert sorted(r['sku'] for c in chunks for r in c['results']) == ["SKU001", "SKU002", "SKU003"]
+    assert [e['sku'] for c in chunks for e in c['errors']] == ["SKU004"]
+
+
+@pytest.mark.asyncio
+async def test_router_uses_fast_engine_for_short_history(auto_forecaster, history_data):
+    """Test short histories skip Prophet and report the fast engine"""
+    result = await auto_forecaster.forecast(history_data, horizon=7)
+
+    assert result['model_type'] == "exponential_smoothing"
+    assert len(result['forecasts']) == 7
+    assert all(0 <= f['lower_bound'] <= f['quantity_predicted'] <= f['upper_bound'] for f in result['forecasts'])
+    assert auto_forecaster.prophet_cache.stats()['misses'] == 0
+
+
+@pytest.mark.asyncio
+async def test_router_uses_croston_for_intermittent_demand(auto_forecaster, history_data):
+    """Test sparse demand is forecast with Croston as a flat rate"""
+    sparse = history_data.copy()
+    sparse.loc[sparse.index % 4 != 0, 'quantity'] = 0
+
+    result = await auto_forecaster.forecast(sparse, horizon=5)
+
+    assert result['model_type'] == "croston"
+    assert len({f['quantity_predicted'] for f in result['forecasts']}) == 1
+
+
+def test_fast_engine_captures_weekly_seasonality():
+    """Test forecasts follow the day-of-week pattern of the history"""
+    weekly = np.tile([50, 60, 70, 80, 90, 150, 200], 20).astype(float)
+
+    out = forecast_panel(weekly[None, :], first_weekday=np.array([0]), horizon=7)
+
+    np.testing.assert_allclose(out['yhat'][0], weekly[:7], rtol=0.05)
+
+
+def test_fast_engine_panel_matches_single_series():
+    """Test forecasting SKUs together gives the same result as one at a time"""
+    rng = np.random.default_rng(0)
+    panel = rng.poisson(20, size=(5, 120)).astype(float)
+    panel[3] *= rng.random(120) < 0.2  # One intermittent series
+    first_weekday = np.arange(5) % 7
+
+    together = forecast_panel(panel, first_weekday, horizon=10)
+    for i in range(5):
+        alone = forecast_panel(panel[i:i + 1], first_weekday[i:i + 1], horizon=10)
+        np.testing.assert_allclose(together['yhat'][i], alone['yhat'][0])
+        assert together['engine'][i] == alone['engine'][0]
+    assert together['engine'][3] == "croston"
+
+
+def test_daily_series_fills_missing_days(history_data):
+    """Test gaps become zero-demand days and duplicates are summed"""
+    data = pd.concat([history_data.drop(index=[5, 6]), history_data.iloc[[10]]])
+
+    start, daily = daily_series(data)
+
+    assert start == np.datetime64('2025-01-01')
+    assert len(daily) == 120
+    assert daily[5] == daily[6] == 0
+    assert daily[10] == 2 * history_data['quantity'].iloc[10]
@@ -0,0 +1,109 @@
+"""
+Unit tests for the Model Executor
+"""
+
+import asyncio
+import os
+import threading
+import pytest
+
+from src.utils.executor import ModelExecutor, ExecutorOverloaded
+
+
+class EchoModel:
+    """Minimal model exposing the initialize()/sync-method contract"""
+
+    def __init__(self):
+        self.initialized = False
+
+    async def initialize(self, registry=None):
+        self.initialized = True
+
+    def where(self, value):
+        return {"value": value, "pid": os.getpid(), "initialized": self.initialized}
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_runs_off_event_loop():
+    """Test calls run on pool threads, not the event loop thread"""
+    executor = ModelExecutor(name="test", max_workers=2)
+
+    thread_name = await executor.run(lambda: threading.current_thread().name)
+
+    assert thread_name.startswith("test")
+    assert executor.stats()['completed'] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_executor_rejects_when_full():
+    """Test backpressure: calls beyond max_pending are rejected"""
+    executor = ModelExecutor(name="test", max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    blocked = asyncio.ensure_future(executor.run(release.wait))
+    await asyncio.sleep(0.01)
+
+    with pytest.raises(ExecutorOverloaded):
+        await executor.run(lambda: None)
+
+    release.set()
+    await blocked
+    assert executor.stats()['rejected'] == 1
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_executor_uses_worker_model():
+    """Test process pools call the method on a worker-local model instance"""
+    executor = ModelExecutor(name="test", kind="process", max_workers=1)
+
+    result = await executor.call(EchoModel(), "where", 42)
+
+    assert result['value'] == 42
+    assert result['initialized'] == True
+    assert result['pid'] != os.getpid()
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_map_yields_as_completed():
+    """Test map fans chunks out and yields the fastest first, holding one pending slot"""
+    executor = ModelExecutor(name="test", max_workers=3, max_pending=1)
+    release = threading.Event()
+
+    class SlowModel:
+        def wait(self, chunk):
+            if chunk == "slow":
+                release.wait()
+            return chunk
+
+    results = executor.map(SlowModel(), "wait", ["slow", "fast"])
+    assert await results.__anext__() == "fast"
+    assert executor.stats()['pending'] == 1
+
+    release.set()
+    assert [r async for r in results] == ["slow"]
+    assert executor.stats()['pending'] == 0
+    executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_map_bounds_chunks_in_flight():
+    """Test map keeps at most max_workers chunks submitted, refilling as results are taken"""
+    executor = ModelExecutor(name="test", max_workers=2)
+    started = []
+
+    class CountingModel:
+        def run(self, chunk):
+            started.append(chunk)
+            return chunk
+
+    results = executor.map(CountingModel(), "run", range(20))
+    first = await results.__anext__()
+    await asyncio.sleep(0.05)  # Consumer is slow: nothing beyond the window may start
+
+    assert len(started) == 2
+    assert sorted([first] + [r async for r in results]) == list(range(20))
+    assert executor.stats()['pending'] == 0
+    executor.shutdown()
@@ -0,0 +1,84 @@
+"""
+Unit tests for vectorized multi-series feature engineering
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+
+from src.features.engineering import ENGINEERED_COLUMNS, engineer_features, engineer_series
+
+
+def reference_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Original single-series pandas implementation"""
+    df = df.copy().sort_values('timestamp', kind='stable')
+    df['price_change_rate'] = df['price'].pct_change().fillna(0)
+    df['quantity_change_rate'] = df['quantity'].pct_change().fillna(0)
+    df['price_rolling_7d'] = df['price'].rolling(window=7, min_periods=1).mean()
+    df['price_rolling_30d'] = df['price'].rolling(window=30, min_periods=1).mean()
+    df['quantity_rolling_7d'] = df['quantity'].rolling(window=7, min_periods=1).mean()
+    df['quantity_rolling_30d'] = df['quantity'].rolling(window=30, min_periods=1).mean()
+    df['price_deviation_7d'] = (df['price'] - df['price_rolling_7d']) / df['price_rolling_7d'].replace(0, 1)
+    df['quantity_deviation_7d'] = (df['quantity'] - df['quantity_rolling_7d']) / df['quantity_rolling_7d'].replace(0, 1)
+    return df
+
+
+@pytest.fixture
+def multi_series_data():
+    """Shuffled long-format rows of 12 series (3 SKUs x 4 warehouses, one without warehouse)"""
+    frames = []
+    for i, (sku, warehouse_id) in enumerate((s, w) for s in ("SKU001", "SKU002", "SKU003") for w in ("WH001", "WH002", "WH003", None)):
+        n = 20 + 7 * i
+        frames.append(pd.DataFrame({
+            'timestamp': [datetime(2024, 1, 1) + timedelta(days=d) for d in range(n)],
+            'sku': sku,
+            'quantity': np.random.normal(100 * (i + 1), 10, n).astype(int),
+            'price': np.random.normal(50 * (i + 1), 2, n),
+            'supplier_id': "SUP001",
+            'warehouse_id': warehouse_id,
+        }))
+    data = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=42)
+
+    # Zero prices (division by zero) and missing values
+    data.loc[data.index[:5], 'price'] = 0.0
+    data.loc[data.index[5:8], 'price'] = np.nan
+    return data
+
+
+def test_matches_single_series_features(multi_series_data):
+    """Test every series gets exactly its single-series features"""
+    featured = engineer_series(multi_series_data)
+    expected = [reference_features(g) for _, g in multi_series_data.groupby(['sku', 'warehouse_id'], sort=False, dropna=False)]
+
+    assert len(featured) == len(expected) == 12
+    for got, want in zip(featured, expected):
+        pd.testing.assert_frame_equal(got, want, check_exact=False, rtol=1e-9)
+
+
+def test_features_do_not_cross_series(multi_series_data):
+    """Test rolling windows and changes restart at every series boundary"""
+    df = engineer_features(multi_series_data)
+    first = ~df.duplicated(['sku', 'warehouse_id'])
+
+    assert first.sum() == 12
+    assert (df.loc[first, 'quantity_change_rate'] == 0).all()
+    assert np.allclose(df.loc[first, 'quantity_rolling_30d'], df.loc[first, 'quantity'])
+    assert list(df.columns[-len(ENGINEERED_COLUMNS):]) == ENGINEERED_COLUMNS
+
+
+def test_custom_codes_keep_duplicate_series_apart():
+    """Test explicit codes split rows of the same sku (e.g. two requests) into separate series"""
+    data = pd.DataFrame({
+        'timestamp': pd.date_range("2024-01-01", periods=10, freq="D").append(pd.date_range("2024-01-01", periods=10, freq="D")),
+        'sku': "SKU001",
+        'quantity': np.arange(20),
+        'price': np.r_[np.full(10, 10.0), np.full(10, 20.0)],
+        'supplier_id': None,
+        'warehouse_id': None,
+    })
+
+    first, second = engineer_series(data, codes=np.repeat([0, 1], 10))
+
+    assert (first['price_rolling_30d'] == 10.0).all()
+    assert (second['price_rolling_30d'] == 20.0).all()
@@ -0,0 +1,88 @@
+"""
+Unit tests for the columnar history store
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime
+
+from src.features.history_store import HistoryStore
+
+
+def test_append_and_read_compact_columns(make_history):
+    """Test histories round-trip per series in int32/float32 columns"""
+    store = HistoryStore(initial_capacity=16)
+    data = make_history(["SKU001", "SKU002"])
+
+    assert store.append(data) == {"appended": 120, "skipped": 0}
+
+    history = store.history("SKU002", "WH001")
+    expected = data[data['sku'] == "SKU002"].reset_index(drop=True)
+    assert history['quantity'].dtype == np.int32
+    assert history['price'].dtype == np.float32
+    assert (history['timestamp'].to_numpy() == expected['timestamp'].to_numpy()).all()
+    assert np.array_equal(history['quantity'], expected['quantity'])
+    np.testing.assert_allclose(history['price'], expected['price'], rtol=1e-6)
+    assert store.stats()['bytes'] == 120 * 20
+
+
+def test_append_skips_rows_not_newer_than_stored(make_history):
+    """Test retries do not duplicate history and out-of-order rows are dropped"""
+    store = HistoryStore()
+    data = make_history(["SKU001"], n=30)
+    store.append(data)
+
+    new = make_history(["SKU001"], n=2, start=datetime(2024, 1, 31))
+    retry = pd.concat([data.tail(5), new])
+
+    assert store.append(retry) == {"appended": 2, "skipped": 5}
+    assert store.append(retry) == {"appended": 0, "skipped": 7}
+    assert len(store.history("SKU001", "WH001")) == 32
+
+
+def test_history_last_n_and_unknown_series(make_history):
+    store = HistoryStore()
+    store.append(make_history(["SKU001"], n=100))
+
+    last = store.history("SKU001", "WH001", last_n=30)
+
+    assert len(last) == 30
+    assert last['timestamp'].iloc[-1] == pd.Timestamp(2024, 1, 1) + pd.Timedelta(days=99)
+    with pytest.raises(KeyError):
+        store.history("SKU001", "WH002")
+
+
+def test_mmap_store_reopens_with_data(tmp_path, make_history):
+    """Test memory-mapped columns grow on disk and survive a restart"""
+    store = HistoryStore(str(tmp_path), initial_capacity=16)
+    store.append(make_history(["SKU001", "SKU002"], n=50))
+    store.append(make_history(["SKU003"], n=10, warehouse_id=None))
+    store.flush()
+
+    reopened = HistoryStore(str(tmp_path))
+
+    assert len(reopened) == 110
+    assert reopened.stats()['series'] == 3
+    pd.testing.assert_frame_equal(reopened.history("SKU002", "WH001"), store.history("SKU002", "WH001"))
+    assert len(reopened.history("SKU003")) == 10
+
+    # Appends continue after the stored rows
+    assert reopened.append(make_history(["SKU001"], n=1, start=datetime(2024, 3, 1)))['appended'] == 1
+    assert len(reopened.history("SKU001", "WH001")) == 51
+
+
+def test_export_all_series(make_history):
+    """Test every stored series is read back as one long-format frame"""
+    store = HistoryStore()
+    data = pd.concat([make_history(["SKU001", "SKU002"], n=40), make_history(["SKU003"], n=40, warehouse_id=None)])
+    store.append(data)
+
+    exported = store.export()
+    assert len(exported) == 120
+    assert exported.groupby('sku', sort=False).size().to_dict() == {"SKU001": 40, "SKU002": 40, "SKU003": 40}
+    assert pd.isna(exported['warehouse_id'].iloc[-1])
+    assert np.array_equal(exported['quantity'], data['quantity'])
+
+    assert len(store.export(last_n=10)) == 30
+    assert HistoryStore().export().empty
@@ -0,0 +1,103 @@
+"""
+Tests for ONNX/TFLite exports of the LSTM models and their inference runners
+"""
+
+import numpy as np
+import pytest
+
+from benchmarks.generators import inventory_history
+from src.config import Settings
+from src.models.anomaly_detector import AnomalyDetector, LSTM_AUTOENCODER_ARTIFACT, LSTM_FEATURES, LSTM_TIMESTEPS
+from src.models.demand_forecaster import DemandForecaster, LSTM_FEATURES as FORECAST_FEATURES, LSTM_LOOKBACK
+from src.models.registry import ModelRegistry
+
+# Runtime each backend needs, besides TensorFlow for exporting
+BACKEND_MODULES = {"tflite": ("tensorflow",), "onnx": ("tensorflow", "tf2onnx", "onnxruntime")}
+
+
+class SavedModel:
+    """Stand-in Keras artifact (writes an empty file)"""
+
+    def save(self, path):
+        path.write_bytes(b"")
+
+
+def skip_without(backend: str) -> None:
+    for module in BACKEND_MODULES[backend]:
+        pytest.importorskip(module)
+
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path))
+
+
+def test_versions_without_export_are_served_with_keras(registry):
+    registry.save(LSTM_AUTOENCODER_ARTIFACT, SavedModel(), format="keras")
+    registry.add_export(LSTM_AUTOENCODER_ARTIFACT, 1, "tflite", b"tflite")
+
+    assert registry.lazy(LSTM_AUTOENCODER_ARTIFACT, backend="tflite").backend == "tflite"
+    assert registry.lazy(LSTM_AUTOENCODER_ARTIFACT, backend="onnx").backend is None
+    assert registry.get_info(LSTM_AUTOENCODER_ARTIFACT).exports == ["tflite"]
+
+    with pytest.raises(FileNotFoundError):
+        registry.load(LSTM_AUTOENCODER_ARTIFACT, backend="onnx")
+    with pytest.raises(ValueError):
+        registry.add_export(LSTM_AUTOENCODER_ARTIFACT, 1, "torchscript", b"")
+
+
+def test_unknown_backend_is_rejected_at_startup():
+    from pydantic import ValidationError
+
+    with pytest.raises(ValidationError):
+        Settings(lstm_inference_backend="onxx")
+
+
+@pytest.mark.parametrize("backend", ["tflite", "onnx"])
+@pytest.mark.parametrize("model", ["autoencoder", "forecaster"])
+def test_export_matches_keras(registry, backend, model):
+    """Test the exported runner reproduces Keras outputs at every batch size"""
+    skip_without(backend)
+    from src.models.inference import export_artifact
+
+    if model == "autoencoder":
+        keras_model = AnomalyDetector()._build_lstm_autoencoder(LSTM_TIMESTEPS, len(LSTM_FEATURES))
+        shape = (LSTM_TIMESTEPS, len(LSTM_FEATURES))
+    else:
+        keras_model = DemandForecaster()._build_lstm_forecaster(LSTM_LOOKBACK, len(FORECAST_FEATURES))
+        shape = (LSTM_LOOKBACK, len(FORECAST_FEATURES))
+
+    registry.save(model, keras_model, format="keras")
+    info = export_artifact(registry, model, backend)
+    runner = registry.load(model, backend=backend)
+
+    assert info['exports'] == [backend]
+    for batch_size in (1, 7, 64, 7):  # Resized in both directions
+        X = np.random.normal(0, 1, (batch_size, *shape)).astype(np.float32)
+        np.testing.assert_allclose(runner.predict_on_batch(X), keras_model.predict_on_batch(X), rtol=1e-4, atol=1e-5)
+
+
+@pytest.mark.asyncio
+async def test_detector_scores_with_exported_autoencoder(registry):
+    """Test a detector configured for TFLite serves the export with Keras' reconstruction errors"""
+    skip_without("tflite")
+    from src.models.inference import TFLiteRunner, export_artifact
+
+    trained = AnomalyDetector()
+    await trained.initialize()
+    trained.train_lstm(inventory_history(n_skus=2, n_days=60), epochs=1, batch_size=64)
+    saved = trained.save_lstm(registry)
+    export_artifact(registry, saved['name'], "tflite", saved['version'])
+
+    detector = AnomalyDetector(Settings(lstm_inference_backend="tflite"))
+    await detector.initialize(registry=registry)
+
+    assert isinstance(detector._get_trained_lstm(), TFLiteRunner)
+    assert detector.lstm_threshold == trained.lstm_threshold
+
+    windows = [np.random.normal(0, 1, (LSTM_TIMESTEPS, len(LSTM_FEATURES))).astype(np.float32) for _ in range(5)]
+    np.testing.assert_allclose(
+        detector._reconstruction_errors(detector._get_trained_lstm(), np.stack(windows)),
+        trained._reconstruction_errors(trained.lstm_autoencoder, np.stack(windows)),
+        rtol=1e-4,
+    )
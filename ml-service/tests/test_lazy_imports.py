@@ -0,0 +1,32 @@
+"""
+Tests for lazy loading of heavy ML frameworks
+"""
+
+import json
+import subprocess
+import sys
+
+from benchmarks.bench_import import measure_import
+
+
+def test_import_does_not_load_frameworks():
+    """Test importing the service loads neither TensorFlow nor Prophet"""
+    result = measure_import()
+
+    assert result["tensorflow"] is False
+    assert result["prophet"] is False
+
+
+def test_frameworks_load_on_first_use():
+    """Test the forecaster imports Prophet only when a model is built"""
+    probe = (
+        "import json, sys\n"
+        "from src.models.demand_forecaster import DemandForecaster\n"
+        "f = DemandForecaster()\n"
+        "before = 'prophet' in sys.modules\n"
+        "f._new_prophet()\n"
+        "print(json.dumps([before, 'prophet' in sys.modules]))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True)
+
+    assert json.loads(out.stdout.strip().splitlines()[-1]) == [False, True]
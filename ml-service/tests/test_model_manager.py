@@ -0,0 +1,84 @@
+"""
+Unit tests for hot model swaps
+"""
+
+import asyncio
+import pytest
+import pytest_asyncio
+
+from src.models.anomaly_detector import AnomalyDetector, FOREST_ARTIFACT, LSTM_AUTOENCODER_ARTIFACT
+from src.models.manager import ModelManager
+from src.models.registry import ModelRegistry
+from src.training.jobs import train_artifact
+
+
+@pytest.fixture
+def registry(tmp_path, make_history):
+    """Registry with two forest versions (v2 adds SKU002)"""
+    train_artifact("anomaly_forests", make_history(["SKU001"]), str(tmp_path), {})
+    train_artifact("anomaly_forests", make_history(["SKU001", "SKU002"]), str(tmp_path), {})
+    return ModelRegistry(str(tmp_path))
+
+
+@pytest_asyncio.fixture
+async def served(registry):
+    """Detector serving forest v1"""
+    detector = AnomalyDetector()
+    await detector.initialize(registry=registry, versions={FOREST_ARTIFACT: 1})
+
+    models = ModelManager(registry, drain_timeout=5)
+    models.register("anomaly_detector", detector)
+    return models
+
+
+@pytest.mark.asyncio
+async def test_activate_switches_then_drains_old_version(served):
+    """Test new requests get the new version at once while held requests keep the old one"""
+    old = served.active("anomaly_detector")
+    held = served.acquire("anomaly_detector")  # Request in flight on v1
+
+    swap = asyncio.create_task(served.activate("anomaly_detector", {FOREST_ARTIFACT: 2}))
+    while served.active("anomaly_detector") is old:
+        await asyncio.sleep(0.01)
+
+    new = served.active("anomaly_detector")
+    assert new.artifacts == {FOREST_ARTIFACT: 2}
+    assert ("SKU002", "WH001") in new.model.forests
+    assert (old.state, swap.done()) == ("draining", False)
+
+    held.release()
+    await swap
+    assert old.state == "standby"
+    assert new.model.feature_store is old.model.feature_store  # Data state survives the swap
+    assert new.model.baselines.stats()['series'] == 2  # Baselines the v2 forests were fitted with
+    assert served.active("anomaly_detector").tag == f"{FOREST_ARTIFACT}:v2"
+
+
+@pytest.mark.asyncio
+async def test_rollback_restores_previous_version(served):
+    with pytest.raises(LookupError):
+        await served.rollback("anomaly_detector")
+
+    await served.activate("anomaly_detector", {FOREST_ARTIFACT: 2})
+    restored = await served.rollback("anomaly_detector")
+
+    assert restored.artifacts == {FOREST_ARTIFACT: 1}
+    assert served.active("anomaly_detector") is restored
+    assert served.stats()['slots']['anomaly_detector']['standby']['artifacts'] == {FOREST_ARTIFACT: 2}
+    assert served.pinned("anomaly_detector") == {FOREST_ARTIFACT: 1}
+
+    await served.rollback("anomaly_detector")  # Rolls forward again
+    assert served.pinned("anomaly_detector") == {}
+    assert served.served_versions("anomaly_detector", FOREST_ARTIFACT) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_activate_rejects_unknown_artifacts(served):
+    with pytest.raises(LookupError):
+        await served.activate("anomaly_detector", {FOREST_ARTIFACT: 9})
+    with pytest.raises(LookupError):
+        await served.activate("anomaly_detector", {LSTM_AUTOENCODER_ARTIFACT: 1})
+    with pytest.raises(ValueError):
+        await served.activate("anomaly_detector", {"demand_backtests": 1})
+
+    assert served.active("anomaly_detector").generation == 1
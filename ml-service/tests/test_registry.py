@@ -0,0 +1,164 @@
+"""
+Unit tests for the filesystem Model Registry
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+from sklearn.ensemble import IsolationForest
+
+from src.models.registry import ModelRegistry
+from src.models.anomaly_detector import AnomalyDetector, FOREST_ARTIFACT
+
+
+@pytest.fixture
+def registry(tmp_path):
+    """Registry in a temporary directory"""
+    return ModelRegistry(str(tmp_path / "models"))
+
+
+@pytest.fixture
+def normal_data():
+    """Generate normal inventory data (no anomalies)"""
+    dates = [datetime.now() - timedelta(days=i) for i in range(60, 0, -1)]
+    data = {
+        'timestamp': dates,
+        'sku': ['SKU001'] * 60,
+        'quantity': np.random.normal(100, 10, 60).astype(int),
+        'price': np.random.normal(50, 2, 60),
+        'supplier_id': ['SUP001'] * 60,
+        'warehouse_id': ['WH001'] * 60,
+    }
+    return pd.DataFrame(data)
+
+
+def test_save_and_load_versions(registry):
+    """Test each save creates a new version with metadata"""
+    X = np.random.normal(0, 1, (50, 3))
+    model = IsolationForest(n_estimators=10, random_state=42).fit(X)
+
+    v1 = registry.save("forest", model, metrics={"accuracy": 0.8})
+    v2 = registry.save("forest", model, metrics={"accuracy": 0.9})
+
+    assert (v1.version, v2.version) == (1, 2)
+    assert registry.list_versions("forest") == [1, 2]
+    assert registry.get_info("forest").metrics == {"accuracy": 0.9}
+    assert registry.get_info("forest", version=1).metrics == {"accuracy": 0.8}
+
+    loaded = registry.load("forest")
+    np.testing.assert_allclose(loaded.score_samples(X), model.score_samples(X))
+
+
+def test_lazy_model_loads_on_first_access(registry):
+    """Test lazy handle only reads the artifact when used"""
+    registry.save("scaler", {"mean": 1.0})
+
+    handle = registry.lazy("scaler")
+    assert handle.loaded == False
+    assert handle.get() == {"mean": 1.0}
+    assert handle.loaded == True
+
+    assert registry.lazy("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_detector_warm_start_from_registry(registry, normal_data):
+    """Test fitted forests saved by one detector are reused by the next"""
+    detector = AnomalyDetector()
+    await detector.initialize(registry=registry)
+    await detector.detect(normal_data)
+    detector.save_artifacts(registry)
+
+    warm_detector = AnomalyDetector()
+    await warm_detector.initialize(registry=registry)
+    await warm_detector.detect(normal_data)
+
+    assert FOREST_ARTIFACT in warm_detector.artifacts
+    assert warm_detector.forests.fits == 0
+    assert registry.list_models()[FOREST_ARTIFACT]['metrics']['segments'] == 1
+
+
+@pytest.mark.asyncio
+async def test_restarted_detector_scores_with_saved_baselines(registry, normal_data):
+    """Test loaded forests score against the baselines they were fitted with"""
+    other = normal_data.assign(sku='SKU002', price=normal_data['price'] * 2)
+    detector = AnomalyDetector()
+    await detector.initialize(registry=registry)
+    detector.train_forests(pd.concat([normal_data, other]))
+    detector.save_artifacts(registry)
+
+    restarted = AnomalyDetector()
+    await restarted.initialize(registry=registry)
+
+    assert restarted.detect_sync(normal_data) == detector.detect_sync(normal_data)
+    assert restarted.baselines.lookup("supplier", "SUP001") == detector.baselines.lookup("supplier", "SUP001")
+    assert restarted.forests.fits == 0
+
+
+def test_save_skips_versions_taken_by_other_processes(registry, monkeypatch):
+    """Test a version saved meanwhile by a sibling worker is not overwritten"""
+    model = IsolationForest(n_estimators=5, random_state=42).fit(np.random.normal(0, 1, (20, 2)))
+    registry.save("forest", model)
+    sibling = ModelRegistry(str(registry.root))
+    sibling.save("forest", model, metrics={"by": "sibling"})
+
+    # This process still sees v1 as the latest when it picks a version
+    latest = iter([1])
+    monkeypatch.setattr(registry, "latest_version", lambda name: next(latest, 2))
+    info = registry.save("forest", model)
+
+    assert info.version == 3
+    assert registry.get_info("forest", 2).metrics == {"by": "sibling"}
+
+
+def test_prune_keeps_newest_and_protected_versions(registry):
+    for _ in range(5):
+        registry.save("forest", {"trees": []})
+
+    deleted = registry.prune("forest", keep=2, protect=[1])
+
+    assert deleted == [2, 3]
+    assert registry.list_versions("forest") == [1, 4, 5]
+    assert registry.save("forest", {"trees": []}).version == 6
+    with pytest.raises(ValueError):
+        registry.prune("forest", keep=0)
+
+
+@pytest.mark.asyncio
+async def test_merged_save_keeps_forests_of_sibling_workers(registry, normal_data):
+    """Test snapshots of workers that fitted different segments add up instead of replacing each other"""
+    first, second = AnomalyDetector(), AnomalyDetector()
+    await first.initialize(registry=registry)
+    await second.initialize(registry=registry)
+    await first.detect(normal_data)
+    await second.detect(normal_data.assign(sku='SKU002'))
+
+    first.save_artifacts(registry, merge=True)
+    second.save_artifacts(registry, merge=True)
+
+    saved = registry.load(FOREST_ARTIFACT)
+    assert set(saved['forests']) == {("SKU001", "WH001"), ("SKU002", "WH001")}
+    assert registry.list_versions(FOREST_ARTIFACT) == [1, 2]
+
+    # A forest refitted since the snapshot replaces the saved one
+    refitted = first.forests.fit(("SKU002", "WH001"), np.random.normal(0, 1, (30, 3)))
+    first.save_artifacts(registry, merge=True)
+    assert registry.load(FOREST_ARTIFACT)['forests'][("SKU002", "WH001")].fitted_at == refitted.fitted_at
+
+
+def test_load_falls_back_when_arrays_cannot_be_mapped(registry, monkeypatch):
+    """Test artifacts with more arrays than file descriptors are loaded into memory"""
+    import errno
+    import joblib
+
+    registry.save("forest", {"trees": np.arange(10)})
+    load = joblib.load
+
+    def no_descriptors(path, mmap_mode=None):
+        if mmap_mode:
+            raise OSError(errno.EMFILE, "Too many open files")
+        return load(path)
+
+    monkeypatch.setattr(joblib, "load", no_descriptors)
+    np.testing.assert_array_equal(registry.load("forest")["trees"], np.arange(10))
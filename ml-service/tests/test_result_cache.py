@@ -0,0 +1,146 @@
+"""
+Unit tests for the request result cache
+"""
+
+import time
+import pytest
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+
+from src.config import Settings
+from src.utils.ingest import columns_to_frame
+from src.utils.result_cache import MemoryResultCache, RedisResultCache, create_result_cache, request_key
+
+
+class LocalRedis:
+    """In-memory stand-in for the redis.Redis calls used by RedisResultCache"""
+
+    def __init__(self):
+        self.store = {}
+
+    def get(self, key):
+        value, expires_at = self.store.get(key, (None, None))
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del self.store[key]
+            return None
+        return value
+
+    def set(self, key, value, px=None):
+        self.store[key] = (value.encode(), time.monotonic() + px / 1000 if px else None)
+
+    def delete(self, key):
+        self.store.pop(key, None)
+
+    def scan_iter(self, match):
+        return [key for key in list(self.store) if key.startswith(match.rstrip("*"))]
+
+    def ping(self):
+        return True
+
+
+class DownRedis(LocalRedis):
+    def get(self, key):
+        raise ConnectionError("connection refused")
+
+    set = get
+
+
+@pytest.fixture
+def data():
+    """One series as built from a row-format payload (naive UTC datetimes)"""
+    epoch = datetime(2024, 1, 1)
+    return pd.DataFrame({
+        'timestamp': [epoch + timedelta(days=i) for i in range(60)],
+        'sku': ['SKU001'] * 60,
+        'quantity': np.random.normal(100, 10, 60).astype(int),
+        'price': np.random.normal(50, 2, 60),
+        'supplier_id': ['SUP001'] * 60,
+        'warehouse_id': [None] * 60,
+    })
+
+
+def test_request_key_ignores_payload_layout(data):
+    """Test rows and columnar epoch seconds of the same data hash alike"""
+    columnar = columns_to_frame(
+        timestamps=(data['timestamp'] - datetime(1970, 1, 1)).dt.total_seconds().tolist(),
+        sku="SKU001",
+        quantities=data['quantity'].tolist(),
+        prices=data['price'].tolist(),
+        supplier_id="SUP001",
+    )
+
+    assert request_key("detect", data, sensitivity=0.05) == request_key("detect", columnar, sensitivity=0.05)
+
+
+def test_request_key_changes_with_data_and_params(data):
+    """Test any change to the data, parameters or kind gives a new key"""
+    key = request_key("detect:0.1.0", data, sensitivity=0.05)
+    changed = data.copy()
+    changed.loc[59, 'price'] += 0.01
+
+    assert request_key("detect:0.1.0", changed, sensitivity=0.05) != key
+    assert request_key("detect:0.1.0", data, sensitivity=0.1) != key
+    assert request_key("detect:0.2.0", data, sensitivity=0.05) != key
+
+
+def test_memory_cache_ttl_and_size_bound():
+    """Test expired entries miss and the oldest entries are evicted"""
+    cache = MemoryResultCache(max_entries=2, ttl_seconds=0.05)
+    for key in ("a", "b", "c"):
+        cache.set(key, {"key": key})
+
+    assert cache.get("a") is None
+    assert cache.get("c") == {"key": "c"}
+
+    time.sleep(0.06)
+    assert cache.get("c") is None
+    assert cache.stats()['evictions'] == 1
+
+
+def test_redis_cache_round_trip_and_ttl():
+    """Test results are stored as JSON with a TTL under the service prefix"""
+    cache = RedisResultCache(LocalRedis(), ttl_seconds=0.05)
+    result = {"is_anomaly": True, "confidence": 0.9, "anomaly_type": None}
+
+    cache.set("k", result)
+
+    assert list(cache.client.store) == ["ml:result:k"]
+    assert cache.get("k") == result
+    time.sleep(0.06)
+    assert cache.get("k") is None
+    assert cache.stats()['hits'] == 1
+
+
+def test_redis_cache_skips_large_values_and_clears_own_keys():
+    cache = RedisResultCache(LocalRedis(), max_value_bytes=100)
+    cache.client.set("other:key", "x")
+
+    cache.set("small", {"v": 1})
+    cache.set("large", {"v": "x" * 200})
+    assert cache.get("large") is None
+
+    cache.clear()
+    assert list(cache.client.store) == ["other:key"]
+
+
+def test_redis_cache_failures_are_misses():
+    """Test an unreachable Redis never fails the request"""
+    cache = RedisResultCache(DownRedis())
+
+    cache.set("k", {"v": 1})
+
+    assert cache.get("k") is None
+    assert cache.stats()['errors'] == 2
+
+
+def test_create_result_cache_from_settings():
+    assert create_result_cache(Settings(result_cache_backend="none")) is None
+    assert create_result_cache(Settings()).backend == "memory"
+
+    # Unreachable Redis falls back to the in-process cache
+    fallback = create_result_cache(Settings(result_cache_backend="redis", result_cache_redis_url="redis://127.0.0.1:1/0"))
+    assert fallback.backend == "memory"
+
+    with pytest.raises(ValueError):
+        create_result_cache(Settings(result_cache_backend="disk"))
@@ -0,0 +1,131 @@
+"""
+Tests for pre-fork serving: thread budget and models preloaded before fork
+"""
+
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import main
+from src.config import Settings, get_settings
+from src.models.anomaly_detector import FOREST_ARTIFACT
+from src.training.jobs import train_artifact
+from src.utils.threads import THREAD_ENV_VARS, set_thread_env, threads_per_worker
+from benchmarks.generators import inventory_history
+
+
+def test_thread_budget_splits_cores_between_workers():
+    assert threads_per_worker(4, cpus=16) == 4
+    assert threads_per_worker(32, cpus=8) == 1  # Never below one thread
+
+    assert Settings(serving_workers=4).worker_threads == threads_per_worker(4)
+    assert Settings(serving_workers=4, model_threads=3).worker_threads == 3
+
+
+def test_thread_env_keeps_operator_settings(monkeypatch):
+    for var in (*THREAD_ENV_VARS, "TF_NUM_INTEROP_THREADS"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv("OMP_NUM_THREADS", "8")
+
+    applied = set_thread_env(2)
+
+    assert "OMP_NUM_THREADS" not in applied
+    assert os.environ["OMP_NUM_THREADS"] == "8"
+    assert os.environ["OPENBLAS_NUM_THREADS"] == "2"
+    assert os.environ["TF_NUM_INTEROP_THREADS"] == "2"
+
+
+def test_per_process_state_requires_one_worker(monkeypatch):
+    """Test endpoints whose state stays in one worker are refused with several workers"""
+    with pytest.raises(ValueError):
+        Settings(serving_workers=2, history_store_dir="/tmp/history")
+    refused = subprocess.run(
+        [sys.executable, "-m", "src.serve", "--workers", "2"],
+        env={**os.environ, "HISTORY_STORE_DIR": "/tmp/history"},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert refused.returncode == 2
+    assert "HISTORY_STORE_DIR requires SERVING_WORKERS=1" in refused.stderr
+
+    point = {"timestamp": "2025-01-01T00:00:00", "sku": "SKU001", "quantity": 1, "price": 1.0}
+    with TestClient(main.app) as client:
+        monkeypatch.setattr(get_settings(), "serving_workers", 2)
+        responses = [
+            client.post("/api/ml/history", json={"data_points": [point]}),
+            client.post("/api/ml/detect-anomaly", json={"stored_series": {"sku": "SKU001"}}),
+            client.post("/api/ml/detect-anomaly/point", json={"data_point": point}),
+            client.get("/api/ml/training/jobs"),
+            client.get("/api/ml/training/jobs/unknown"),
+            client.post("/api/ml/models/anomaly_detector/rollback"),
+        ]
+        assert client.post("/api/ml/detect-anomaly", json={"data_points": [point] * 30}).status_code != 503
+
+    assert [r.status_code for r in responses] == [503] * len(responses)
+    assert "SERVING_WORKERS=1" in responses[0].json()["detail"]
+
+
+def test_worker_serves_models_preloaded_by_parent(tmp_path, monkeypatch):
+    """Test startup serves the parent's loaded forests instead of loading its own"""
+    train_artifact("anomaly_forests", inventory_history(n_skus=2, n_days=60), str(tmp_path), {})
+    monkeypatch.setattr(get_settings(), "model_registry_dir", str(tmp_path))
+
+    loaded = main.preload_models()
+    detector = main.preloaded[main.ANOMALY_DETECTOR]
+    forests = detector.forests.snapshot()
+
+    assert loaded == {"forests": 2, "artifacts": 1}
+    assert all('_packed' in forest.__dict__ for forest in forests.values())
+
+    with TestClient(main.app) as client:
+        info = client.get("/api/ml/models/info").json()
+        assert main.served_model(main.ANOMALY_DETECTOR) is detector
+        assert main.model_registry is detector.artifacts[FOREST_ARTIFACT].registry
+
+    assert info["process"]["preloaded_by"] == os.getpid()
+    assert info["anomaly_detector"]["artifacts"][FOREST_ARTIFACT]["loaded"] is True
+    assert main.preloaded == {}
+
+    # A later start without preloading loads its own models again
+    with TestClient(main.app) as client:
+        assert client.get("/api/ml/models/info").json()["process"]["preloaded_by"] is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="pre-fork serving needs fork()")
+def test_prefork_workers_share_one_port():
+    pytest.importorskip("uvicorn")
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+
+    server = subprocess.Popen(
+        [sys.executable, "-m", "src.serve", "--workers", "2", "--host", "127.0.0.1", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        pids, deadline = set(), time.monotonic() + 60
+        while len(pids) < 2 and time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/api/ml/models/info", timeout=5) as response:
+                    process = json.load(response)["process"]
+                pids.add(process["pid"])
+                assert process["preloaded_by"] == server.pid
+                assert process["serving_workers"] == 2
+            except OSError:
+                time.sleep(0.5)
+
+        assert len(pids) == 2
+    finally:
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
@@ -0,0 +1,128 @@
+"""
+Unit tests for streaming feature state
+"""
+
+import pytest
+import pytest_asyncio
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+
+from src.features.streaming import RollingWindow, FEATURE_COLUMNS
+from src.models.anomaly_detector import AnomalyDetector
+
+
+@pytest_asyncio.fixture
+async def detector():
+    """Create and initialize detector"""
+    detector = AnomalyDetector()
+    await detector.initialize()
+    return detector
+
+
+@pytest.fixture
+def history():
+    """60 days of normal data plus a price spike on the last day"""
+    dates = [datetime(2025, 1, 1) + timedelta(days=i) for i in range(60)]
+    prices = np.random.normal(50, 2, 60)
+    prices[-1] = 150
+    return pd.DataFrame({
+        'timestamp': dates,
+        'sku': ['SKU001'] * 60,
+        'quantity': np.random.normal(100, 10, 60).astype(int),
+        'price': prices,
+        'supplier_id': ['SUP001'] * 60,
+        'warehouse_id': ['WH001'] * 60,
+    })
+
+
+def test_rolling_window_running_mean():
+    """Test ring buffer keeps the mean of the latest values"""
+    window = RollingWindow(3)
+    for value in [1.0, 2.0, 3.0, 4.0, 5.0]:
+        window.push(value)
+
+    assert window.mean == pytest.approx(4.0)
+    assert window.contents() == [3.0, 4.0, 5.0]
+
+
+@pytest.mark.asyncio
+async def test_point_features_match_full_history(detector, history):
+    """Test O(1) update gives the same features as recomputing from history"""
+    await detector.detect(history.iloc[:-1])
+
+    state = detector.feature_store.get(('SKU001', 'WH001'))
+    latest = history.iloc[-1]
+    features = state.update(latest['timestamp'], latest['price'], latest['quantity'])
+
+    expected = detector._engineer_features(history).iloc[-1]
+    for col in FEATURE_COLUMNS:
+        assert features[col] == pytest.approx(expected[col])
+
+
+@pytest.mark.asyncio
+async def test_detect_point_matches_full_history(history):
+    """Test a point scored from streaming state gives the full-history verdict"""
+    streaming = AnomalyDetector()
+    await streaming.initialize()
+    await streaming.detect(history.iloc[:-1])
+
+    full = AnomalyDetector()
+    await full.initialize()
+    await full.detect(history.iloc[:-1])
+
+    point_result = await streaming.detect_point(history.iloc[-1].to_dict())
+    full_result = await full.detect(history)  # Same fitted forest scores the latest point
+
+    assert point_result['is_anomaly'] == full_result['is_anomaly']
+    assert point_result['confidence'] == pytest.approx(full_result['confidence'])
+    assert point_result['anomaly_type'] == full_result['anomaly_type']
+    assert streaming.forests.fits == 1
+
+
+@pytest.mark.asyncio
+async def test_detect_point_unknown_series(detector, history):
+    """Test points of unseen series are rejected"""
+    with pytest.raises(LookupError):
+        await detector.detect_point(history.iloc[-1].to_dict())
+
+
+
+@pytest.mark.asyncio
+async def test_concurrent_points_of_one_series(detector, monkeypatch):
+    """Test points scored from many threads update a series' state one at a time"""
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    dates = [datetime(2025, 1, 1) + timedelta(hours=i) for i in range(160)]
+    history = pd.DataFrame({
+        'timestamp': dates,
+        'sku': 'SKU001',
+        'quantity': np.random.normal(100, 10, 160).astype(int),
+        'price': np.random.normal(50, 2, 160),
+        'supplier_id': 'SUP001',
+        'warehouse_id': 'WH001',
+    })
+    await detector.detect(history.iloc[:60])
+
+    # Slow ring buffer pushes widen the window in which unlocked updates interleave
+    push = RollingWindow.push
+    monkeypatch.setattr(RollingWindow, "push", lambda self, value: (time.sleep(0.0005), push(self, value))[1])
+
+    def score(row):
+        try:
+            detector.detect_point_sync(row)
+            return row['timestamp']
+        except ValueError:  # Overtaken by a newer point
+            return None
+
+    with ThreadPoolExecutor(8) as pool:
+        accepted = [t for t in pool.map(score, history.iloc[60:].to_dict('records')) if t is not None]
+
+    state = detector.feature_store.get(('SKU001', 'WH001'))
+    forest = detector.forests.get(('SKU001', 'WH001'))
+    latest = history.set_index('timestamp').loc[sorted(accepted)[-7:], 'price'].tolist()
+    assert state.n_observations == 60 + len(accepted)
+    assert forest.points_since_fit == len(accepted)
+    assert state.last_timestamp == max(accepted)
+    assert state.price_7d.contents() == pytest.approx(latest)
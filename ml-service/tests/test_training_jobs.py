@@ -0,0 +1,57 @@
+"""
+Unit tests for background training jobs
+"""
+
+import asyncio
+import pytest
+
+from src.models.anomaly_detector import AnomalyDetector, FOREST_ARTIFACT
+from src.models.manager import ModelManager
+from src.models.registry import ModelRegistry
+from src.training.jobs import JobManager, train_artifact
+from src.utils.executor import ExecutorOverloaded, ModelExecutor
+
+
+def test_train_forests_fits_every_segment(tmp_path, make_history):
+    """Test offline training fits one forest per series and saves them as a version"""
+    info = train_artifact("anomaly_forests", make_history(["SKU001", "SKU002", "SKU003"]), str(tmp_path), {})
+
+    assert info['artifact']['name'] == FOREST_ARTIFACT
+    assert info['metrics'] == {"segments": 3, "rows": 180, "skipped_segments": 0}
+    saved = ModelRegistry(str(tmp_path)).load(FOREST_ARTIFACT)
+    assert saved['baselines'].stats()['series'] == 3
+    assert set(saved['forests']) == {("SKU001", "WH001"), ("SKU002", "WH001"), ("SKU003", "WH001")}
+
+
+@pytest.mark.asyncio
+async def test_job_swaps_trained_version_into_serving(tmp_path, make_history):
+    """Test a succeeded job hot-swaps its version; failures and a full queue are reported"""
+    registry = ModelRegistry(str(tmp_path))
+    detector = AnomalyDetector()
+    await detector.initialize(registry=registry)
+    models = ModelManager(registry)
+    models.register("anomaly_detector", detector)
+
+    async def serve(kind, artifact):
+        await models.activate("anomaly_detector", {artifact['name']: artifact['version']})
+
+    executor = ModelExecutor(name="training", kind="thread", max_workers=1, max_pending=2)
+    jobs = JobManager(executor, str(tmp_path), on_trained=serve, max_jobs=2)
+
+    job = jobs.submit("anomaly_forests", make_history(["SKU001", "SKU002"]))
+    failing = jobs.submit("anomaly_forests", make_history(["SKU003"], n=5))  # Too short
+    with pytest.raises(ExecutorOverloaded):
+        jobs.submit("anomaly_forests", make_history(["SKU004"]))
+    with pytest.raises(ValueError):
+        jobs.submit("anomaly_forests", make_history(["SKU004"]), params={"epochs": 3})
+
+    assert (await jobs.wait(job.id)).status == "succeeded"
+    assert (await jobs.wait(failing.id)).status == "failed"
+    assert "at least 30" in failing.error
+
+    served = models.active("anomaly_detector").model
+    assert served.artifact_versions == {FOREST_ARTIFACT: job.result['artifact']['version']}
+    assert ("SKU002", "WH001") in served.forests
+    assert jobs.stats()['succeeded'] == 1 and jobs.stats()['rejected'] == 1
+
+    executor.shutdown()
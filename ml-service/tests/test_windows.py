@@ -0,0 +1,68 @@
+"""
+Unit tests for sliding window utilities
+"""
+
+import numpy as np
+
+from src.utils.windows import sliding_windows, window_targets, panel_windows, iter_window_batches
+
+
+def test_sliding_windows_shape_and_values():
+    """Test windows match the equivalent Python loop"""
+    values = np.arange(20, dtype=np.float32).reshape(10, 2)
+
+    windows = sliding_windows(values, 4)
+    expected = np.array([values[i:i + 4] for i in range(10 - 4 + 1)])
+
+    assert windows.shape == (7, 4, 2)
+    np.testing.assert_array_equal(windows, expected)
+
+
+def test_sliding_windows_are_views():
+    """Test windows share memory with the input (no copies)"""
+    values = np.random.normal(size=(100, 5))
+
+    windows = sliding_windows(values, 30)
+
+    assert np.shares_memory(windows, values)
+
+
+def test_sliding_windows_short_input():
+    """Test inputs shorter than one window give no windows"""
+    assert sliding_windows(np.arange(5), 10).shape == (0, 10, 1)
+
+
+def test_window_targets_match_loop():
+    """Test (X, y) pairs match the original Python loop"""
+    values = np.random.normal(size=(50, 3))
+
+    X, y = window_targets(values, 30)
+
+    X_loop = np.array([values[i - 30:i] for i in range(30, 50)])
+    y_loop = np.array([values[i, :1] for i in range(30, 50)])
+    np.testing.assert_array_equal(X, X_loop)
+    np.testing.assert_array_equal(y, y_loop)
+    assert np.shares_memory(X, values)
+
+
+def test_panel_windows_shape():
+    """Test equal-length series are windowed together"""
+    panel = np.random.normal(size=(4, 40, 3))
+
+    windows = panel_windows(panel, 30)
+
+    assert windows.shape == (4, 11, 30, 3)
+    np.testing.assert_array_equal(windows[2, 5], panel[2, 5:35])
+
+
+def test_window_batches_do_not_cross_series():
+    """Test batches cover every window of every series exactly once"""
+    series = [np.arange(40, dtype=float), np.arange(100, 135, dtype=float)]
+
+    batches = list(iter_window_batches(series, 30, batch_size=4))
+
+    X = np.concatenate([X for X, _ in batches])
+    y = np.concatenate([y for _, y in batches])
+    assert [len(X) for X, _ in batches] == [4, 4, 4, 3]  # 10 + 5 windows
+    assert X.shape == (15, 30, 1)
+    np.testing.assert_array_equal(y[:, 0], np.concatenate([np.arange(30, 40), np.arange(130, 135)]))